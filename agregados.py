@@ -0,0 +1,178 @@
+"""Totales del inventario mantenidos operación por operación
+
+En lugar de volver a sumar todo el inventario y todas las ventas en cada
+rerun del reporte, Inventario actualiza estos totales en cada venta, alta,
+baja, movimiento o edición. Se guardan junto con los datos y pueden
+reconstruirse desde cero para comparar (ver 'verificar-agregados' en
+almacenamiento.py).
+"""
+
+# Diferencia máxima aceptada al comparar importes acumulados
+TOLERANCIA = 0.005
+
+
+def _totales_producto():
+    return {'productos': 0, 'ventas_total': 0, 'stock_total': 0,
+            'unidades_vendidas': 0, 'ingresos': 0.0}
+
+
+def _totales_ubicacion():
+    return {'productos': 0, 'stock': 0, 'unidades_vendidas': 0, 'ingresos': 0.0}
+
+
+def _totales_dia():
+    return {'unidades_vendidas': 0, 'ingresos': 0.0}
+
+
+def _ubicacion_de_venta(venta):
+    """'exhibido'/'bodega' de la venta -> 'Exhibido'/'Bodega'"""
+    ubicacion = venta.get('ubicacion_venta') or venta.get('ubicacion') or ''
+    return ubicacion.capitalize()
+
+
+class Agregados:
+    """Totales generales, por categoría, por ubicación y por día"""
+
+    def __init__(self):
+        self.totales = {'productos': 0, 'ventas_total': 0, 'stock_exhibido': 0,
+                        'stock_bodega': 0, 'unidades_vendidas': 0, 'ingresos': 0.0}
+        self.por_categoria = {}
+        self.por_ubicacion = {}
+        self.por_dia = {}
+
+    @classmethod
+    def desde_cero(cls, productos, ventas, resumenes=()):
+        """Calcular todos los totales recorriendo productos y ventas
+
+        'resumenes' son los resúmenes diarios de los meses cerrados (ver
+        HistorialVentas.resumenes_archivados), que cuentan como sus ventas.
+        """
+        agregados = cls()
+        for producto in productos:
+            agregados.sumar_producto(producto)
+        for venta in ventas:
+            agregados.sumar_venta(venta)
+        for resumen in resumenes:
+            agregados.sumar_resumen(resumen)
+        return agregados
+
+    # ------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------
+    def sumar_producto(self, producto, signo=1):
+        """Sumar (o restar con signo=-1) lo que aporta un producto"""
+        stock_exhibido = producto.get('Stock_Exhibido', 0)
+        stock_bodega = producto.get('Stock_Bodega', 0)
+        ventas_total = producto.get('Ventas_Total', 0)
+
+        self.totales['productos'] += signo
+        self.totales['ventas_total'] += signo * ventas_total
+        self.totales['stock_exhibido'] += signo * stock_exhibido
+        self.totales['stock_bodega'] += signo * stock_bodega
+
+        categoria = self.por_categoria.setdefault(producto.get('Categoria', ''), _totales_producto())
+        categoria['productos'] += signo
+        categoria['ventas_total'] += signo * ventas_total
+        categoria['stock_total'] += signo * producto.get('Stock_Total', 0)
+
+        principal = self.por_ubicacion.setdefault(producto.get('Ubicacion', ''), _totales_ubicacion())
+        principal['productos'] += signo
+        self.por_ubicacion.setdefault('Exhibido', _totales_ubicacion())['stock'] += signo * stock_exhibido
+        self.por_ubicacion.setdefault('Bodega', _totales_ubicacion())['stock'] += signo * stock_bodega
+
+    def cambiar_producto(self, antes, despues):
+        """Reemplazar la aportación de un producto por la de su versión nueva"""
+        if antes is not None:
+            self.sumar_producto(antes, -1)
+        if despues is not None:
+            self.sumar_producto(despues)
+
+    def sumar_venta(self, venta, signo=1):
+        """Sumar (o restar con signo=-1) una venta registrada"""
+        precio = venta.get('precio_venta', 0) or 0
+
+        self.totales['unidades_vendidas'] += signo
+        self.totales['ingresos'] += signo * precio
+
+        categoria = self.por_categoria.setdefault(venta.get('categoria', ''), _totales_producto())
+        categoria['unidades_vendidas'] += signo
+        categoria['ingresos'] += signo * precio
+
+        ubicacion = self.por_ubicacion.setdefault(_ubicacion_de_venta(venta), _totales_ubicacion())
+        ubicacion['unidades_vendidas'] += signo
+        ubicacion['ingresos'] += signo * precio
+
+        dia = self.por_dia.setdefault(str(venta.get('fecha', ''))[:10], _totales_dia())
+        dia['unidades_vendidas'] += signo
+        dia['ingresos'] += signo * precio
+
+    def sumar_resumen(self, resumen):
+        """Sumar un resumen diario (DataFrame de reportes.resumen_diario) como sus ventas"""
+        for fila in resumen.itertuples(index=False):
+            unidades, ingresos = int(fila.unidades), float(fila.ingresos)
+
+            self.totales['unidades_vendidas'] += unidades
+            self.totales['ingresos'] += ingresos
+
+            categoria = self.por_categoria.setdefault(fila.categoria, _totales_producto())
+            categoria['unidades_vendidas'] += unidades
+            categoria['ingresos'] += ingresos
+
+            ubicacion = self.por_ubicacion.setdefault(fila.ubicacion, _totales_ubicacion())
+            ubicacion['unidades_vendidas'] += unidades
+            ubicacion['ingresos'] += ingresos
+
+            dia = self.por_dia.setdefault(fila.dia.strftime('%Y-%m-%d'), _totales_dia())
+            dia['unidades_vendidas'] += unidades
+            dia['ingresos'] += ingresos
+
+    # ------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------
+    def ventas_por_categoria(self):
+        """{categoría: unidades vendidas acumuladas (Ventas_Total)} de las categorías con productos"""
+        return {cat: t['ventas_total'] for cat, t in self.por_categoria.items() if t['productos'] > 0}
+
+    def productos_en_categoria(self, categoria):
+        """Número de productos de una categoría"""
+        return self.por_categoria.get(categoria, {}).get('productos', 0)
+
+    # ------------------------------------------------------------
+    # Persistencia y verificación
+    # ------------------------------------------------------------
+    def a_dict(self):
+        return {
+            'totales': self.totales,
+            'por_categoria': self.por_categoria,
+            'por_ubicacion': self.por_ubicacion,
+            'por_dia': self.por_dia
+        }
+
+    @classmethod
+    def desde_dict(cls, data):
+        agregados = cls()
+        agregados.totales.update(data.get('totales', {}))
+        agregados.por_categoria = {k: dict(v) for k, v in data.get('por_categoria', {}).items()}
+        agregados.por_ubicacion = {k: dict(v) for k, v in data.get('por_ubicacion', {}).items()}
+        agregados.por_dia = {k: dict(v) for k, v in data.get('por_dia', {}).items()}
+        return agregados
+
+    def diferencias(self, otro):
+        """Lista de diferencias legibles entre dos juegos de totales"""
+        diferencias = []
+
+        def comparar(ruta, a, b):
+            if abs((a or 0) - (b or 0)) > TOLERANCIA:
+                diferencias.append(f"{ruta}: {a} != {b}")
+
+        for campo in self.totales.keys() | otro.totales.keys():
+            comparar(f"totales.{campo}", self.totales.get(campo), otro.totales.get(campo))
+
+        for nombre in ('por_categoria', 'por_ubicacion', 'por_dia'):
+            mios, suyos = getattr(self, nombre), getattr(otro, nombre)
+            for clave in mios.keys() | suyos.keys():
+                a, b = mios.get(clave, {}), suyos.get(clave, {})
+                for campo in a.keys() | b.keys():
+                    comparar(f"{nombre}[{clave}].{campo}", a.get(campo), b.get(campo))
+
+        return sorted(diferencias)
@@ -0,0 +1,1001 @@
+"""Persistencia del inventario
+
+Dos almacenes intercambiables con la misma interfaz:
+
+- AlmacenJSON: snapshot + diario de eventos (solo anexar). Cada venta
+  o cambio de stock se anexa como una línea al diario en lugar de reescribir
+  el archivo completo. Periódicamente se hace un checkpoint que vuelca el
+  estado en el snapshot (temporal + fsync + rename, o en segundo plano, ver
+  escritor.py) y vacía el diario. Las ventas no van en el snapshot:
+  se guardan en columnas, un archivo por mes (ver historial.py). El
+  snapshot se escribe en JSON o en binario por columnas con compresión
+  opcional (ver snapshot_binario.py); al leer se reconoce solo.
+- AlmacenSQLite: tablas 'productos' y 'ventas' indexadas en SQLite (modo
+  WAL); cada operación es una transacción de una fila.
+
+En ambos las ventas se cargan como HistorialVentas, que lee cada mes solo
+cuando se consulta. Los meses cerrados (Inventario.cerrar_periodo) salen de
+ahí y quedan en un directorio de archivo con su resumen diario (ver
+historial.ArchivoVentas), el mismo para los dos almacenes.
+
+Cada almacén tiene un 'bloqueo' (BloqueoArchivo sobre un archivo '.lock'
+junto a los datos) que serializa las escrituras entre hilos y entre
+procesos: Inventario lo toma durante toda una operación (ver inventario.py).
+
+Uso como script para migrar una tienda existente de JSON a SQLite:
+
+    python almacenamiento.py importar-sqlite
+
+o para comprobar los agregados guardados contra un recálculo desde cero:
+
+    python almacenamiento.py verificar-agregados [--reparar]
+
+o para dar IDs nuevos a los productos con ID repetido:
+
+    python almacenamiento.py reparar-ids
+
+o para archivar las ventas de los meses anteriores al actual (cierre de
+periodo, ver Inventario.cerrar_periodo):
+
+    python almacenamiento.py cerrar-periodo [--hasta AAAA-MM-DD]
+
+o para reescribir el snapshot en otro formato (p. ej. volver a JSON):
+
+    python almacenamiento.py convertir-snapshot --formato binario [--compresion gzip]
+"""
+import argparse
+import copy
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from agregados import Agregados
+from historial import HistorialVentas, DirectorioParticiones, ArchivoVentas, ParticionVentas, MES_SIN_FECHA
+from identificadores import ids_por_descripcion, reparar_duplicados
+import snapshot_binario
+
+# Número de eventos en el diario antes de forzar un checkpoint
+DIARIO_MAX_EVENTOS = 500
+
+# Formatos del snapshot al escribir (al leer se reconoce cualquiera)
+FORMATOS_SNAPSHOT = ['json', 'binario']
+
+# Versión de la estructura del snapshot. 1 = productos con Stock/Entrada/Precio;
+# 2 = stock por ubicación (Stock_Bodega/Stock_Exhibido) y doble precio;
+# 3 = ventas fuera del snapshot, en archivos mensuales por columnas;
+# 4 = cada venta con el ID de su producto (producto_id).
+ESQUEMA_VERSION = 4
+
+# Columnas de un producto, en el orden en que se guardan
+COLUMNAS_PRODUCTO = [
+    'ID', 'Categoria', 'Producto', 'Talla', 'Color', 'Ubicacion',
+    'Entrada_Total', 'Stock_Bodega', 'Stock_Exhibido', 'Stock_Total',
+    'Ventas_Total', 'Precio_Sugerido', 'Precio_Venta'
+]
+
+# Archivos de datos por omisión, los mismos para la app, la API y las
+# herramientas de línea de comandos
+RUTA_SNAPSHOT = 'inventario_data.json'
+RUTA_DIARIO = 'inventario_diario.jsonl'
+RUTA_SQLITE = 'inventario.db'
+RUTA_VENTAS = 'inventario_ventas'  # Un archivo de ventas por mes
+RUTA_ARCHIVO = 'inventario_archivo'  # Meses cerrados, con su resumen
+
+# Campos de una venta registrada
+COLUMNAS_VENTA = [
+    'fecha', 'producto', 'talla', 'precio_sugerido', 'precio_venta',
+    'categoria', 'ubicacion', 'ubicacion_venta'
+]
+
+
+def directorio_ventas(ruta_snapshot):
+    """Directorio de las particiones de ventas junto al snapshot"""
+    return os.path.splitext(ruta_snapshot)[0] + '_ventas'
+
+
+def directorio_archivo(ruta_datos):
+    """Directorio de los meses cerrados junto al snapshot o la base SQLite"""
+    return os.path.splitext(ruta_datos)[0] + '_archivo'
+
+
+def estado_vacio():
+    """Estado inicial sin productos ni ventas"""
+    return {
+        'inventario': [],
+        'ventas_diarias': [],
+        'caja': 0.0,
+        'secuencia': 0,
+        'schema_version': ESQUEMA_VERSION,
+        'agregados': Agregados().a_dict()
+    }
+
+
+def migrar_producto(item):
+    """Convertir un producto de la estructura vieja (Stock/Entrada/Precio) a la nueva"""
+    if 'Stock_Bodega' in item:
+        return item
+    return {
+        'ID': item.get('ID', ''),
+        'Categoria': item.get('Categoria', ''),
+        'Producto': item.get('Producto', ''),
+        'Talla': item.get('Talla', ''),
+        'Color': item.get('Color', ''),
+        'Ubicacion': 'Exhibido',
+        'Entrada_Total': item.get('Entrada', 0),
+        'Stock_Bodega': 0,
+        'Stock_Exhibido': item.get('Stock', 0),
+        'Stock_Total': item.get('Stock', 0),
+        'Ventas_Total': item.get('Ventas', 0),
+        'Precio_Sugerido': item.get('Precio', 0.0),
+        'Precio_Venta': item.get('Precio', 0.0)
+    }
+
+
+def leer_snapshot(ruta):
+    """Leer el snapshot, JSON o binario (o estado vacío si no existe)"""
+    if not os.path.exists(ruta):
+        return estado_vacio()
+    with open(ruta, 'rb') as f:
+        contenido = f.read()
+    if snapshot_binario.es_binario(contenido):
+        data = snapshot_binario.decodificar(contenido)
+    else:
+        data = json.loads(contenido.decode('utf-8'))
+    data.setdefault('inventario', [])
+    # Solo los snapshots anteriores a la versión 3 traen las ventas dentro
+    data.setdefault('ventas_diarias', [])
+    data.setdefault('caja', 0.0)
+    data.setdefault('secuencia', 0)
+    # Los archivos anteriores a 'schema_version' son de la estructura vieja
+    data.setdefault('schema_version', 1)
+    # Snapshots anteriores a los agregados: se calculan al cargar el inventario
+    data.setdefault('agregados', None)
+    return data
+
+
+def leer_diario(ruta):
+    """Leer los eventos del diario; las líneas truncadas o corruptas se ignoran"""
+    eventos = []
+    if not os.path.exists(ruta):
+        return eventos
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                eventos.append(json.loads(linea))
+            except json.JSONDecodeError:
+                # Escritura interrumpida a la mitad de la línea
+                continue
+    return eventos
+
+
+def aplicar_evento(data, evento, indice):
+    """Aplicar un evento del diario sobre el estado cargado
+
+    Los eventos guardan el registro completo del producto tras el cambio,
+    así que aplicarlos es un reemplazo por ID y no depende del orden de
+    las operaciones originales.
+    """
+    tipo = evento.get('tipo')
+    agregados = data.get('agregados')
+
+    def reemplazar_producto(producto):
+        pos = indice.get(producto['ID'])
+        if pos is None:
+            anterior = None
+            indice[producto['ID']] = len(data['inventario'])
+            data['inventario'].append(producto)
+        else:
+            anterior = data['inventario'][pos]
+            data['inventario'][pos] = producto
+        if agregados is not None:
+            agregados.cambiar_producto(anterior, producto)
+
+    def agregar_venta(venta):
+        # Si el mes ya se guardó con esta venta (checkpoint interrumpido) no se repite
+        data['ventas_diarias'].append(venta, evento.get('seq'))
+        if agregados is not None:
+            agregados.sumar_venta(venta)
+
+    if tipo in ('producto', 'venta'):
+        reemplazar_producto(evento['producto'])
+        if tipo == 'venta':
+            agregar_venta(evento['venta'])
+
+    elif tipo == 'productos':
+        # Importación: varios productos en un solo evento
+        for producto in evento['productos']:
+            reemplazar_producto(producto)
+
+    elif tipo == 'ventas':
+        # Carrito: todos los productos y ventas en un solo evento
+        for producto in evento['productos']:
+            reemplazar_producto(producto)
+        for venta in evento['ventas']:
+            agregar_venta(venta)
+
+    elif tipo == 'baja':
+        pos = indice.pop(evento['id'], None)
+        if pos is not None:
+            eliminado = data['inventario'].pop(pos)
+            if agregados is not None:
+                agregados.sumar_producto(eliminado, -1)
+            # Las posiciones posteriores se recorren una
+            for producto_id, p in indice.items():
+                if p > pos:
+                    indice[producto_id] = p - 1
+
+    if 'caja' in evento:
+        data['caja'] = evento['caja']
+
+
+def cargar(ruta_snapshot, ruta_diario, ruta_ventas=None, ruta_archivo=None):
+    """Cargar snapshot y reproducir el diario encima
+
+    Devuelve el estado con 'eventos_pendientes', el número de eventos del
+    diario que todavía no están en el snapshot, 'agregados' como objeto
+    Agregados (o None si el snapshot no los tenía) y 'ventas_diarias' como
+    HistorialVentas sobre el directorio de particiones y el de archivo.
+    """
+    data = leer_snapshot(ruta_snapshot)
+    if data['agregados'] is not None:
+        data['agregados'] = Agregados.desde_dict(data['agregados'])
+    historial = HistorialVentas(DirectorioParticiones(ruta_ventas or directorio_ventas(ruta_snapshot)),
+                                ArchivoVentas(ruta_archivo or directorio_archivo(ruta_snapshot)))
+    for venta in data['ventas_diarias']:
+        # Snapshot viejo con las ventas dentro: pasan a las particiones
+        historial.append(venta)
+    data['ventas_diarias'] = historial
+    indice = {item.get('ID'): i for i, item in enumerate(data['inventario'])}
+
+    pendientes = 0
+    for evento in leer_diario(ruta_diario):
+        # Eventos ya incluidos en el snapshot (checkpoint interrumpido)
+        if evento.get('seq', 0) <= data['secuencia']:
+            continue
+        aplicar_evento(data, evento, indice)
+        data['secuencia'] = evento['seq']
+        pendientes += 1
+
+    data['eventos_pendientes'] = pendientes
+    return data
+
+
+def version_archivo(ruta):
+    """(mtime, tamaño) del archivo, o None si no existe"""
+    try:
+        info = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
+
+
+def leer_generacion(ruta):
+    """(escrituras, checkpoints) del archivo de generación; (0, 0) si no existe"""
+    try:
+        with open(ruta, 'rb') as f:
+            escrituras, checkpoints = f.read(41).split()
+        return int(escrituras), int(checkpoints)
+    except (FileNotFoundError, ValueError):
+        return 0, 0
+
+
+def escribir_generacion(ruta, generacion):
+    """Sobrescribir la generación en su lugar, con ancho fijo (quien lee sin bloqueo nunca la ve vacía)"""
+    fd = os.open(ruta, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, b'%020d %020d' % generacion)
+    finally:
+        os.close(fd)
+
+
+def anexar_evento(ruta_diario, evento):
+    """Anexar un evento como una línea JSON al final del diario"""
+    with open(ruta_diario, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(evento, ensure_ascii=False, separators=(',', ':')) + '\n')
+        f.flush()
+
+
+def guardar_ventas(ruta_ventas, ventas_diarias, secuencia):
+    """Escribir en disco los meses de ventas que cambiaron
+
+    Un historial que no viene de ese directorio (una lista, otro almacén)
+    reemplaza todos los meses guardados.
+    """
+    if isinstance(ventas_diarias, list):
+        ventas_diarias = HistorialVentas.desde_lista(ventas_diarias)
+    fuente = ventas_diarias.fuente
+    if isinstance(fuente, DirectorioParticiones) and os.path.abspath(fuente.directorio) == os.path.abspath(ruta_ventas):
+        ventas_diarias.guardar(secuencia)
+    else:
+        ventas_diarias.guardar_en(DirectorioParticiones(ruta_ventas), secuencia)
+
+
+def escribir_atomico(ruta, texto):
+    """Escribir un archivo completo (texto o bytes) vía temporal + fsync + rename: nunca queda a medias"""
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(texto.encode('utf-8') if isinstance(texto, str) else texto)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def datos_snapshot(inventario, caja, secuencia, agregados=None):
+    """Contenido del snapshot; 'agregados' como dict (Agregados.a_dict)"""
+    return {
+        'inventario': inventario,
+        'caja': caja,
+        'agregados': agregados,
+        'secuencia': secuencia,
+        'schema_version': ESQUEMA_VERSION,
+        'ultima_actualizacion': datetime.now().isoformat()
+    }
+
+
+def texto_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def contenido_snapshot(data, formato='json', compresion=None):
+    """Texto JSON o bytes del snapshot binario (ver snapshot_binario.py)"""
+    if formato == 'binario':
+        return snapshot_binario.codificar(data, compresion)
+    return texto_json(data)
+
+
+def recortar_diario(ruta_diario, secuencia):
+    """Dejar en el diario solo los eventos posteriores a 'secuencia'; devuelve cuántos quedan"""
+    eventos = [evento for evento in leer_diario(ruta_diario) if evento.get('seq', 0) > secuencia]
+    escribir_atomico(ruta_diario, ''.join(texto_json(evento) + '\n' for evento in eventos))
+    return len(eventos)
+
+
+def checkpoint(ruta_snapshot, ruta_diario, inventario, ventas_diarias, caja, secuencia, agregados=None,
+               ruta_ventas=None, formato='json', compresion=None):
+    """Volcar el estado completo al snapshot y vaciar el diario"""
+    # Primero las ventas: cada mes recuerda hasta qué secuencia incluye
+    guardar_ventas(ruta_ventas or directorio_ventas(ruta_snapshot), ventas_diarias, secuencia)
+    data = datos_snapshot(inventario, caja, secuencia, agregados.a_dict() if agregados is not None else None)
+    escribir_atomico(ruta_snapshot, contenido_snapshot(data, formato, compresion))
+
+    # El snapshot ya contiene todo hasta 'secuencia'; si el proceso muere
+    # antes de vaciar el diario, esos eventos se saltan al recargar.
+    if os.path.exists(ruta_diario):
+        with open(ruta_diario, 'w', encoding='utf-8'):
+            pass
+
+
+# ============================================
+# BLOQUEO ENTRE PROCESOS
+# ============================================
+def _bloquear_archivo(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            # LK_LOCK se rinde tras ~10 s; se sigue esperando
+            pass
+
+
+def _desbloquear_archivo(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class BloqueoArchivo:
+    """Lock exclusivo entre hilos y procesos sobre un archivo '.lock'
+
+    Se usa con 'with'. Es reentrante en el mismo hilo: solo la entrada más
+    externa toma el lock del archivo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._hilos = threading.RLock()
+        self._profundidad = 0
+        self._archivo = None
+
+    def __enter__(self):
+        self._hilos.acquire()
+        if self._profundidad == 0:
+            try:
+                self._archivo = open(self.ruta, 'a+b')
+                _bloquear_archivo(self._archivo)
+            except BaseException:
+                if self._archivo is not None:
+                    self._archivo.close()
+                    self._archivo = None
+                self._hilos.release()
+                raise
+        self._profundidad += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._profundidad -= 1
+        if self._profundidad == 0:
+            try:
+                _desbloquear_archivo(self._archivo)
+            finally:
+                self._archivo.close()
+                self._archivo = None
+        self._hilos.release()
+
+
+# ============================================
+# ALMACENES
+# ============================================
+class AlmacenJSON:
+    """Snapshot (JSON o binario) + diario de eventos"""
+
+    def __init__(self, ruta_snapshot, ruta_diario, ruta_ventas=None, ruta_archivo=None, formato='json',
+                 compresion=None):
+        if formato not in FORMATOS_SNAPSHOT:
+            raise ValueError(f"Formato de snapshot desconocido: {formato}")
+        if compresion not in snapshot_binario.COMPRESIONES or (compresion and formato != 'binario'):
+            raise ValueError(f"Compresión no soportada para el snapshot {formato}: {compresion}")
+        self.ruta_snapshot = ruta_snapshot
+        # Formato en que se escriben los checkpoints; se lee el que haya en disco
+        self.formato = formato
+        self.compresion = compresion
+        self.ruta_diario = ruta_diario
+        self.ruta_ventas = ruta_ventas or directorio_ventas(ruta_snapshot)
+        # Meses cerrados (ver Inventario.cerrar_periodo)
+        self.archivo = ArchivoVentas(ruta_archivo or directorio_archivo(ruta_snapshot))
+        self.secuencia = 0
+        self.eventos_pendientes = 0
+        # [(id_anterior, id_nuevo, producto)] de la última carga (ver reparar_duplicados)
+        self.ids_reparados = []
+        self._lock = threading.Lock()
+        self.bloqueo = BloqueoArchivo(ruta_snapshot + '.lock')
+        # Contadores de escrituras y checkpoints de todos los procesos: mtime y
+        # tamaño solos pueden repetirse tras recortar el diario
+        self.ruta_generacion = ruta_snapshot + '.version'
+
+    def cargar(self):
+        """Devolver {'inventario', 'ventas_diarias', 'caja'}"""
+        # Con el bloqueo: otro proceso puede estar a mitad de un checkpoint
+        with self.bloqueo:
+            return self._cargar()
+
+    def _cargar(self):
+        data = cargar(self.ruta_snapshot, self.ruta_diario, self.ruta_ventas, self.archivo.directorio)
+        with self._lock:
+            # El diario puede traer eventos de otros procesos: la secuencia sigue desde ahí
+            self.secuencia = max(self.secuencia, data['secuencia'])
+            self.eventos_pendientes = data['eventos_pendientes']
+
+        if data['schema_version'] < ESQUEMA_VERSION:
+            # Migrar una sola vez y dejarlo registrado en el snapshot
+            historial = data['ventas_diarias']
+            data['inventario'] = [migrar_producto(item) for item in data['inventario']]
+            # Ventas sin producto_id: se completan por descripción cuando no es ambigua
+            historial.completar_producto_id(ids_por_descripcion(data['inventario']))
+            data['agregados'] = Agregados.desde_cero(data['inventario'], historial,
+                                                     historial.resumenes_archivados())
+            self.guardar(data['inventario'], historial, data['caja'], data['agregados'])
+            data['schema_version'] = ESQUEMA_VERSION
+
+        self.ids_reparados = reparar_duplicados(data['inventario'])
+        if self.ids_reparados:
+            # IDs repetidos del formato anterior (solo con el segundo): se guardan ya reasignados
+            self.guardar(data['inventario'], data['ventas_diarias'], data['caja'], data['agregados'])
+        return data
+
+    def version(self):
+        """Cambia cada vez que el snapshot o el diario cambian en disco"""
+        return (leer_generacion(self.ruta_generacion),
+                version_archivo(self.ruta_snapshot), version_archivo(self.ruta_diario))
+
+    def _marcar_escritura(self, checkpoint=False):
+        """Avanzar la generación; con el bloqueo tomado"""
+        escrituras, checkpoints = leer_generacion(self.ruta_generacion)
+        escribir_generacion(self.ruta_generacion, (escrituras + 1, checkpoints + int(checkpoint)))
+
+    def guardar(self, inventario, ventas_diarias, caja, agregados=None):
+        """Guardar el estado completo (checkpoint)"""
+        with self.bloqueo, self._lock:
+            checkpoint(self.ruta_snapshot, self.ruta_diario, inventario, ventas_diarias, caja,
+                       self.secuencia, agregados, self.ruta_ventas, self.formato, self.compresion)
+            self.eventos_pendientes = 0
+            self._marcar_escritura(checkpoint=True)
+
+    def _anexar(self, evento):
+        with self.bloqueo, self._lock:
+            self.secuencia += 1
+            evento['seq'] = self.secuencia
+            anexar_evento(self.ruta_diario, evento)
+            self.eventos_pendientes += 1
+            self._marcar_escritura()
+
+    # Los agregados no viajan en el diario: se recalculan al reproducirlo
+    def guardar_producto(self, producto, agregados=None):
+        """Alta o cambio de un producto"""
+        self._anexar({'tipo': 'producto', 'producto': producto})
+
+    def guardar_venta(self, producto, venta, caja, agregados=None):
+        """Venta: producto actualizado + registro de venta + caja"""
+        self._anexar({'tipo': 'venta', 'producto': producto, 'venta': venta, 'caja': caja})
+
+    def guardar_productos(self, productos, agregados=None):
+        """Altas o cambios de varios productos: una sola línea en el diario"""
+        self._anexar({'tipo': 'productos', 'productos': productos})
+
+    def guardar_ventas(self, productos, ventas, caja, agregados=None):
+        """Varias ventas juntas, 'ventas' como pares (ID, venta): una sola línea en el diario, todo o nada"""
+        self._anexar({'tipo': 'ventas', 'productos': productos,
+                      'ventas': [venta for _, venta in ventas], 'caja': caja})
+
+    def eliminar_producto(self, producto_id, caja, agregados=None):
+        """Baja de un producto y caja resultante"""
+        self._anexar({'tipo': 'baja', 'id': producto_id, 'caja': caja})
+
+    def necesita_checkpoint(self):
+        """True cuando el diario ya es lo bastante largo para volcarlo"""
+        return self.eventos_pendientes >= DIARIO_MAX_EVENTOS
+
+    # Checkpoint en tres pasos para hacerlo en segundo plano (ver escritor.py):
+    # copiar el estado con el bloqueo tomado, serializar y escribir el
+    # temporal sin bloquear a nadie, y con el bloqueo otra vez poner el
+    # snapshot en su lugar y recortar del diario lo que ya quedó incluido.
+    def preparar_checkpoint(self, inventario, ventas_diarias, caja, agregados=None):
+        """Copia del estado hasta la secuencia actual; escribe ya los meses de ventas"""
+        with self.bloqueo, self._lock:
+            guardar_ventas(self.ruta_ventas, ventas_diarias, self.secuencia)
+            return {
+                'data': datos_snapshot([dict(item) for item in inventario], caja, self.secuencia,
+                                       copy.deepcopy(agregados.a_dict()) if agregados is not None else None),
+                'checkpoints': leer_generacion(self.ruta_generacion)[1],
+                'temporal': self.ruta_snapshot + '.checkpoint'
+            }
+
+    def escribir_checkpoint(self, pendiente):
+        """Serializar la copia al archivo temporal (la parte lenta, sin bloqueo)"""
+        data = pendiente['data']
+        if self.formato == 'binario':
+            # Columnas de NumPy; la compresión (zlib/zstd) suelta el GIL
+            with open(pendiente['temporal'], 'wb') as f:
+                f.write(snapshot_binario.codificar(data, self.compresion))
+                f.flush()
+                os.fsync(f.fileno())
+            return
+        resto = {clave: valor for clave, valor in data.items() if clave != 'inventario'}
+        with open(pendiente['temporal'], 'w', encoding='utf-8') as f:
+            # Producto por producto: un solo json.dumps del catálogo retiene el
+            # GIL todo el tiempo y los clics de las sesiones esperarían igual
+            f.write('{"inventario":[')
+            for i, item in enumerate(data['inventario']):
+                if i:
+                    f.write(',')
+                f.write(texto_json(item))
+            f.write('],' + texto_json(resto)[1:])
+            f.flush()
+            os.fsync(f.fileno())
+
+    def completar_checkpoint(self, pendiente):
+        """Reemplazar el snapshot y recortar el diario; False si otro guardado se adelantó"""
+        with self.bloqueo, self._lock:
+            if leer_generacion(self.ruta_generacion)[1] != pendiente['checkpoints']:
+                # Otro checkpoint ya reemplazó el snapshot: esta copia es vieja
+                os.remove(pendiente['temporal'])
+                return False
+            os.replace(pendiente['temporal'], self.ruta_snapshot)
+            self.eventos_pendientes = recortar_diario(self.ruta_diario, pendiente['data']['secuencia'])
+            self._marcar_escritura(checkpoint=True)
+            return True
+
+
+def _mes_siguiente(mes):
+    """'2024-12' -> '2025-01'"""
+    anio, numero = int(mes[:4]), int(mes[5:7])
+    return f"{anio + numero // 12:04d}-{numero % 12 + 1:02d}"
+
+
+class VentasSQLite:
+    """Lectura por mes de la tabla 'ventas' para HistorialVentas
+
+    Solo ve las filas que existían al cargar: las ventas posteriores ya
+    están en el historial en memoria y no deben leerse dos veces.
+    """
+
+    # Mes de la fecha ISO, como mes_de() en historial.py
+    MES = ("CASE WHEN fecha GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' "
+           f"THEN substr(fecha, 1, 7) ELSE '{MES_SIN_FECHA}' END")
+
+    def __init__(self, almacen, ultimo_id):
+        self.almacen = almacen
+        self.ultimo_id = ultimo_id
+
+    def meses(self):
+        with self.almacen._lock:
+            return [fila[0] for fila in self.almacen._conn.execute(
+                f"SELECT DISTINCT {self.MES} FROM ventas WHERE id <= ?", (self.ultimo_id,))]
+
+    def leer(self, mes):
+        if mes == MES_SIN_FECHA:
+            condicion, parametros = f"{self.MES} = ?", (mes,)
+        else:
+            # Rango sobre el índice de fecha
+            condicion, parametros = "fecha >= ? AND fecha < ?", (mes, _mes_siguiente(mes))
+        particion = ParticionVentas(mes)
+        with self.almacen._lock:
+            filas = self.almacen._conn.execute(
+                f"SELECT * FROM ventas WHERE {condicion} AND id <= ? ORDER BY id",
+                parametros + (self.ultimo_id,)
+            ).fetchall()
+        for fila in filas:
+            particion.agregar({col: fila[col] for col in ['producto_id'] + COLUMNAS_VENTA})
+        return particion
+
+
+class AlmacenSQLite:
+    """Tablas 'productos' y 'ventas' en SQLite (modo WAL)"""
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS productos (
+            ID TEXT PRIMARY KEY,
+            Categoria TEXT,
+            Producto TEXT,
+            Talla TEXT,
+            Color TEXT,
+            Ubicacion TEXT,
+            Entrada_Total INTEGER,
+            Stock_Bodega INTEGER,
+            Stock_Exhibido INTEGER,
+            Stock_Total INTEGER,
+            Ventas_Total INTEGER,
+            Precio_Sugerido REAL,
+            Precio_Venta REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos (Categoria);
+        CREATE INDEX IF NOT EXISTS idx_productos_ubicacion ON productos (Ubicacion);
+
+        CREATE TABLE IF NOT EXISTS ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            producto_id TEXT,
+            fecha TEXT,
+            producto TEXT,
+            talla TEXT,
+            precio_sugerido REAL,
+            precio_venta REAL,
+            categoria TEXT,
+            ubicacion TEXT,
+            ubicacion_venta TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha);
+        CREATE INDEX IF NOT EXISTS idx_ventas_producto_id ON ventas (producto_id);
+        CREATE INDEX IF NOT EXISTS idx_ventas_categoria ON ventas (categoria);
+
+        CREATE TABLE IF NOT EXISTS meta (
+            clave TEXT PRIMARY KEY,
+            valor TEXT
+        );
+    """
+
+    # Ventas importadas sin producto_id: el del único producto con esa
+    # descripción (como identificadores.ids_por_descripcion). Se hace una
+    # sola vez por base: la versión del esquema queda en 'meta'.
+    COMPLETAR_PRODUCTO_ID = """
+        UPDATE ventas SET producto_id = (
+            SELECT p.ID FROM productos p
+            WHERE p.Producto = ventas.producto AND p.Talla = ventas.talla AND p.Categoria = ventas.categoria
+        )
+        WHERE producto_id IS NULL AND (
+            SELECT COUNT(*) FROM productos p
+            WHERE p.Producto = ventas.producto AND p.Talla = ventas.talla AND p.Categoria = ventas.categoria
+        ) = 1
+    """
+
+    def __init__(self, ruta, ruta_archivo=None):
+        self.ruta = ruta
+        # Meses cerrados: fuera de la tabla, en archivos (ver Inventario.cerrar_periodo)
+        self.archivo = ArchivoVentas(ruta_archivo or directorio_archivo(ruta))
+        # Streamlit atiende cada rerun en un hilo distinto; la conexión se
+        # comparte y las escrituras se serializan con el lock.
+        self._conn = sqlite3.connect(ruta, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        # SQLite ya serializa cada transacción; este bloqueo cubre la
+        # lectura-verificación-escritura de una operación completa
+        self.bloqueo = BloqueoArchivo(ruta + '.lock')
+        self._escrituras = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(self.ESQUEMA)
+            with self._conn:
+                fila = self._conn.execute("SELECT valor FROM meta WHERE clave = 'schema_version'").fetchone()
+                if fila is None or int(fila['valor']) < ESQUEMA_VERSION:
+                    # Las ventas que no se pueden asignar se quedan sin producto_id: no se reintentan
+                    self._conn.execute(self.COMPLETAR_PRODUCTO_ID)
+                    self._guardar_meta('schema_version', str(ESQUEMA_VERSION))
+
+    def cargar(self):
+        """Devolver {'inventario', 'ventas_diarias', 'caja'}"""
+        with self._lock:
+            inventario = [
+                {col: fila[col] for col in COLUMNAS_PRODUCTO}
+                for fila in self._conn.execute("SELECT * FROM productos ORDER BY rowid")
+            ]
+            ultimo_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM ventas").fetchone()[0]
+            meta = {fila['clave']: fila['valor'] for fila in self._conn.execute("SELECT * FROM meta")}
+        return {
+            'inventario': inventario,
+            # Las ventas se leen por mes al consultarlas
+            'ventas_diarias': HistorialVentas(VentasSQLite(self, ultimo_id), self.archivo),
+            'caja': float(meta.get('caja', 0.0)),
+            'agregados': Agregados.desde_dict(json.loads(meta['agregados'])) if 'agregados' in meta else None
+        }
+
+    def version(self):
+        """Cambia con cada escritura propia o de otra conexión"""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (self._escrituras, data_version)
+
+    def _upsert_producto(self, producto):
+        columnas = ', '.join(COLUMNAS_PRODUCTO)
+        marcas = ', '.join('?' for _ in COLUMNAS_PRODUCTO)
+        cambios = ', '.join(f"{col} = excluded.{col}" for col in COLUMNAS_PRODUCTO[1:])
+        self._conn.execute(
+            f"INSERT INTO productos ({columnas}) VALUES ({marcas}) "
+            f"ON CONFLICT(ID) DO UPDATE SET {cambios}",
+            [producto.get(col) for col in COLUMNAS_PRODUCTO]
+        )
+
+    def _insertar_venta(self, producto_id, venta):
+        self._conn.execute(
+            f"INSERT INTO ventas (producto_id, {', '.join(COLUMNAS_VENTA)}) "
+            f"VALUES (?, {', '.join('?' for _ in COLUMNAS_VENTA)})",
+            [producto_id] + [venta.get(col) for col in COLUMNAS_VENTA]
+        )
+
+    def _guardar_meta(self, clave, valor):
+        self._conn.execute(
+            "INSERT INTO meta (clave, valor) VALUES (?, ?) "
+            "ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor",
+            (clave, valor)
+        )
+
+    def _guardar_agregados(self, agregados):
+        if agregados is not None:
+            self._guardar_meta('agregados', json.dumps(agregados.a_dict(), ensure_ascii=False))
+
+    def guardar(self, inventario, ventas_diarias, caja, agregados=None):
+        """Reemplazar el estado completo en una sola transacción"""
+        if isinstance(ventas_diarias, list):
+            ventas_diarias = HistorialVentas.desde_lista(ventas_diarias)
+        # Leer las ventas antes de borrar (pueden venir de esta misma base),
+        # en columnas por mes y no como un dict por venta
+        particiones = list(ventas_diarias.particiones())
+        columnas = ', '.join(['producto_id'] + COLUMNAS_VENTA)
+        marcas = ', '.join('?' for _ in range(len(COLUMNAS_VENTA) + 1))
+        with self._lock, self._conn:
+            self._escrituras += 1
+            self._conn.execute("DELETE FROM productos")
+            for producto in inventario:
+                self._upsert_producto(producto)
+            self._conn.execute("DELETE FROM ventas")
+            for particion in particiones:
+                self._conn.executemany(
+                    f"INSERT INTO ventas ({columnas}) VALUES ({marcas})",
+                    ([venta.get('producto_id')] + [venta.get(col) for col in COLUMNAS_VENTA]
+                     for venta in particion)
+                )
+            self._guardar_meta('caja', str(caja))
+            self._guardar_agregados(agregados)
+
+    # Los agregados se guardan en la misma transacción que el cambio
+    def guardar_producto(self, producto, agregados=None):
+        """Alta o cambio de un producto"""
+        with self._lock, self._conn:
+            self._escrituras += 1
+            self._upsert_producto(producto)
+            self._guardar_agregados(agregados)
+
+    def guardar_venta(self, producto, venta, caja, agregados=None):
+        """Venta: producto actualizado + registro de venta + caja"""
+        with self._lock, self._conn:
+            self._escrituras += 1
+            self._upsert_producto(producto)
+            self._insertar_venta(producto['ID'], venta)
+            self._guardar_meta('caja', str(caja))
+            self._guardar_agregados(agregados)
+
+    def guardar_productos(self, productos, agregados=None):
+        """Altas o cambios de varios productos en una sola transacción"""
+        with self._lock, self._conn:
+            self._escrituras += 1
+            for producto in productos:
+                self._upsert_producto(producto)
+            self._guardar_agregados(agregados)
+
+    def guardar_ventas(self, productos, ventas, caja, agregados=None):
+        """Varias ventas juntas, 'ventas' como pares (ID, venta), en una sola transacción"""
+        with self._lock, self._conn:
+            self._escrituras += 1
+            for producto in productos:
+                self._upsert_producto(producto)
+            for producto_id, venta in ventas:
+                self._insertar_venta(producto_id, venta)
+            self._guardar_meta('caja', str(caja))
+            self._guardar_agregados(agregados)
+
+    def eliminar_producto(self, producto_id, caja, agregados=None):
+        """Baja de un producto y caja resultante"""
+        with self._lock, self._conn:
+            self._escrituras += 1
+            self._conn.execute("DELETE FROM productos WHERE ID = ?", (producto_id,))
+            self._guardar_meta('caja', str(caja))
+            self._guardar_agregados(agregados)
+
+    def necesita_checkpoint(self):
+        """SQLite persiste cada operación; no hay checkpoint que hacer"""
+        return False
+
+
+def crear_almacen(tipo, ruta_snapshot, ruta_diario, ruta_sqlite, ruta_ventas=None, ruta_archivo=None,
+                  formato='json', compresion=None):
+    """Crear el almacén configurado ('json' o 'sqlite'); 'formato' y 'compresion' son los del snapshot"""
+    if tipo == 'sqlite':
+        if not os.path.exists(ruta_sqlite) and os.path.exists(ruta_snapshot):
+            # Primera vez con SQLite: traer los datos del JSON existente
+            importar_json_a_sqlite(ruta_snapshot, ruta_diario, ruta_sqlite, ruta_ventas, ruta_archivo)
+        return AlmacenSQLite(ruta_sqlite, ruta_archivo)
+    if tipo == 'json':
+        return AlmacenJSON(ruta_snapshot, ruta_diario, ruta_ventas, ruta_archivo, formato, compresion)
+    raise ValueError(f"Almacén desconocido: {tipo}")
+
+
+def importar_json_a_sqlite(ruta_snapshot, ruta_diario, ruta_sqlite, ruta_ventas=None, ruta_archivo=None):
+    """Copiar snapshot + diario JSON a una base SQLite; devuelve (productos, ventas)
+
+    Los meses cerrados no entran a la base: si los dos almacenes no
+    comparten directorio de archivo, se copia.
+    """
+    origen = AlmacenJSON(ruta_snapshot, ruta_diario, ruta_ventas, ruta_archivo)
+    data = origen.cargar()
+    historial = data['ventas_diarias']
+    agregados = Agregados.desde_cero(data['inventario'], historial, historial.resumenes_archivados())
+    destino = AlmacenSQLite(ruta_sqlite, ruta_archivo)
+    if (os.path.isdir(origen.archivo.directorio)
+            and os.path.abspath(origen.archivo.directorio) != os.path.abspath(destino.archivo.directorio)):
+        shutil.copytree(origen.archivo.directorio, destino.archivo.directorio, dirs_exist_ok=True)
+    destino.guardar(data['inventario'], historial, data['caja'], agregados)
+    return len(data['inventario']), len(historial)
+
+
+def verificar_agregados(almacen, reparar=False):
+    """Comparar los agregados guardados con los recalculados desde cero
+
+    Devuelve la lista de diferencias (vacía si coinciden). Con reparar=True
+    se guardan los recalculados en lugar de los anteriores.
+    """
+    data = almacen.cargar()
+    historial = data['ventas_diarias']
+    recalculados = Agregados.desde_cero(data['inventario'], historial, historial.resumenes_archivados())
+    guardados = data.get('agregados')
+    if guardados is None:
+        diferencias = ["no hay agregados guardados"]
+    else:
+        diferencias = guardados.diferencias(recalculados)
+
+    if diferencias and reparar:
+        almacen.guardar(data['inventario'], data['ventas_diarias'], data['caja'], recalculados)
+    return diferencias
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Herramientas de almacenamiento del inventario")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    imp = sub.add_parser('importar-sqlite', help="Importar los archivos JSON a SQLite")
+    imp.add_argument('--json', default=RUTA_SNAPSHOT)
+    imp.add_argument('--diario', default=RUTA_DIARIO)
+    imp.add_argument('--db', default=RUTA_SQLITE)
+    imp.add_argument('--ventas', default=RUTA_VENTAS, help="Directorio de ventas por mes")
+    imp.add_argument('--archivo', default=RUTA_ARCHIVO, help="Directorio de meses cerrados")
+
+    ver = sub.add_parser('verificar-agregados',
+                         help="Recalcular los agregados desde cero y compararlos con los guardados")
+    ver.add_argument('--almacen', choices=['json', 'sqlite'],
+                     default=os.environ.get('INVENTARIO_ALMACEN', 'json'))
+    ver.add_argument('--json', default=RUTA_SNAPSHOT)
+    ver.add_argument('--diario', default=RUTA_DIARIO)
+    ver.add_argument('--db', default=RUTA_SQLITE)
+    ver.add_argument('--ventas', default=RUTA_VENTAS, help="Directorio de ventas por mes")
+    ver.add_argument('--archivo', default=RUTA_ARCHIVO, help="Directorio de meses cerrados")
+    ver.add_argument('--reparar', action='store_true', help="Guardar los agregados recalculados")
+
+    rep = sub.add_parser('reparar-ids', help="Dar IDs nuevos a los productos con ID repetido")
+    rep.add_argument('--json', default=RUTA_SNAPSHOT)
+    rep.add_argument('--diario', default=RUTA_DIARIO)
+    rep.add_argument('--ventas', default=RUTA_VENTAS, help="Directorio de ventas por mes")
+    rep.add_argument('--archivo', default=RUTA_ARCHIVO, help="Directorio de meses cerrados")
+
+    cer = sub.add_parser('cerrar-periodo', help="Archivar las ventas de los meses anteriores al actual")
+    cer.add_argument('--almacen', choices=['json', 'sqlite'],
+                     default=os.environ.get('INVENTARIO_ALMACEN', 'json'))
+    cer.add_argument('--json', default=RUTA_SNAPSHOT)
+    cer.add_argument('--diario', default=RUTA_DIARIO)
+    cer.add_argument('--db', default=RUTA_SQLITE)
+    cer.add_argument('--ventas', default=RUTA_VENTAS, help="Directorio de ventas por mes")
+    cer.add_argument('--archivo', default=RUTA_ARCHIVO, help="Directorio de meses cerrados")
+    cer.add_argument('--hasta', default=None, help="Cerrar los meses anteriores al de esta fecha (AAAA-MM-DD)")
+
+    con = sub.add_parser('convertir-snapshot', help="Reescribir el snapshot en otro formato (JSON o binario)")
+    con.add_argument('--json', default=RUTA_SNAPSHOT, help="Snapshot (se lee en cualquier formato)")
+    con.add_argument('--diario', default=RUTA_DIARIO)
+    con.add_argument('--ventas', default=RUTA_VENTAS, help="Directorio de ventas por mes")
+    con.add_argument('--archivo', default=RUTA_ARCHIVO, help="Directorio de meses cerrados")
+    con.add_argument('--formato', choices=FORMATOS_SNAPSHOT, required=True)
+    con.add_argument('--compresion', choices=['gzip', 'zstd'], default=None, help="Solo para el formato binario")
+
+    args = parser.parse_args()
+    if args.comando == 'importar-sqlite':
+        productos, ventas = importar_json_a_sqlite(args.json, args.diario, args.db, args.ventas, args.archivo)
+        print(f"Importados {productos} productos y {ventas} ventas a {args.db}")
+    elif args.comando == 'verificar-agregados':
+        almacen = crear_almacen(args.almacen, args.json, args.diario, args.db, args.ventas, args.archivo)
+        diferencias = verificar_agregados(almacen, reparar=args.reparar)
+        if not diferencias:
+            print("Agregados correctos")
+        else:
+            print(f"{len(diferencias)} diferencias:")
+            for diferencia in diferencias:
+                print(f"  {diferencia}")
+            if args.reparar:
+                print("Agregados reconstruidos y guardados")
+        raise SystemExit(1 if diferencias and not args.reparar else 0)
+    elif args.comando == 'reparar-ids':
+        # AlmacenJSON repara los IDs al cargar
+        almacen = AlmacenJSON(args.json, args.diario, args.ventas, args.archivo)
+        almacen.cargar()
+        cambios = almacen.ids_reparados
+        if not cambios:
+            print("No hay IDs repetidos")
+        else:
+            for anterior, nuevo, producto in cambios:
+                print(f"  {anterior} -> {nuevo}  ({producto.get('Producto')} {producto.get('Talla')} {producto.get('Color')})")
+            print(f"{len(cambios)} IDs reasignados")
+    elif args.comando == 'cerrar-periodo':
+        from inventario import Inventario
+        inv = Inventario(crear_almacen(args.almacen, args.json, args.diario, args.db, args.ventas, args.archivo))
+        ok, mensaje = inv.cerrar_periodo(args.hasta)
+        print(mensaje)
+    elif args.comando == 'convertir-snapshot':
+        # El checkpoint vacía el diario en el directorio de ventas y lo recorta:
+        # con un directorio equivocado esas ventas dejarían de verse
+        if not os.path.isdir(args.ventas) and leer_diario(args.diario):
+            raise SystemExit(f"No existe el directorio de ventas {args.ventas} y el diario {args.diario} "
+                             f"tiene eventos pendientes; indique el correcto con --ventas")
+        try:
+            almacen = AlmacenJSON(args.json, args.diario, args.ventas, args.archivo, formato=args.formato,
+                                  compresion=args.compresion)
+            antes = os.path.getsize(args.json) if os.path.exists(args.json) else 0
+            # El checkpoint deja el diario incluido en el snapshot nuevo
+            data = almacen.cargar()
+            almacen.guardar(data['inventario'], data['ventas_diarias'], data['caja'], data['agregados'])
+        except (ValueError, snapshot_binario.ErrorSnapshot) as e:
+            raise SystemExit(str(e))
+        print(f"{args.json}: {antes:,} -> {os.path.getsize(args.json):,} bytes ({args.formato}"
+              f"{', ' + args.compresion if args.compresion else ''})")
@@ -0,0 +1,311 @@
+"""API HTTP/JSON local para cajas y lectores de código de barras
+
+Un proceso aparte de la app de Streamlit que trabaja sobre el mismo almacén
+(mismos archivos y mismo bloqueo, ver inventario.py): lo que se vende por la
+API lo ve la app en su siguiente revisión de cambios, y al revés. Cada
+petición es una llamada directa a Inventario, sin rerun de ningún script.
+
+    python api.py [--host 127.0.0.1] [--puerto 8502] [--almacen json|sqlite]
+
+Rutas (entrada y salida en JSON):
+
+    GET  /productos/<id>                  producto completo
+    GET  /productos?buscar=texto&limite=N productos que coinciden (20 por omisión)
+    GET  /stock/<id>                      stock por ubicación de un producto
+    GET  /stock?ids=A,B,C                 stock de varios productos
+    POST /ventas        {"producto_id", "precio" (opcional)}
+    POST /ventas/lote   {"lineas": [{"producto_id", "cantidad", "precio"}]}
+    POST /stock/mover   {"producto_id", "cantidad", "origen", "destino"}
+
+Responde {"ok": true, ...} o {"ok": false, "error": mensaje} con 400 si la
+petición no es válida, 404 si el producto no existe y 409 si la operación
+no procede (sin stock). Si está definida INVENTARIO_API_TOKEN, cada
+petición debe traer 'Authorization: Bearer <token>'.
+"""
+import argparse
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import almacenamiento
+from inventario import Inventario
+
+# Campos de cada producto en las respuestas de stock
+CAMPOS_STOCK = ['ID', 'Producto', 'Talla', 'Color', 'Ubicacion', 'Stock_Bodega', 'Stock_Exhibido', 'Stock_Total']
+
+UBICACIONES = ['Bodega', 'Exhibido']
+
+# Resultados de búsqueda por omisión y máximo
+LIMITE_BUSQUEDA = 20
+LIMITE_BUSQUEDA_MAX = 200
+
+# Cuerpo máximo de una petición (un lote grande de ventas cabe de sobra)
+MAX_CUERPO = 1024 * 1024
+
+NO_ENCONTRADO = "Producto no encontrado"
+
+
+class ErrorPeticion(Exception):
+    """Petición que no se puede atender: se responde con 'estado' y el mensaje"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def stock(item):
+    return {campo: item.get(campo) for campo in CAMPOS_STOCK}
+
+
+def _producto(inventario, producto_id):
+    item = inventario.obtener(producto_id)
+    if item is None:
+        raise ErrorPeticion(404, NO_ENCONTRADO)
+    return item
+
+
+def _entero_positivo(valor, campo):
+    if isinstance(valor, bool) or not isinstance(valor, int) or valor <= 0:
+        raise ErrorPeticion(400, f"'{campo}' debe ser un entero mayor que 0")
+    return valor
+
+
+def _precio(valor):
+    """Precio opcional: None o un número mayor que 0"""
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor <= 0:
+        raise ErrorPeticion(400, "'precio' debe ser un número mayor que 0")
+    return float(valor)
+
+
+def _rechazo(mensaje):
+    """Operación de Inventario que devolvió éxito False"""
+    return ErrorPeticion(404 if mensaje == NO_ENCONTRADO else 409, mensaje)
+
+
+# ============================================
+# OPERACIONES
+# ============================================
+def consultar_producto(inventario, producto_id, consulta, cuerpo):
+    return {'producto': dict(_producto(inventario, producto_id))}
+
+
+def buscar_productos(inventario, producto_id, consulta, cuerpo):
+    texto = consulta.get('buscar', '')
+    try:
+        limite = min(int(consulta.get('limite', LIMITE_BUSQUEDA)), LIMITE_BUSQUEDA_MAX)
+    except ValueError:
+        raise ErrorPeticion(400, "'limite' debe ser un entero")
+    # Orden por ID para que la misma búsqueda dé siempre la misma página
+    ids = sorted(inventario.buscar(texto))
+    productos = [dict(item) for item in map(inventario.obtener, ids[:max(limite, 0)]) if item is not None]
+    return {'total': len(ids), 'productos': productos}
+
+
+def consultar_stock(inventario, producto_id, consulta, cuerpo):
+    return {'stock': stock(_producto(inventario, producto_id))}
+
+
+def consultar_stock_varios(inventario, producto_id, consulta, cuerpo):
+    ids = [pid for pid in consulta.get('ids', '').split(',') if pid]
+    if not ids:
+        raise ErrorPeticion(400, "Falta 'ids' (IDs separados por comas)")
+    encontrados, faltantes = [], []
+    for pid in ids:
+        item = inventario.obtener(pid)
+        if item is None:
+            faltantes.append(pid)
+        else:
+            encontrados.append(stock(item))
+    return {'stock': encontrados, 'no_encontrados': faltantes}
+
+
+def vender(inventario, producto_id, consulta, cuerpo):
+    producto_id = cuerpo.get('producto_id')
+    if not isinstance(producto_id, str):
+        raise ErrorPeticion(400, "Falta 'producto_id'")
+    ok, precio, ubicacion = inventario.registrar_venta(producto_id, _precio(cuerpo.get('precio')))
+    if not ok:
+        raise _rechazo(precio)
+    return {'precio': precio, 'ubicacion_venta': ubicacion, 'stock': stock(inventario.obtener(producto_id))}
+
+
+def vender_lote(inventario, producto_id, consulta, cuerpo):
+    lineas = cuerpo.get('lineas')
+    if not isinstance(lineas, list) or not lineas:
+        raise ErrorPeticion(400, "Falta 'lineas' (lista de {producto_id, cantidad, precio})")
+    validas = []
+    for linea in lineas:
+        if not isinstance(linea, dict) or not isinstance(linea.get('producto_id'), str):
+            raise ErrorPeticion(400, "Cada línea necesita 'producto_id'")
+        validas.append({'producto_id': linea['producto_id'],
+                        'cantidad': _entero_positivo(linea.get('cantidad', 1), 'cantidad'),
+                        'precio': _precio(linea.get('precio'))})
+    # Todo o nada: si una línea falla no se vende ninguna (ver registrar_ventas)
+    ok, total, unidades = inventario.registrar_ventas(validas)
+    if not ok:
+        raise ErrorPeticion(409, total)
+    ids = dict.fromkeys(linea['producto_id'] for linea in validas)
+    return {'total': total, 'unidades': unidades, 'stock': [stock(inventario.obtener(pid)) for pid in ids]}
+
+
+def mover(inventario, producto_id, consulta, cuerpo):
+    producto_id = cuerpo.get('producto_id')
+    if not isinstance(producto_id, str):
+        raise ErrorPeticion(400, "Falta 'producto_id'")
+    cantidad = _entero_positivo(cuerpo.get('cantidad'), 'cantidad')
+    origen, destino = cuerpo.get('origen'), cuerpo.get('destino')
+    if origen not in UBICACIONES or destino not in UBICACIONES or origen == destino:
+        raise ErrorPeticion(400, "'origen' y 'destino' deben ser 'Bodega' y 'Exhibido' (uno cada uno)")
+    ok, mensaje = inventario.mover_stock(producto_id, cantidad, origen, destino)
+    if not ok:
+        raise _rechazo(mensaje)
+    return {'mensaje': mensaje, 'stock': stock(inventario.obtener(producto_id))}
+
+
+# (método, recurso, con ID en la ruta) -> operación
+RUTAS = {
+    ('GET', 'productos', True): consultar_producto,
+    ('GET', 'productos', False): buscar_productos,
+    ('GET', 'stock', True): consultar_stock,
+    ('GET', 'stock', False): consultar_stock_varios,
+    ('POST', 'ventas', False): vender,
+    ('POST', 'ventas/lote', False): vender_lote,
+    ('POST', 'stock/mover', False): mover,
+}
+
+# Rutas de dos segmentos que no son recurso/ID
+RECURSOS_COMPUESTOS = {'ventas/lote', 'stock/mover'}
+
+
+# ============================================
+# SERVIDOR
+# ============================================
+class ManejadorAPI(BaseHTTPRequestHandler):
+    """Traduce cada petición HTTP a una operación de RUTAS"""
+
+    # Conexiones persistentes: una caja o lector manda muchas peticiones seguidas
+    protocol_version = 'HTTP/1.1'
+    # Cabeceras y cuerpo salen en dos escrituras: con Nagle la segunda espera
+    # el ACK retrasado del cliente (~40 ms por respuesta)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._atender('GET')
+
+    def do_POST(self):
+        self._atender('POST')
+
+    def _atender(self, metodo):
+        try:
+            cuerpo = self._leer_cuerpo()
+            if self.server.token and self.headers.get('Authorization') != f"Bearer {self.server.token}":
+                raise ErrorPeticion(401, "Token inválido o ausente")
+            operacion, producto_id, consulta = self._ruta(metodo)
+            inventario = self.server.inventario
+            # Las lecturas también ven lo que escribió otro proceso (la app u otra API)
+            inventario.sincronizar()
+            respuesta = operacion(inventario, producto_id, consulta, cuerpo)
+            self._responder(200, dict(ok=True, **respuesta))
+        except ErrorPeticion as e:
+            self._responder(e.estado, {'ok': False, 'error': str(e)})
+        except Exception as e:
+            self._responder(500, {'ok': False, 'error': f"Error interno: {str(e)}"})
+
+    def _leer_cuerpo(self):
+        largo = int(self.headers.get('Content-Length') or 0)
+        if largo > MAX_CUERPO:
+            # No se lee el cuerpo: la conexión no se puede reutilizar
+            self.close_connection = True
+            raise ErrorPeticion(413, "Petición demasiado grande")
+        if not largo:
+            return {}
+        try:
+            cuerpo = json.loads(self.rfile.read(largo))
+        except ValueError:
+            raise ErrorPeticion(400, "El cuerpo no es JSON válido")
+        if not isinstance(cuerpo, dict):
+            raise ErrorPeticion(400, "El cuerpo debe ser un objeto JSON")
+        return cuerpo
+
+    def _ruta(self, metodo):
+        """(operación, ID o None, parámetros de consulta) de la ruta pedida"""
+        partes = urlsplit(self.path)
+        segmentos = [unquote(s) for s in partes.path.strip('/').split('/') if s]
+        consulta = {clave: valores[-1] for clave, valores in parse_qs(partes.query).items()}
+        producto_id = None
+        if len(segmentos) == 2 and '/'.join(segmentos) in RECURSOS_COMPUESTOS:
+            recurso = '/'.join(segmentos)
+        elif len(segmentos) in (1, 2):
+            recurso = segmentos[0]
+            producto_id = segmentos[1] if len(segmentos) == 2 else None
+        else:
+            raise ErrorPeticion(404, "Ruta desconocida")
+        operacion = RUTAS.get((metodo, recurso, producto_id is not None))
+        if operacion is None:
+            if any(clave[1:] == (recurso, producto_id is not None) for clave in RUTAS):
+                raise ErrorPeticion(405, f"Método {metodo} no permitido en /{recurso}")
+            raise ErrorPeticion(404, "Ruta desconocida")
+        return operacion, producto_id, consulta
+
+    def _responder(self, estado, data):
+        contenido = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(contenido)))
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def log_message(self, formato, *args):
+        # Una línea por petición frena al servidor con muchas cajas; solo con --registro
+        if self.server.registro:
+            super().log_message(formato, *args)
+
+
+class ServidorAPI(ThreadingHTTPServer):
+    """Un hilo por conexión, todos sobre el mismo Inventario"""
+
+    daemon_threads = True
+
+    def __init__(self, direccion, inventario, token=None, registro=False):
+        super().__init__(direccion, ManejadorAPI)
+        self.inventario = inventario
+        self.token = token
+        self.registro = registro
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1', help="0.0.0.0 para aceptar cajas de la red local")
+    parser.add_argument('--puerto', type=int, default=8502)
+    # Los mismos archivos y variables que app.py, para compartir el almacén
+    parser.add_argument('--almacen', choices=['json', 'sqlite'], default=os.environ.get("INVENTARIO_ALMACEN", "json"))
+    parser.add_argument('--json', default=almacenamiento.RUTA_SNAPSHOT)
+    parser.add_argument('--diario', default=almacenamiento.RUTA_DIARIO)
+    parser.add_argument('--sqlite', default=almacenamiento.RUTA_SQLITE)
+    parser.add_argument('--ventas', default=almacenamiento.RUTA_VENTAS)
+    parser.add_argument('--archivo', default=almacenamiento.RUTA_ARCHIVO)
+    parser.add_argument('--registro', action='store_true', help="Escribir una línea por petición")
+    args = parser.parse_args()
+
+    almacen = almacenamiento.crear_almacen(args.almacen, args.json, args.diario, args.sqlite, args.ventas,
+                                           args.archivo, os.environ.get("INVENTARIO_FORMATO", "json"),
+                                           os.environ.get("INVENTARIO_COMPRESION") or None)
+    inventario = Inventario(almacen, escritura_diferida=True)
+    servidor = ServidorAPI((args.host, args.puerto), inventario,
+                           os.environ.get("INVENTARIO_API_TOKEN") or None, args.registro)
+    print(f"API del inventario en http://{args.host}:{servidor.server_port} ({args.almacen})", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        # Lo pendiente del checkpoint en segundo plano
+        inventario.cerrar()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,17 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime, timedelta
+from streamlit.errors import StreamlitAPIException
 import json
 import os
+import io
+import functools
+import almacenamiento
+import exportacion
+import importacion
+import perfilado
+from cache_lru import CacheLRU
+from inventario import Inventario, crear_nuevo_producto
 
 # ============================================
 # CONFIGURACIÓN
@@ -40,12 +49,6 @@ def obtener_todas_categorias():
 # Inicializar estados
 if 'admin_logged_in' not in st.session_state:
     st.session_state.admin_logged_in = False
-if 'inventario' not in st.session_state:
-    st.session_state.inventario = []
-if 'ventas_diarias' not in st.session_state:
-    st.session_state.ventas_diarias = []
-if 'caja' not in st.session_state:
-    st.session_state.caja = 0.0
 if 'modo_edicion' not in st.session_state:
     st.session_state.modo_edicion = None
 if 'producto_editar' not in st.session_state:
@@ -56,90 +59,120 @@ if 'modo_mover_stock' not in st.session_state:
     st.session_state.modo_mover_stock = None
 if 'producto_mover' not in st.session_state:
     st.session_state.producto_mover = None
+if 'pagina_ventas' not in st.session_state:
+    st.session_state.pagina_ventas = 0
+if 'filtros_ventas' not in st.session_state:
+    st.session_state.filtros_ventas = None
+if 'producto_abierto_ventas' not in st.session_state:
+    st.session_state.producto_abierto_ventas = None
+if 'carrito' not in st.session_state:
+    st.session_state.carrito = []
+if 'mostrar_exportar' not in st.session_state:
+    st.session_state.mostrar_exportar = False
 
 # Archivo para guardar datos
-INVENTARIO_FILE = "inventario_data.json"
+# (los mismos que usan api.py y las herramientas de línea de comandos)
+INVENTARIO_FILE = almacenamiento.RUTA_SNAPSHOT
+DIARIO_FILE = almacenamiento.RUTA_DIARIO
+VENTAS_DIR = almacenamiento.RUTA_VENTAS
+ARCHIVO_DIR = almacenamiento.RUTA_ARCHIVO
+SQLITE_FILE = almacenamiento.RUTA_SQLITE
 CATEGORIAS_FILE = "categorias_data.json"
 
+# Almacén de datos: 'json' (snapshot + diario) o 'sqlite'
+ALMACEN = os.environ.get("INVENTARIO_ALMACEN", "json")
+
+# Formato del snapshot del almacén JSON: 'json' o 'binario' (al leer se reconoce
+# cualquiera); el binario admite compresión 'gzip' o 'zstd'
+FORMATO_SNAPSHOT = os.environ.get("INVENTARIO_FORMATO", "json")
+COMPRESION_SNAPSHOT = os.environ.get("INVENTARIO_COMPRESION") or None
+
+# Segundos entre revisiones de cambios hechos por otras cajas (0 = no revisar)
+REFRESCO_SEGUNDOS = float(os.environ.get("INVENTARIO_REFRESCO_SEG", "5"))
+
+# Productos por página en "Registrar Ventas"
+TAMANOS_PAGINA_VENTAS = [10, 25, 50, 100]
+
+# Figuras y tablas ya armadas que se conservan (las usadas más recientemente)
+MAX_FIGURAS_EN_CACHE = 32
+MAX_TABLAS_EN_CACHE = 8
+
+# Secciones de la app (solo se dibuja la elegida)
+SECCIONES = {
+    'ventas': "🛍️ Registrar Ventas",
+    'reporte': "📊 Reporte y Caja",
+    'gestion': "⚙️ Gestión Inventario",
+}
+
+# Medir tiempos por etapa desde el inicio de cada sesión (también se prende en Gestión)
+PERFILAR = os.environ.get("INVENTARIO_PERFILAR", "0") == "1"
+
+if 'perfilador' not in st.session_state:
+    st.session_state.perfilador = perfilado.Perfilador(activo=PERFILAR)
+
+# ============================================
+# PERFILADO
+# ============================================
+def perfilador():
+    """Tiempos por etapa de los últimos reruns de esta sesión (ver perfilado.py)"""
+    return st.session_state.perfilador
+
+def medir(etapa):
+    """Medir un bloque de la interfaz: with medir("Tabla"): ..."""
+    return st.session_state.perfilador.medir(etapa)
+
+def rerun_propio(etapa):
+    """Para fragmentos: cada ejecución suelta del fragmento es un rerun del perfilador"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envuelto(*args, **kwargs):
+            perfilador().empezar_rerun(etapa)
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                perfilador().terminar_rerun()
+        return envuelto
+    return decorador
+
+def cronometrado(funcion):
+    """Medir cada llamada a una función de datos, con su nombre como etapa"""
+    @functools.wraps(funcion)
+    def envuelto(*args, **kwargs):
+        with medir(funcion.__name__):
+            return funcion(*args, **kwargs)
+    return envuelto
+
 # ============================================
 # FUNCIONES DE DATOS - MODIFICADAS
 # ============================================
-def crear_nuevo_producto(producto, talla, color, categoria, stock_bodega, stock_exhibido, precio_sugerido, precio_venta):
-    """Crear un nuevo producto especificando stock por ubicación"""
-    nuevo_id = f"PROD_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    
-    # Calcular totales
-    entrada_total = stock_bodega + stock_exhibido
-    stock_total = entrada_total
-    
-    # Determinar ubicación principal (donde haya más stock)
-    if stock_bodega > stock_exhibido:
-        ubicacion_principal = "Bodega"
-    elif stock_exhibido > stock_bodega:
-        ubicacion_principal = "Exhibido"
-    else:
-        # Si son iguales, poner en Exhibido por defecto
-        ubicacion_principal = "Exhibido"
-    
-    return {
-        'ID': nuevo_id,
-        'Categoria': categoria,
-        'Producto': producto,
-        'Talla': talla,
-        'Color': color,
-        'Ubicacion': ubicacion_principal,
-        'Entrada_Total': entrada_total,
-        'Stock_Bodega': stock_bodega,
-        'Stock_Exhibido': stock_exhibido,
-        'Stock_Total': stock_total,
-        'Ventas_Total': 0,
-        'Precio_Sugerido': float(precio_sugerido),
-        'Precio_Venta': float(precio_venta) if precio_venta > 0 else float(precio_sugerido)
-    }
+@st.cache_resource
+def obtener_almacen():
+    """Almacén de datos configurado, compartido por todas las sesiones"""
+    return almacenamiento.crear_almacen(ALMACEN, INVENTARIO_FILE, DIARIO_FILE, SQLITE_FILE, VENTAS_DIR, ARCHIVO_DIR,
+                                        FORMATO_SNAPSHOT, COMPRESION_SNAPSHOT)
+
+@st.cache_resource
+def inventario_compartido():
+    """Inventario en memoria único del proceso; las sesiones solo guardan estado de la interfaz"""
+    # Los checkpoints del JSON se escriben en segundo plano (ver escritor.py)
+    return Inventario(obtener_almacen(), escritura_diferida=True)
+
+def obtener_inventario():
+    """Inventario compartido por todas las sesiones"""
+    return inventario_compartido()
 
+@cronometrado
 def cargar_datos():
-    """Cargar todos los datos desde archivos y migrar estructura si es necesario"""
+    """Poner el inventario compartido al día (solo relee si otro proceso escribió)"""
     # Cargar inventario
     try:
-        if os.path.exists(INVENTARIO_FILE):
-            with open(INVENTARIO_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                # Verificar si necesitamos migrar la estructura
-                inventario_old = data.get('inventario', [])
-                inventario_new = []
-                
-                for item in inventario_old:
-                    # Si es estructura vieja, migrar
-                    if 'Stock_Bodega' not in item:
-                        # Migrar de estructura vieja a nueva
-                        item_migrado = {
-                            'ID': item.get('ID', ''),
-                            'Categoria': item.get('Categoria', ''),
-                            'Producto': item.get('Producto', ''),
-                            'Talla': item.get('Talla', ''),
-                            'Color': item.get('Color', ''),
-                            'Ubicacion': 'Exhibido',
-                            'Entrada_Total': item.get('Entrada', 0),
-                            'Stock_Bodega': 0,
-                            'Stock_Exhibido': item.get('Stock', 0),
-                            'Stock_Total': item.get('Stock', 0),
-                            'Ventas_Total': item.get('Ventas', 0),
-                            'Precio_Sugerido': item.get('Precio', 0.0),
-                            'Precio_Venta': item.get('Precio', 0.0)
-                        }
-                        inventario_new.append(item_migrado)
-                    else:
-                        inventario_new.append(item)
-                
-                st.session_state.inventario = inventario_new
-                st.session_state.ventas_diarias = data.get('ventas_diarias', [])
-                st.session_state.caja = data.get('caja', 0.0)
+        inv = obtener_inventario()
+        inv.sincronizar()
+        # Cambios que va a mostrar este rerun (ver vigilar_cambios)
+        st.session_state.cambios_vistos = inv.cambios
     except Exception as e:
         st.error(f"Error al cargar inventario: {str(e)}")
-        st.session_state.inventario = []
-        st.session_state.ventas_diarias = []
-        st.session_state.caja = 0.0
+        st.stop()
     
     # Cargar categorías personalizadas
     try:
@@ -150,19 +183,16 @@ def cargar_datos():
     except:
         st.session_state.categorias_personalizadas = []
 
-def guardar_inventario():
-    """Guardar inventario en archivo"""
-    try:
-        data = {
-            'inventario': st.session_state.inventario,
-            'ventas_diarias': st.session_state.ventas_diarias,
-            'caja': st.session_state.caja,
-            'ultima_actualizacion': datetime.now().isoformat()
-        }
-        with open(INVENTARIO_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        st.error(f"Error al guardar inventario: {str(e)}")
+def vigilar_cambios():
+    """Redibujar la app solo cuando los datos cambiaron desde el último rerun de esta sesión"""
+    inv = obtener_inventario()
+    inv.sincronizar()
+    if inv.cambios != st.session_state.get('cambios_vistos'):
+        st.rerun()
+
+if REFRESCO_SEGUNDOS > 0:
+    # Se ejecuta sola cada REFRESCO_SEGUNDOS sin rerun de la página completa
+    vigilar_cambios = st.fragment(run_every=REFRESCO_SEGUNDOS)(vigilar_cambios)
 
 def guardar_categorias():
     """Guardar categorías personalizadas en archivo"""
@@ -171,8 +201,7 @@ def guardar_categorias():
             'categorias_personalizadas': st.session_state.categorias_personalizadas,
             'ultima_actualizacion': datetime.now().isoformat()
         }
-        with open(CATEGORIAS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        almacenamiento.escribir_atomico(CATEGORIAS_FILE, json.dumps(data, ensure_ascii=False, indent=2))
     except Exception as e:
         st.error(f"Error al guardar categorías: {str(e)}")
 
@@ -188,10 +217,10 @@ def eliminar_categoria_personalizada(categoria):
     """Eliminar una categoría personalizada"""
     if categoria in st.session_state.categorias_personalizadas:
         # Verificar que no haya productos usando esta categoría
-        productos_en_categoria = [p for p in st.session_state.inventario if p['Categoria'] == categoria]
+        productos_en_categoria = obtener_inventario().agregados.productos_en_categoria(categoria)
         
         if productos_en_categoria:
-            return False, f"No se puede eliminar. Hay {len(productos_en_categoria)} productos usando esta categoría."
+            return False, f"No se puede eliminar. Hay {productos_en_categoria} productos usando esta categoría."
         
         st.session_state.categorias_personalizadas.remove(categoria)
         guardar_categorias()
@@ -199,137 +228,246 @@ def eliminar_categoria_personalizada(categoria):
     
     return False, "Categoría no encontrada"
 
+# Las operaciones viven en Inventario (inventario.py); aquí solo se
+# convierte un fallo del almacén en el mensaje de error que muestra la UI.
+@cronometrado
 def registrar_venta(producto_id, precio_venta_real=None):
     """Registrar una venta con precio de venta real"""
-    for item in st.session_state.inventario:
-        if item['ID'] == producto_id:
-            # Verificar stock disponible según ubicación
-            if item['Ubicacion'] == 'Exhibido':
-                stock_disponible = item['Stock_Exhibido']
-                ubicacion_venta = "exhibido"
-            else:
-                stock_disponible = item['Stock_Bodega']
-                ubicacion_venta = "bodega"
-            
-            if stock_disponible > 0:
-                # Actualizar stock según ubicación
-                if item['Ubicacion'] == 'Exhibido':
-                    item['Stock_Exhibido'] -= 1
-                else:
-                    item['Stock_Bodega'] -= 1
-                
-                item['Ventas_Total'] += 1
-                item['Stock_Total'] -= 1
-                
-                # Usar precio de venta real si se proporciona, sino el Precio_Venta guardado
-                precio_final = float(precio_venta_real) if precio_venta_real else item['Precio_Venta']
-                
-                # Registrar venta diaria con precio real
-                venta = {
-                    'fecha': datetime.now().isoformat(),
-                    'producto': item['Producto'],
-                    'talla': item['Talla'],
-                    'precio_sugerido': item['Precio_Sugerido'],
-                    'precio_venta': precio_final,
-                    'categoria': item['Categoria'],
-                    'ubicacion': item['Ubicacion'],
-                    'ubicacion_venta': ubicacion_venta
-                }
-                st.session_state.ventas_diarias.append(venta)
-                
-                # Actualizar caja con precio REAL
-                st.session_state.caja += precio_final
-                
-                guardar_inventario()
-                return True, precio_final, ubicacion_venta
-            else:
-                return False, f"No hay stock disponible en {item['Ubicacion']}", None
-    
-    return False, "Producto no encontrado", None
+    try:
+        return obtener_inventario().registrar_venta(producto_id, precio_venta_real)
+    except Exception as e:
+        return False, f"Error al guardar venta: {str(e)}", None
+
+@cronometrado
+def registrar_ventas(lineas):
+    """Vender todas las líneas del carrito en una sola operación"""
+    try:
+        return obtener_inventario().registrar_ventas(lineas)
+    except Exception as e:
+        return False, f"Error al guardar venta: {str(e)}", 0
 
+@cronometrado
 def agregar_producto(nuevo_producto):
     """Agregar nuevo producto al inventario"""
-    st.session_state.inventario.append(nuevo_producto)
-    guardar_inventario()
-    return True
+    try:
+        return obtener_inventario().agregar_producto(nuevo_producto)
+    except Exception as e:
+        st.error(f"Error al guardar producto: {str(e)}")
+        return False
+
+@cronometrado
+def importar_productos(entradas, nuevos):
+    """Guardar de una vez los productos de una importación masiva"""
+    try:
+        return obtener_inventario().importar_productos(entradas, nuevos)
+    except Exception as e:
+        return False, f"Error al importar: {str(e)}"
 
+@cronometrado
 def eliminar_producto(producto_id):
     """Eliminar un producto del inventario"""
-    for i, item in enumerate(st.session_state.inventario):
-        if item['ID'] == producto_id:
-            # Guardamos información antes de eliminar
-            producto_eliminado = st.session_state.inventario.pop(i)
-            
-            # Si tenía ventas, restamos de la caja
-            if producto_eliminado['Ventas_Total'] > 0:
-                # Buscamos todas las ventas de este producto
-                ventas_producto = [v for v in st.session_state.ventas_diarias 
-                                  if v.get('producto') == producto_eliminado['Producto']]
-                
-                total_ventas_producto = sum(v.get('precio_venta', 0) for v in ventas_producto)
-                st.session_state.caja -= total_ventas_producto
-                
-                if st.session_state.caja < 0:
-                    st.session_state.caja = 0
-            
-            guardar_inventario()
-            return True, f"Producto '{producto_eliminado['Producto']}' eliminado correctamente"
-    
-    return False, "Producto no encontrado"
+    try:
+        return obtener_inventario().eliminar_producto(producto_id)
+    except Exception as e:
+        return False, f"Error al eliminar producto: {str(e)}"
 
+@cronometrado
 def mover_stock(producto_id, cantidad, origen, destino):
     """Mover stock entre bodega y exhibido"""
-    for item in st.session_state.inventario:
-        if item['ID'] == producto_id:
-            # Verificar stock disponible en origen
-            stock_origen = item['Stock_Bodega'] if origen == 'Bodega' else item['Stock_Exhibido']
-            
-            if stock_origen < cantidad:
-                return False, f"No hay suficiente stock en {origen} (solo hay {stock_origen})"
-            
-            # Actualizar stocks
-            if origen == 'Bodega':
-                item['Stock_Bodega'] -= cantidad
-                item['Stock_Exhibido'] += cantidad
-            else:
-                item['Stock_Exhibido'] -= cantidad
-                item['Stock_Bodega'] += cantidad
-            
-            # Actualizar ubicación principal basada en dónde hay más stock
-            if item['Stock_Bodega'] > item['Stock_Exhibido']:
-                item['Ubicacion'] = 'Bodega'
-            elif item['Stock_Exhibido'] > item['Stock_Bodega']:
-                item['Ubicacion'] = 'Exhibido'
-            
-            guardar_inventario()
-            return True, f"{cantidad} unidades movidas de {origen} a {destino}"
-    
-    return False, "Producto no encontrado"
+    try:
+        return obtener_inventario().mover_stock(producto_id, cantidad, origen, destino)
+    except Exception as e:
+        return False, f"Error al mover stock: {str(e)}"
 
+@cronometrado
 def actualizar_precio_venta(producto_id, nuevo_precio_venta):
     """Actualizar el precio de venta de un producto"""
-    for item in st.session_state.inventario:
-        if item['ID'] == producto_id:
-            item['Precio_Venta'] = float(nuevo_precio_venta)
-            guardar_inventario()
-            return True, "Precio de venta actualizado"
-    return False, "Producto no encontrado"
+    try:
+        return obtener_inventario().actualizar_precio_venta(producto_id, nuevo_precio_venta)
+    except Exception as e:
+        return False, f"Error al actualizar precio: {str(e)}"
 
+@cronometrado
 def actualizar_precio_sugerido(producto_id, nuevo_precio_sugerido):
     """Actualizar el precio sugerido de un producto"""
-    for item in st.session_state.inventario:
-        if item['ID'] == producto_id:
-            item['Precio_Sugerido'] = float(nuevo_precio_sugerido)
-            guardar_inventario()
-            return True, "Precio sugerido actualizado"
-    return False, "Producto no encontrado"
+    try:
+        return obtener_inventario().actualizar_precio_sugerido(producto_id, nuevo_precio_sugerido)
+    except Exception as e:
+        return False, f"Error al actualizar precio: {str(e)}"
+
+@cronometrado
+def actualizar_producto(producto_id, cambios, esperado=None):
+    """Actualizar campos de un producto (rechazado si cambió lo 'esperado')"""
+    try:
+        return obtener_inventario().actualizar_producto(producto_id, cambios, esperado)
+    except Exception as e:
+        return False, f"Error al actualizar producto: {str(e)}"
+
+@cronometrado
+def resetear_graficas():
+    """Vaciar las ventas registradas para reiniciar las gráficas"""
+    try:
+        obtener_inventario().resetear_ventas()
+        return True, "¡Gráficas reseteadas!"
+    except Exception as e:
+        return False, f"Error al guardar inventario: {str(e)}"
+
+@cronometrado
+def cerrar_periodo(hasta=None):
+    """Archivar las ventas de los meses anteriores (ver Inventario.cerrar_periodo)"""
+    try:
+        return obtener_inventario().cerrar_periodo(hasta)
+    except Exception as e:
+        return False, f"Error al cerrar periodo: {str(e)}"
+
+def avisar_periodos_vencidos():
+    """Al llegar la fecha de reset programada, avisar de los meses anteriores a ella por cerrar
+
+    Cerrar un periodo no se deshace fácilmente: se hace solo con el botón,
+    nunca al dibujar la página.
+    """
+    fecha = datetime.strptime(st.session_state.reset_graficas_fecha, '%Y-%m-%d')
+    if fecha > datetime.now():
+        return
+    # Sin bloquear nada en el caso común: no hay meses por cerrar
+    meses = obtener_inventario().periodos_por_cerrar(fecha)
+    if not meses:
+        return
+    aviso = st.empty()
+    with aviso.container():
+        col_aviso, col_boton = st.columns([3, 1])
+        with col_aviso:
+            st.info(f"📦 Hay ventas de meses anteriores por cerrar: {', '.join(meses)}")
+        with col_boton:
+            cerrar = st.button("📦 Cerrar ahora", use_container_width=True, key="cerrar_periodos_vencidos")
+    if cerrar:
+        success, mensaje = cerrar_periodo(fecha)
+        if success:
+            aviso.success(mensaje)
+        else:
+            aviso.error(mensaje)
+
+@cronometrado
+def reiniciar_caja():
+    """Reiniciar caja, ventas y stock total"""
+    try:
+        obtener_inventario().reiniciar_caja()
+        return True, "Caja y ventas reiniciadas"
+    except Exception as e:
+        return False, f"Error al guardar inventario: {str(e)}"
 
 def calcular_caja_total():
     """Calcular el total de caja desde las ventas diarias (con precios reales)"""
-    total = 0.0
-    for venta in st.session_state.ventas_diarias:
-        total += venta.get('precio_venta', 0)
-    return total
+    return obtener_inventario().calcular_caja_total()
+
+# ============================================
+# FIGURAS Y TABLAS EN CACHÉ
+# ============================================
+# Columnas de las tablas de inventario; los precios se formatean al mostrarlos
+COLUMNAS_TABLA_INVENTARIO = ['Categoria', 'Producto', 'Talla', 'Color', 'Ubicacion',
+                             'Stock_Bodega', 'Stock_Exhibido', 'Stock_Total',
+                             'Ventas_Total', 'Precio_Sugerido', 'Precio_Venta']
+CONFIG_TABLA_INVENTARIO = {
+    'Categoria': st.column_config.TextColumn("Categoría"),
+    'Producto': st.column_config.TextColumn("Producto"),
+    'Talla': st.column_config.TextColumn("Talla"),
+    'Color': st.column_config.TextColumn("Color"),
+    'Ubicacion': st.column_config.TextColumn("📍 Ubicación"),
+    'Stock_Bodega': st.column_config.NumberColumn("📦 Bodega", format="%d"),
+    'Stock_Exhibido': st.column_config.NumberColumn("🛍️ Exhibido", format="%d"),
+    'Stock_Total': st.column_config.NumberColumn("📊 Total", format="%d"),
+    'Ventas_Total': st.column_config.NumberColumn("📈 Ventas", format="%d"),
+    'Precio_Sugerido': st.column_config.NumberColumn("💰 Sugerido", format="dollar"),
+    'Precio_Venta': st.column_config.NumberColumn("💵 Venta", format="dollar")
+}
+
+@st.cache_resource
+def cache_figuras():
+    """Figuras de plotly por versión de los datos y filtros, compartidas por todas las sesiones"""
+    return CacheLRU(MAX_FIGURAS_EN_CACHE)
+
+@st.cache_resource
+def cache_tablas():
+    """Tablas filtradas y ordenadas por versión de los datos y filtros"""
+    return CacheLRU(MAX_TABLAS_EN_CACHE)
+
+def version_datos(inv):
+    """Cambia con cada cambio del inventario en memoria, propio o recargado de disco"""
+    return (id(inv), inv.cambios)
+
+def figura_ventas_categoria(inv):
+    """Pastel de unidades vendidas por categoría (None si no hay ventas)"""
+    ventas_por_categoria = pd.DataFrame(
+        list(inv.agregados.ventas_por_categoria().items()),
+        columns=['Categoria', 'Ventas_Total']
+    )
+    if ventas_por_categoria.empty:
+        return None
+    fig = px.pie(
+        ventas_por_categoria, 
+        values='Ventas_Total', 
+        names='Categoria',
+        title="📊 Ventas por Categoría",
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        hole=0.3
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+def figura_stock(totales):
+    """Barras de stock en exhibido y en bodega"""
+    stock_data = pd.DataFrame({
+        'Ubicacion': ['Exhibido', 'Bodega'],
+        'Stock': [int(totales['stock_exhibido']), int(totales['stock_bodega'])]
+    })
+    fig = px.bar(
+        stock_data,
+        x='Ubicacion',
+        y='Stock',
+        title="📍 Distribución del Stock",
+        color='Ubicacion',
+        text='Stock',
+        color_discrete_map={'Exhibido': '#2E86AB', 'Bodega': '#A23B72'}
+    )
+    fig.update_traces(textposition='outside')
+    return fig
+
+def figura_reporte(reporte, medida):
+    """Barras del reporte de ventas por periodo y grupo"""
+    return px.bar(
+        reporte,
+        x='periodo',
+        y=medida,
+        color='grupo',
+        title="📈 Ventas por periodo",
+        labels={'periodo': 'Periodo', 'grupo': '', 'unidades': 'Unidades',
+                'ingresos': 'Ingresos', 'descuento': 'Descuento'},
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+
+def tabla_filtrada(df, categoria, ubicacion, ordenar_por):
+    """Inventario con los filtros de "Reporte y Caja", ya ordenado"""
+    if categoria != 'Todas':
+        df = df[df['Categoria'] == categoria]
+    if ubicacion != 'Todas':
+        df = df[df['Ubicacion'] == ubicacion]
+    if ordenar_por in ('Stock_Total', 'Ventas_Total', 'Precio_Venta'):
+        df = df.sort_values(ordenar_por, ascending=False)
+    else:
+        df = df.sort_values('Producto')
+    return df[COLUMNAS_TABLA_INVENTARIO]
+
+def tabla_busqueda(df, texto):
+    """Inventario cuyo producto, categoría, color, talla o ubicación contiene 'texto'"""
+    if texto:
+        df = df[
+            df['Producto'].str.contains(texto, case=False, na=False) |
+            df['Categoria'].str.contains(texto, case=False, na=False) |
+            df['Color'].str.contains(texto, case=False, na=False) |
+            df['Talla'].str.contains(texto, case=False, na=False) |
+            df['Ubicacion'].str.contains(texto, case=False, na=False)
+        ]
+    return df[COLUMNAS_TABLA_INVENTARIO]
 
 # ============================================
 # INTERFAZ PRINCIPAL
@@ -339,6 +477,10 @@ def main():
     
     # Cargar todos los datos
     cargar_datos()
+    inv = obtener_inventario()
+    avisar_periodos_vencidos()
+    if REFRESCO_SEGUNDOS > 0:
+        vigilar_cambios()
     
     # Información del sistema
     with st.expander("ℹ️ Información del Sistema", expanded=False):
@@ -357,1028 +499,1357 @@ def main():
     
     st.markdown("---")
     
-    # Convertir a DataFrame
-    df = pd.DataFrame(st.session_state.inventario)
+    # Tabla tipada de productos, compartida por las secciones: se filtra, no se copia
+    with medir("tabla"):
+        df = inv.tabla()
     
-    # Pestañas
-    tab1, tab2, tab3 = st.tabs(["🛍️ Registrar Ventas", "📊 Reporte y Caja", "⚙️ Gestión Inventario"])
+    # Solo se ejecuta la sección elegida; la elección queda en session_state
+    if 'ir_a_seccion' in st.session_state:
+        st.session_state.seccion = st.session_state.pop('ir_a_seccion')
+    seccion = st.radio("Sección:", list(SECCIONES), format_func=SECCIONES.get, horizontal=True,
+                       key="seccion", label_visibility="collapsed")
+    with medir(SECCIONES[seccion]):
+        DIBUJAR_SECCION[seccion](inv, df)
+
+# ============================================
+# SECCIÓN: REGISTRAR VENTAS
+# ============================================
+def rerun_fila():
+    """Volver a ejecutar solo el fragmento actual; si corre como parte de toda la app, toda la app"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment
+@rerun_propio(perfilado.RERUN_FILA)
+def fila_venta(producto_id):
+    """Fila de un producto en "Registrar Ventas"; sus botones solo vuelven a ejecutar esta fila"""
+    inv = obtener_inventario()
+    # Se lee del inventario y no de la tabla: al redibujar solo la fila muestra el stock al día
+    row = inv.obtener(producto_id)
+    if row is None:
+        return
+    abierto = st.session_state.producto_abierto_ventas == row['ID']
     
-    # TAB 1: REGISTRAR VENTAS
-    with tab1:
-        st.header("Registrar Ventas")
+    with st.container(border=True):
+        col_fila1, col_fila2, col_fila3 = st.columns([5, 3, 2])
+        with col_fila1:
+            st.write(f"📦 **{row['Producto']}** | 👕 {row['Talla']} | 🎨 {row['Color']}")
+        with col_fila2:
+            st.caption(f"🛍️ {int(row['Stock_Exhibido'])} · 📦 {int(row['Stock_Bodega'])} · "
+                       f"💵 ${row['Precio_Venta']:,.2f}")
+        with col_fila3:
+            if st.button("✖️ Cerrar" if abierto else "🛍️ Vender", key=f"abrir_{row['ID']}",
+                         use_container_width=True):
+                # Si había otro producto abierto hay que cerrarlo también: rerun completo
+                otro_abierto = st.session_state.producto_abierto_ventas not in (None, row['ID'])
+                st.session_state.producto_abierto_ventas = None if abierto else row['ID']
+                if otro_abierto:
+                    st.rerun()
+                rerun_fila()
         
-        if df.empty:
-            st.info("📭 No hay productos en el inventario.")
-        else:
-            # Filtros mejorados
-            col_filt1, col_filt2, col_filt3 = st.columns(3)
-            with col_filt1:
-                todas_categorias = obtener_todas_categorias()
-                categoria_filtro = st.selectbox("Categoría:", ['Todas'] + sorted(todas_categorias), key="cat_filtro_ventas")
-            with col_filt2:
-                ubicacion_filtro = st.selectbox("Ubicación:", ['Todas', 'Exhibido', 'Bodega'], key="ubic_filtro_ventas")
-            with col_filt3:
-                search_term = st.text_input("🔍 Buscar:", "", key="search_ventas")
-            
-            # Aplicar filtros
-            filtered_df = df.copy()
+        if abierto:
+            col_info1, col_info2 = st.columns(2)
+        
+            with col_info1:
+                st.write(f"**📋 Categoría:** {row['Categoria']}")
+                st.write(f"**📍 Ubicación:** {row['Ubicacion']}")
+                st.write(f"**💰 Sugerido:** ${row['Precio_Sugerido']:,.2f}")
+                st.write(f"**💵 Venta:** ${row['Precio_Venta']:,.2f}")
+        
+            with col_info2:
+                st.write(f"**🛍️ Exhibido:** {int(row['Stock_Exhibido'])}")
+                st.write(f"**📦 Bodega:** {int(row['Stock_Bodega'])}")
+                st.write(f"**📊 Total:** {int(row['Stock_Total'])}")
+                st.write(f"**📈 Ventas:** {int(row['Ventas_Total'])}")
+        
+            # Verificar stock disponible según ubicación
+            if row['Ubicacion'] == 'Exhibido':
+                stock_disponible = row['Stock_Exhibido']
+                ubicacion_texto = "exhibido"
+            else:
+                stock_disponible = row['Stock_Bodega']
+                ubicacion_texto = "bodega"
+        
+            if stock_disponible > 0:
+                # Botón para mover stock
+                if st.button("🔄 Mover Stock", key=f"btn_mover_{row['ID']}", use_container_width=True):
+                    st.session_state.modo_mover_stock = 'mover'
+                    st.session_state.producto_mover = row['ID']
+                    st.session_state.ir_a_seccion = 'gestion'
+                    st.rerun()
             
-            if not df.empty:
-                if categoria_filtro != 'Todas':
-                    filtered_df = filtered_df[filtered_df['Categoria'] == categoria_filtro]
-                
-                if ubicacion_filtro != 'Todas':
-                    filtered_df = filtered_df[filtered_df['Ubicacion'] == ubicacion_filtro]
+                # Formulario para vender con precio personalizado
+                with st.form(key=f"venta_form_{row['ID']}"):
+                    col_precio1, col_precio2 = st.columns(2)
+                    with col_precio1:
+                        precio_venta = st.number_input(
+                            f"Precio de venta ($):",
+                            min_value=0.0,
+                            value=float(row['Precio_Venta']),
+                            step=0.01,
+                            format="%.2f",
+                            key=f"precio_venta_{row['ID']}"
+                        )
+                    with col_precio2:
+                        cantidad_carrito = st.number_input(
+                            "Cantidad:",
+                            min_value=1,
+                            max_value=int(stock_disponible),
+                            value=1,
+                            step=1,
+                            key=f"cantidad_carrito_{row['ID']}"
+                        )
                 
-                if search_term:
-                    filtered_df = filtered_df[
-                        filtered_df['Producto'].str.contains(search_term, case=False, na=False) |
-                        filtered_df['Categoria'].str.contains(search_term, case=False, na=False) |
-                        filtered_df['Color'].str.contains(search_term, case=False, na=False) |
-                        filtered_df['Talla'].str.contains(search_term, case=False, na=False)
-                    ]
-            
-            if filtered_df.empty:
-                st.info("No se encontraron productos.")
+                    col_boton1, col_boton2 = st.columns(2)
+                    with col_boton1:
+                        if st.form_submit_button("✅ Vender 1 Unidad", use_container_width=True, type="primary"):
+                            antes = inv.cambios
+                            success, resultado, ubicacion = registrar_venta(row['ID'], precio_venta)
+                            if success:
+                                st.success(f"✅ Vendido por ${resultado:,.2f} (desde {ubicacion})")
+                                # Si el único cambio fue esta venta, el resto de la página sigue
+                                # al día y vigilar_cambios no tiene que redibujarla
+                                if inv.cambios == antes + 1 and st.session_state.get('cambios_vistos') == antes:
+                                    st.session_state.cambios_vistos = inv.cambios
+                                rerun_fila()
+                            else:
+                                st.error(f"❌ {resultado}")
+                    with col_boton2:
+                        if st.form_submit_button("🛒 Agregar al Carrito", use_container_width=True):
+                            st.session_state.carrito.append({
+                                'producto_id': row['ID'],
+                                'cantidad': int(cantidad_carrito),
+                                'precio': float(precio_venta)
+                            })
+                            st.session_state.producto_abierto_ventas = None
+                            st.rerun()
             else:
-                st.write(f"**📊 {len(filtered_df)} productos encontrados**")
-                
-                # Mostrar productos
-                for _, row in filtered_df.iterrows():
-                    with st.expander(f"📦 {row['Producto']} | 👕 {row['Talla']} | 🎨 {row['Color']}"):
-                        col_info1, col_info2 = st.columns(2)
-                        
-                        with col_info1:
-                            st.write(f"**📋 Categoría:** {row['Categoria']}")
-                            st.write(f"**📍 Ubicación:** {row['Ubicacion']}")
-                            st.write(f"**💰 Sugerido:** ${row['Precio_Sugerido']:,.2f}")
-                            st.write(f"**💵 Venta:** ${row['Precio_Venta']:,.2f}")
-                        
-                        with col_info2:
-                            st.write(f"**🛍️ Exhibido:** {int(row['Stock_Exhibido'])}")
-                            st.write(f"**📦 Bodega:** {int(row['Stock_Bodega'])}")
-                            st.write(f"**📊 Total:** {int(row['Stock_Total'])}")
-                            st.write(f"**📈 Ventas:** {int(row['Ventas_Total'])}")
-                        
-                        # Verificar stock disponible según ubicación
-                        if row['Ubicacion'] == 'Exhibido':
-                            stock_disponible = row['Stock_Exhibido']
-                            ubicacion_texto = "exhibido"
-                        else:
-                            stock_disponible = row['Stock_Bodega']
-                            ubicacion_texto = "bodega"
-                        
-                        if stock_disponible > 0:
-                            # Botón para mover stock
-                            if st.button("🔄 Mover Stock", key=f"btn_mover_{row['ID']}", use_container_width=True):
-                                st.session_state.modo_mover_stock = 'mover'
-                                st.session_state.producto_mover = row['ID']
-                                st.rerun()
-                            
-                            # Formulario para vender con precio personalizado
-                            with st.form(key=f"venta_form_{row['ID']}"):
-                                col_precio1, col_precio2 = st.columns(2)
-                                with col_precio1:
-                                    precio_venta = st.number_input(
-                                        f"Precio de venta ($):",
-                                        min_value=0.0,
-                                        value=float(row['Precio_Venta']),
-                                        step=0.01,
-                                        format="%.2f",
-                                        key=f"precio_venta_{row['ID']}"
-                                    )
-                                
-                                with col_precio2:
-                                    if st.form_submit_button("✅ Vender 1 Unidad", use_container_width=True, type="primary"):
-                                        success, resultado, ubicacion = registrar_venta(row['ID'], precio_venta)
-                                        if success:
-                                            st.success(f"✅ Vendido por ${resultado:,.2f} (desde {ubicacion})")
-                                            st.rerun()
-                                        else:
-                                            st.error(f"❌ {resultado}")
-                        else:
-                            st.error(f"❌ Sin stock disponible en {ubicacion_texto}")
+                st.error(f"❌ Sin stock disponible en {ubicacion_texto}")
+
+def seccion_ventas(inv, df):
+    """Carrito, filtros y lista de productos para vender"""
+    st.header("Registrar Ventas")
     
-    # TAB 2: REPORTE Y CAJA
-    with tab2:
-        st.header("📊 Reporte y Caja")
-        
-        # Control de gráficas
-        with st.expander("🔄 Control de Gráficas", expanded=False):
-            col_res1, col_res2 = st.columns(2)
-            with col_res1:
-                nueva_fecha_reset = st.date_input(
-                    "Próximo reset de gráficas:",
-                    value=datetime.strptime(st.session_state.reset_graficas_fecha, '%Y-%m-%d'),
-                    key="fecha_reset"
-                )
+    # Carrito: varias unidades y productos en un solo cobro
+    if st.session_state.carrito:
+        with st.container(border=True):
+            st.subheader("🛒 Carrito")
+            total_carrito = 0.0
+            for i, linea in enumerate(st.session_state.carrito):
+                item = inv.obtener(linea['producto_id'])
+                if item is None:
+                    continue
+                subtotal = linea['precio'] * linea['cantidad']
+                total_carrito += subtotal
+                col_car1, col_car2, col_car3 = st.columns([5, 3, 1])
+                with col_car1:
+                    st.write(f"📦 **{item['Producto']}** | 👕 {item['Talla']} | 🎨 {item['Color']}")
+                with col_car2:
+                    st.write(f"{linea['cantidad']} x ${linea['precio']:,.2f} = **${subtotal:,.2f}**")
+                with col_car3:
+                    if st.button("✖️", key=f"quitar_carrito_{i}"):
+                        st.session_state.carrito.pop(i)
+                        st.rerun()
             
-            with col_res2:
-                if st.button("💾 Guardar Fecha", use_container_width=True):
-                    st.session_state.reset_graficas_fecha = nueva_fecha_reset.strftime('%Y-%m-%d')
-                    st.success(f"Fecha guardada: {nueva_fecha_reset.strftime('%Y-%m-%d')}")
-                
-                if st.button("🔄 Resetear Gráficas Ahora", use_container_width=True, type="secondary"):
-                    st.session_state.ventas_diarias = []
-                    guardar_inventario()
-                    st.success("¡Gráficas reseteadas!")
+            st.write(f"**💰 Total: ${total_carrito:,.2f}**")
+            col_cobrar1, col_cobrar2 = st.columns(2)
+            with col_cobrar1:
+                if st.button("✅ Cobrar Carrito", type="primary", use_container_width=True, key="cobrar_carrito"):
+                    success, resultado, unidades = registrar_ventas(st.session_state.carrito)
+                    if success:
+                        st.session_state.carrito = []
+                        st.success(f"✅ {unidades} unidades vendidas por ${resultado:,.2f}")
+                        st.rerun()
+                    else:
+                        st.error(f"❌ {resultado}")
+            with col_cobrar2:
+                if st.button("🗑️ Vaciar Carrito", use_container_width=True, key="vaciar_carrito"):
+                    st.session_state.carrito = []
                     st.rerun()
+    
+    if df.empty:
+        st.info("📭 No hay productos en el inventario.")
+    else:
+        # Filtros mejorados
+        col_filt1, col_filt2, col_filt3 = st.columns(3)
+        with col_filt1:
+            todas_categorias = obtener_todas_categorias()
+            categoria_filtro = st.selectbox("Categoría:", ['Todas'] + sorted(todas_categorias), key="cat_filtro_ventas")
+        with col_filt2:
+            ubicacion_filtro = st.selectbox("Ubicación:", ['Todas', 'Exhibido', 'Bodega'], key="ubic_filtro_ventas")
+        with col_filt3:
+            search_term = st.text_input("🔍 Buscar:", "", key="search_ventas")
         
-        if df.empty:
-            st.info("No hay datos para mostrar.")
-        else:
-            # Asegurar columnas
-            columnas_necesarias = ['Stock_Bodega', 'Stock_Exhibido', 'Stock_Total', 
-                                 'Ventas_Total', 'Precio_Sugerido', 'Precio_Venta']
+        # Aplicar filtros
+        filtered_df = df
+        
+        if not df.empty:
+            if categoria_filtro != 'Todas':
+                filtered_df = filtered_df[filtered_df['Categoria'] == categoria_filtro]
             
-            for col in columnas_necesarias:
-                if col not in df.columns:
-                    if col == 'Stock_Bodega':
-                        df['Stock_Bodega'] = 0
-                    elif col == 'Stock_Exhibido':
-                        df['Stock_Exhibido'] = df.get('Stock', 0)
-                    elif col == 'Stock_Total':
-                        df['Stock_Total'] = df.get('Stock', 0)
-                    elif col == 'Ventas_Total':
-                        df['Ventas_Total'] = df.get('Ventas', 0)
-                    elif col == 'Precio_Sugerido':
-                        df['Precio_Sugerido'] = df.get('Precio', 0.0)
-                    elif col == 'Precio_Venta':
-                        df['Precio_Venta'] = df.get('Precio', 0.0)
+            if ubicacion_filtro != 'Todas':
+                filtered_df = filtered_df[filtered_df['Ubicacion'] == ubicacion_filtro]
             
-            # Calcular caja total
-            caja_total = calcular_caja_total()
-            st.session_state.caja = caja_total
+            if search_term:
+                # Índice de búsqueda del inventario (sin acentos, por prefijo y con errores de dedo)
+                ids_encontrados = inv.buscar(search_term)
+                filtered_df = filtered_df[filtered_df['ID'].isin(ids_encontrados)]
+        
+        if filtered_df.empty:
+            st.info("No se encontraron productos.")
+        else:
+            # Paginación: solo se construye la página visible
+            col_pag1, col_pag2 = st.columns([3, 1])
+            with col_pag2:
+                tam_pagina = st.selectbox("Por página:", TAMANOS_PAGINA_VENTAS, key="tam_pagina_ventas")
             
-            # Métricas principales
-            col1, col2, col3, col4 = st.columns(4)
+            # Volver a la primera página cuando cambian los filtros
+            filtros_ventas = (categoria_filtro, ubicacion_filtro, search_term, tam_pagina)
+            if st.session_state.filtros_ventas != filtros_ventas:
+                st.session_state.filtros_ventas = filtros_ventas
+                st.session_state.pagina_ventas = 0
             
-            with col1:
-                total_ventas = df['Ventas_Total'].sum()
-                st.metric("📈 Ventas Totales", f"{int(total_ventas)}")
+            total_paginas = (len(filtered_df) - 1) // tam_pagina + 1
+            pagina = min(st.session_state.pagina_ventas, total_paginas - 1)
+            inicio = pagina * tam_pagina
+            pagina_df = filtered_df.iloc[inicio:inicio + tam_pagina]
             
-            with col2:
-                st.metric("💰 Caja Total", f"${caja_total:,.2f}")
+            with col_pag1:
+                st.write(f"**📊 {len(filtered_df)} productos encontrados** · "
+                         f"mostrando {inicio + 1}-{inicio + len(pagina_df)}")
             
-            with col3:
-                stock_exhibido = df['Stock_Exhibido'].sum()
-                st.metric("🛍️ Stock Exhibido", f"{int(stock_exhibido)}")
+            # Mostrar productos (una fila compacta por producto; el detalle
+            # y el formulario de venta solo para el producto abierto)
+            for producto_id in perfilador().iterar("Registrar Ventas: lista", pagina_df['ID']):
+                fila_venta(producto_id)
             
-            with col4:
-                stock_bodega = df['Stock_Bodega'].sum()
-                st.metric("📦 Stock Bodega", f"{int(stock_bodega)}")
+            # Controles de página
+            if total_paginas > 1:
+                col_nav1, col_nav2, col_nav3 = st.columns([1, 2, 1])
+                with col_nav1:
+                    if st.button("⬅️ Anterior", disabled=pagina == 0, use_container_width=True, key="pagina_anterior"):
+                        st.session_state.pagina_ventas = pagina - 1
+                        st.rerun()
+                with col_nav2:
+                    st.markdown(f"<div style='text-align: center'>Página {pagina + 1} de {total_paginas}</div>",
+                                unsafe_allow_html=True)
+                with col_nav3:
+                    if st.button("Siguiente ➡️", disabled=pagina >= total_paginas - 1, use_container_width=True,
+                                 key="pagina_siguiente"):
+                        st.session_state.pagina_ventas = pagina + 1
+                        st.rerun()
+
+# ============================================
+# SECCIÓN: REPORTE Y CAJA
+# ============================================
+def seccion_reporte(inv, df):
+    """Métricas, gráficas, reportes por periodo e inventario completo"""
+    st.header("📊 Reporte y Caja")
+    
+    # Control de gráficas
+    with st.expander("🔄 Control de Gráficas", expanded=False):
+        col_res1, col_res2 = st.columns(2)
+        with col_res1:
+            nueva_fecha_reset = st.date_input(
+                "Próximo reset de gráficas:",
+                value=datetime.strptime(st.session_state.reset_graficas_fecha, '%Y-%m-%d'),
+                key="fecha_reset",
+                help="Al llegar esta fecha se avisa de los meses anteriores a ella por cerrar: "
+                     "al cerrarlos sus ventas se archivan y los reportes las siguen mostrando"
+            )
+        
+        with col_res2:
+            if st.button("💾 Guardar Fecha", use_container_width=True):
+                st.session_state.reset_graficas_fecha = nueva_fecha_reset.strftime('%Y-%m-%d')
+                st.success(f"Fecha guardada: {nueva_fecha_reset.strftime('%Y-%m-%d')}")
             
-            st.markdown("---")
+            if st.button("📦 Cerrar Periodo", use_container_width=True, key="cerrar_periodo",
+                         help="Archiva las ventas de los meses anteriores al actual sin perder el historial"):
+                success, mensaje = cerrar_periodo()
+                if success:
+                    st.success(mensaje)
+                else:
+                    st.info(mensaje)
             
-            # Gráficos mejorados
-            col1, col2 = st.columns(2)
+            if st.button("🔄 Resetear Gráficas Ahora", use_container_width=True, type="secondary",
+                         help="Empieza las ventas de cero; los meses cerrados se apartan sin borrarse"):
+                success, mensaje = resetear_graficas()
+                if success:
+                    st.success(mensaje)
+                    st.rerun()
+                else:
+                    st.error(mensaje)
+    
+    if df.empty:
+        st.info("No hay datos para mostrar.")
+    else:
+        # Caja total de las ventas registradas; solo se muestra: inv.caja es del
+        # Inventario compartido y lo ajustan sus operaciones (p. ej. eliminar_producto)
+        caja_total = calcular_caja_total()
+        
+        # Totales acumulados operación por operación (agregados.py)
+        totales = inv.agregados.totales
+        
+        # Métricas principales
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("📈 Ventas Totales", f"{int(totales['ventas_total'])}")
+        
+        with col2:
+            st.metric("💰 Caja Total", f"${caja_total:,.2f}")
+        
+        with col3:
+            st.metric("🛍️ Stock Exhibido", f"{int(totales['stock_exhibido'])}")
+        
+        with col4:
+            st.metric("📦 Stock Bodega", f"{int(totales['stock_bodega'])}")
+        
+        st.markdown("---")
+        
+        # Gráficos mejorados
+        col1, col2 = st.columns(2)
+        
+        # Las figuras se arman una vez por versión de los datos (ver cache_figuras)
+        version = version_datos(inv)
+        
+        with col1, medir("Reporte y Caja: gráficas"):
+            # Ventas por categoría
+            fig = cache_figuras().obtener(('categorias', version), lambda: figura_ventas_categoria(inv))
+            if fig is not None:
+                st.plotly_chart(fig, use_container_width=True)
+        
+        with col2, medir("Reporte y Caja: gráficas"):
+            # Stock por ubicación
+            fig = cache_figuras().obtener(('stock', version), lambda: figura_stock(totales))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.markdown("---")
+        
+        # Ventas en el tiempo (reportes.py)
+        st.subheader("📈 Ventas en el Tiempo")
+        
+        col_t1, col_t2, col_t3, col_t4 = st.columns(4)
+        with col_t1:
+            rango_reporte = st.date_input(
+                "Rango de fechas:",
+                value=(datetime.now().date() - timedelta(days=30), datetime.now().date()),
+                key="rango_reporte"
+            )
+        with col_t2:
+            frecuencia_reporte = st.selectbox(
+                "Agrupar por periodo:", ['dia', 'semana', 'mes'],
+                format_func=lambda f: {'dia': 'Día', 'semana': 'Semana', 'mes': 'Mes'}[f],
+                key="frecuencia_reporte"
+            )
+        with col_t3:
+            por_reporte = st.selectbox(
+                "Separar por:", ['categoria', 'ubicacion'],
+                format_func=lambda p: {'categoria': 'Categoría', 'ubicacion': 'Ubicación'}[p],
+                key="por_reporte"
+            )
+        with col_t4:
+            medida_reporte = st.selectbox(
+                "Mostrar:", ['unidades', 'ingresos', 'descuento'],
+                format_func=lambda m: {'unidades': 'Unidades', 'ingresos': 'Ingresos',
+                                       'descuento': 'Descuento vs sugerido'}[m],
+                key="medida_reporte"
+            )
+        
+        # Mientras se elige el rango, date_input devuelve una sola fecha
+        if isinstance(rango_reporte, (tuple, list)) and len(rango_reporte) == 2:
+            desde_reporte, hasta_reporte = rango_reporte
+        else:
+            desde_reporte = hasta_reporte = rango_reporte[0] if isinstance(rango_reporte, (tuple, list)) else rango_reporte
+        
+        with medir("Reporte y Caja: reporte"):
+            reporte = inv.reportes.reporte(frecuencia_reporte, por_reporte, desde_reporte, hasta_reporte)
+        if reporte.empty:
+            st.info("No hay ventas en el rango seleccionado.")
+        else:
+            col_r1, col_r2, col_r3 = st.columns(3)
+            with col_r1:
+                st.metric("🛍️ Unidades", f"{int(reporte['unidades'].sum())}")
+            with col_r2:
+                st.metric("💵 Ingresos", f"${reporte['ingresos'].sum():,.2f}")
+            with col_r3:
+                sugerido_rango = reporte['sugerido'].sum()
+                descuento_rango = reporte['descuento'].sum()
+                st.metric("🏷️ Descuento vs sugerido", f"${descuento_rango:,.2f}",
+                          f"{descuento_rango / sugerido_rango:.1%}" if sugerido_rango else None,
+                          delta_color="off")
             
-            with col1:
-                if not df.empty:
-                    # Ventas por categoría
-                    ventas_por_categoria = df.groupby('Categoria')['Ventas_Total'].sum().reset_index()
-                    if not ventas_por_categoria.empty:
-                        fig = px.pie(
-                            ventas_por_categoria, 
-                            values='Ventas_Total', 
-                            names='Categoria',
-                            title="📊 Ventas por Categoría",
-                            color_discrete_sequence=px.colors.qualitative.Set3,
-                            hole=0.3
-                        )
-                        fig.update_traces(textposition='inside', textinfo='percent+label')
-                        st.plotly_chart(fig, use_container_width=True)
+            with medir("Reporte y Caja: gráficas"):
+                # El reporte mismo ya viene de la caché de reportes.py
+                clave = ('reporte', version, frecuencia_reporte, por_reporte,
+                         str(desde_reporte), str(hasta_reporte), medida_reporte)
+                fig = cache_figuras().obtener(clave, lambda: figura_reporte(reporte, medida_reporte))
+                st.plotly_chart(fig, use_container_width=True)
             
-            with col2:
-                if not df.empty:
-                    # Stock por ubicación
-                    stock_data = pd.DataFrame({
-                        'Ubicacion': ['Exhibido', 'Bodega'],
-                        'Stock': [int(df['Stock_Exhibido'].sum()), int(df['Stock_Bodega'].sum())]
-                    })
-                    
-                    if not stock_data.empty:
-                        fig = px.bar(
-                            stock_data,
-                            x='Ubicacion',
-                            y='Stock',
-                            title="📍 Distribución del Stock",
-                            color='Ubicacion',
-                            text='Stock',
-                            color_discrete_map={'Exhibido': '#2E86AB', 'Bodega': '#A23B72'}
+            with st.expander("Ver tabla del reporte"):
+                st.dataframe(
+                    reporte,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        'periodo': st.column_config.DateColumn("Periodo"),
+                        'grupo': st.column_config.TextColumn("Grupo"),
+                        'unidades': st.column_config.NumberColumn("Unidades", format="%d"),
+                        'ingresos': st.column_config.NumberColumn("Ingresos", format="$%.2f"),
+                        'sugerido': st.column_config.NumberColumn("Sugerido", format="$%.2f"),
+                        'descuento': st.column_config.NumberColumn("Descuento", format="$%.2f"),
+                        'descuento_pct': st.column_config.NumberColumn("% Desc.", format="percent")
+                    }
+                )
+        
+        st.markdown("---")
+        
+        # Tabla completa
+        st.subheader("📋 Inventario Completo")
+        
+        # Filtros para la tabla
+        col_f1, col_f2, col_f3 = st.columns(3)
+        with col_f1:
+            todas_categorias_tabla = ['Todas'] + sorted(inv.agregados.ventas_por_categoria())
+            filtro_categoria = st.selectbox("Filtrar categoría:", todas_categorias_tabla, key="filtro_categoria_tabla")
+        with col_f2:
+            filtro_ubicacion = st.selectbox("Filtrar ubicación:", ['Todas', 'Exhibido', 'Bodega'], key="filtro_ubicacion_tabla")
+        with col_f3:
+            ordenar_por = st.selectbox("Ordenar por:", ['Producto', 'Stock_Total', 'Ventas_Total', 'Precio_Venta'], key="ordenar_por_tabla")
+        
+        # Aplicar filtros y orden (una vez por versión de los datos y filtros)
+        display_df = cache_tablas().obtener(
+            ('inventario', version, filtro_categoria, filtro_ubicacion, ordenar_por),
+            lambda: tabla_filtrada(df, filtro_categoria, filtro_ubicacion, ordenar_por)
+        )
+        
+        # Mostrar tabla
+        if not display_df.empty:
+            st.dataframe(
+                display_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config=CONFIG_TABLA_INVENTARIO
+            )
+        else:
+            st.info("No hay productos que coincidan con los filtros.")
+        
+        # Botones de exportación
+        col_exp1, col_exp2, col_exp3 = st.columns(3)
+        with col_exp1:
+            if st.button("📥 Exportar", use_container_width=True, key="export_csv",
+                       type="primary" if st.session_state.mostrar_exportar else "secondary"):
+                st.session_state.mostrar_exportar = not st.session_state.mostrar_exportar
+                st.rerun()
+        
+        with col_exp2:
+            if st.button("🔄 Actualizar Precios", use_container_width=True, key="btn_actualizar_precios"):
+                st.session_state.modo_edicion = 'actualizar_precios'
+                st.session_state.ir_a_seccion = 'gestion'
+                st.rerun()
+        
+        with col_exp3:
+            if st.button("🔄 Reiniciar Caja", use_container_width=True, key="reset_caja"):
+                success, mensaje = reiniciar_caja()
+                if success:
+                    st.success(mensaje)
+                    st.rerun()
+                else:
+                    st.error(mensaje)
+        
+        # Exportación por partes (exportacion.py)
+        if st.session_state.mostrar_exportar:
+            with st.container(border=True):
+                st.markdown("### 📥 Exportar")
+                col_e1, col_e2 = st.columns(2)
+                with col_e1:
+                    tipo_exportar = st.selectbox(
+                        "Qué exportar:", ['inventario', 'ventas', 'resumen'],
+                        format_func=lambda t: {'inventario': 'Inventario', 'ventas': 'Ventas (todas las líneas)',
+                                               'resumen': 'Resumen por periodo'}[t],
+                        key="tipo_exportar"
+                    )
+                with col_e2:
+                    formato_exportar = st.selectbox(
+                        "Formato:", ['csv', 'xlsx'],
+                        format_func=lambda f: {'csv': 'CSV', 'xlsx': 'Excel (.xlsx)'}[f],
+                        key="formato_exportar"
+                    )
+                
+                comprimir_exportar = formato_exportar == 'csv' and st.checkbox(
+                    "Comprimir (gzip)", key="gzip_exportar",
+                    help="Recomendado para historiales de varios años"
+                )
+                
+                desde_exportar = hasta_exportar = None
+                categorias_exportar = None
+                frecuencia_exportar, por_exportar = 'mes', 'categoria'
+                if tipo_exportar in ('ventas', 'resumen'):
+                    rango_exportar = st.date_input("Rango de fechas (vacío = todo el historial):",
+                                                   value=[], key="rango_exportar")
+                    if isinstance(rango_exportar, (tuple, list)) and len(rango_exportar) == 2:
+                        desde_exportar, hasta_exportar = rango_exportar
+                if tipo_exportar == 'ventas':
+                    categorias_exportar = st.multiselect("Categorías (vacío = todas):",
+                                                         obtener_todas_categorias(), key="categorias_exportar")
+                if tipo_exportar == 'resumen':
+                    col_e3, col_e4 = st.columns(2)
+                    with col_e3:
+                        frecuencia_exportar = st.selectbox(
+                            "Periodo:", ['dia', 'semana', 'mes'], index=2,
+                            format_func=lambda f: {'dia': 'Día', 'semana': 'Semana', 'mes': 'Mes'}[f],
+                            key="frecuencia_exportar"
+                        )
+                    with col_e4:
+                        por_exportar = st.selectbox(
+                            "Separar por:", ['categoria', 'ubicacion'],
+                            format_func=lambda p: {'categoria': 'Categoría', 'ubicacion': 'Ubicación'}[p],
+                            key="por_exportar"
                         )
-                        fig.update_traces(textposition='outside')
-                        st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("---")
-            
-            # Tabla completa
-            st.subheader("📋 Inventario Completo")
-            
-            # Filtros para la tabla
-            col_f1, col_f2, col_f3 = st.columns(3)
-            with col_f1:
-                todas_categorias_tabla = ['Todas'] + sorted(df['Categoria'].unique().tolist())
-                filtro_categoria = st.selectbox("Filtrar categoría:", todas_categorias_tabla, key="filtro_categoria_tabla")
-            with col_f2:
-                filtro_ubicacion = st.selectbox("Filtrar ubicación:", ['Todas', 'Exhibido', 'Bodega'], key="filtro_ubicacion_tabla")
-            with col_f3:
-                ordenar_por = st.selectbox("Ordenar por:", ['Producto', 'Stock_Total', 'Ventas_Total', 'Precio_Venta'], key="ordenar_por_tabla")
-            
-            # Aplicar filtros
-            display_df = df.copy()
-            
-            if filtro_categoria != 'Todas':
-                display_df = display_df[display_df['Categoria'] == filtro_categoria]
-            
-            if filtro_ubicacion != 'Todas':
-                display_df = display_df[display_df['Ubicacion'] == filtro_ubicacion]
-            
-            # Ordenar
-            if ordenar_por == 'Stock_Total':
-                display_df = display_df.sort_values('Stock_Total', ascending=False)
-            elif ordenar_por == 'Ventas_Total':
-                display_df = display_df.sort_values('Ventas_Total', ascending=False)
-            elif ordenar_por == 'Precio_Venta':
-                display_df = display_df.sort_values('Precio_Venta', ascending=False)
-            else:
-                display_df = display_df.sort_values('Producto')
-            
-            # Mostrar tabla
-            if not display_df.empty:
-                display_df_formatted = display_df.copy()
-                display_df_formatted['Precio_Sugerido'] = display_df_formatted['Precio_Sugerido'].apply(lambda x: f"${x:,.2f}")
-                display_df_formatted['Precio_Venta'] = display_df_formatted['Precio_Venta'].apply(lambda x: f"${x:,.2f}")
                 
+                if st.button("⚙️ Generar archivo", type="primary", key="generar_exportacion"):
+                    try:
+                        # Se genera por bloques; la descarga de Streamlit igual queda en memoria
+                        # (para historiales muy grandes: python exportacion.py)
+                        archivo = io.BytesIO()
+                        exportacion.escribir(exportacion.exportar(
+                            inv, tipo_exportar, formato_exportar, comprimir_exportar,
+                            desde_exportar, hasta_exportar, categorias_exportar,
+                            frecuencia_exportar, por_exportar
+                        ), archivo)
+                        st.download_button(
+                            label="⬇️ Descargar",
+                            data=archivo,
+                            file_name=exportacion.nombre_archivo(tipo_exportar, formato_exportar, comprimir_exportar),
+                            mime=exportacion.tipo_mime(formato_exportar, comprimir_exportar),
+                            use_container_width=True,
+                            key="download_csv"
+                        )
+                    except exportacion.ErrorExportacion as e:
+                        st.error(f"❌ {e}")
+
+# ============================================
+# SECCIÓN: GESTIÓN INVENTARIO
+# ============================================
+def seccion_gestion(inv, df):
+    """Acceso de administrador y altas, cambios, bajas e importación de productos"""
+    st.header("⚙️ Gestión de Inventario")
+    
+    # Verificar login
+    if not st.session_state.admin_logged_in:
+        st.markdown("### 🔒 Acceso Administrador")
+        
+        with st.container(border=True):
+            password = st.text_input("Contraseña:", type="password", key="password_input_admin")
+            
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                if st.button("🔑 Ingresar", type="primary", use_container_width=True, key="login_admin"):
+                    if password == CONTRASENA:
+                        st.session_state.admin_logged_in = True
+                        st.success("✅ Acceso concedido")
+                        st.rerun()
+                    else:
+                        st.error("❌ Contraseña incorrecta")
+    else:
+        # Mostrar controles de administrador
+        st.success("✅ **Modo administrador activado**")
+        
+        # Botones principales
+        col_logout, col_cats, col_mover, col_space = st.columns([1, 1, 1, 1])
+        with col_logout:
+            if st.button("🚪 Cerrar Sesión", use_container_width=True, key="logout_admin"):
+                st.session_state.admin_logged_in = False
+                st.session_state.modo_edicion = None
+                st.session_state.producto_editar = None
+                st.session_state.mostrar_gestion_categorias = False
+                st.session_state.modo_mover_stock = None
+                st.rerun()
+        
+        with col_cats:
+            if st.button("🏷️ Categorías", use_container_width=True, 
+                       type="primary" if st.session_state.mostrar_gestion_categorias else "secondary"):
+                st.session_state.mostrar_gestion_categorias = not st.session_state.mostrar_gestion_categorias
+                st.session_state.modo_edicion = None
+                st.session_state.modo_mover_stock = None
+                st.rerun()
+        
+        with col_mover:
+            if st.button("🔄 Mover Stock", use_container_width=True,
+                       type="primary" if st.session_state.modo_mover_stock == 'seleccionar' else "secondary"):
+                st.session_state.modo_mover_stock = 'seleccionar'
+                st.session_state.mostrar_gestion_categorias = False
+                st.session_state.modo_edicion = None
+                st.rerun()
+        
+        # Tiempos por etapa de los últimos reruns de esta sesión (perfilado.py)
+        with st.expander("⏱️ Rendimiento", expanded=False):
+            perfilador().activo = st.toggle(
+                "Medir tiempos", value=perfilador().activo, key="perfilar",
+                help="Toma el tiempo de cada etapa en cada rerun de esta sesión "
+                     f"(últimos {perfilador().historia})"
+            )
+            estadisticas = perfilador().estadisticas()
+            if estadisticas:
                 st.dataframe(
-                    display_df_formatted[['Categoria', 'Producto', 'Talla', 'Color', 'Ubicacion', 
-                                         'Stock_Bodega', 'Stock_Exhibido', 'Stock_Total', 
-                                         'Ventas_Total', 'Precio_Sugerido', 'Precio_Venta']],
+                    pd.DataFrame(estadisticas),
                     use_container_width=True,
                     hide_index=True,
                     column_config={
-                        'Categoria': st.column_config.TextColumn("Categoría"),
-                        'Producto': st.column_config.TextColumn("Producto"),
-                        'Talla': st.column_config.TextColumn("Talla"),
-                        'Color': st.column_config.TextColumn("Color"),
-                        'Ubicacion': st.column_config.TextColumn("📍 Ubicación"),
-                        'Stock_Bodega': st.column_config.NumberColumn("📦 Bodega", format="%d"),
-                        'Stock_Exhibido': st.column_config.NumberColumn("🛍️ Exhibido", format="%d"),
-                        'Stock_Total': st.column_config.NumberColumn("📊 Total", format="%d"),
-                        'Ventas_Total': st.column_config.NumberColumn("📈 Ventas", format="%d"),
-                        'Precio_Sugerido': st.column_config.TextColumn("💰 Sugerido"),
-                        'Precio_Venta': st.column_config.TextColumn("💵 Venta")
+                        'etapa': st.column_config.TextColumn("Etapa"),
+                        'muestras': st.column_config.NumberColumn("Reruns", format="%d"),
+                        'p50_ms': st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+                        'p95_ms': st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+                        'max_ms': st.column_config.NumberColumn("Máx. (ms)", format="%.1f"),
+                        'ultimo_ms': st.column_config.NumberColumn("Último (ms)", format="%.1f")
                     }
                 )
-            else:
-                st.info("No hay productos que coincidan con los filtros.")
-            
-            # Botones de exportación
-            col_exp1, col_exp2, col_exp3 = st.columns(3)
-            with col_exp1:
-                if st.button("📥 Exportar CSV", use_container_width=True, key="export_csv"):
-                    csv = df.to_csv(index=False, encoding='utf-8-sig')
+                col_p1, col_p2 = st.columns(2)
+                with col_p1:
                     st.download_button(
-                        label="Descargar CSV",
-                        data=csv,
-                        file_name=f"inventario_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        mime="text/csv",
-                        use_container_width=True,
-                        key="download_csv"
+                        "💾 Descargar JSON", perfilador().a_json(),
+                        file_name=f"tiempos_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
+                        mime="application/json", use_container_width=True
                     )
+                with col_p2:
+                    if st.button("🗑️ Vaciar tiempos", use_container_width=True, key="vaciar_tiempos"):
+                        perfilador().vaciar()
+                        st.rerun()
+            elif perfilador().activo:
+                st.info("Los tiempos se toman desde el próximo rerun.")
+        
+        st.markdown("---")
+        
+        # MODO: MOVER STOCK
+        if st.session_state.modo_mover_stock == 'seleccionar':
+            st.subheader("🔄 Mover Stock entre Ubicaciones")
             
-            with col_exp2:
-                if st.button("🔄 Actualizar Precios", use_container_width=True, key="btn_actualizar_precios"):
-                    st.session_state.modo_edicion = 'actualizar_precios'
-                    st.rerun()
-            
-            with col_exp3:
-                if st.button("🔄 Reiniciar Caja", use_container_width=True, key="reset_caja"):
-                    st.session_state.caja = 0.0
-                    st.session_state.ventas_diarias = []
-                    for item in st.session_state.inventario:
-                        item['Ventas_Total'] = 0
-                        item['Stock_Total'] = item['Entrada_Total']
-                        # Mantener la distribución original de stock
-                    guardar_inventario()
-                    st.success("Caja y ventas reiniciadas")
-                    st.rerun()
-    
-    # TAB 3: GESTIÓN INVENTARIO - MODIFICADA
-    with tab3:
-        st.header("⚙️ Gestión de Inventario")
+            if df.empty:
+                st.info("No hay productos para mover.")
+            else:
+                # Seleccionar producto
+                productos_opciones = {f"{row['Producto']} ({row['Talla']}, {row['Color']}) - B:{row['Stock_Bodega']} | E:{row['Stock_Exhibido']}": row['ID'] 
+                                    for _, row in df.iterrows()}
+                
+                producto_seleccionado = st.selectbox(
+                    "Selecciona un producto para mover stock:",
+                    list(productos_opciones.keys()),
+                    key="select_mover"
+                )
+                
+                if producto_seleccionado:
+                    producto_id = productos_opciones[producto_seleccionado]
+                    producto_data = inv.obtener(producto_id)
+                    
+                    if producto_data:
+                        st.session_state.producto_mover = producto_id
+                        st.session_state.modo_mover_stock = 'mover'
+                        st.rerun()
         
-        # Verificar login
-        if not st.session_state.admin_logged_in:
-            st.markdown("### 🔒 Acceso Administrador")
+        elif st.session_state.modo_mover_stock == 'mover' and st.session_state.producto_mover:
+            # Formulario para mover stock
+            producto_id = st.session_state.producto_mover
+            producto_data = inv.obtener(producto_id)
             
-            with st.container(border=True):
-                password = st.text_input("Contraseña:", type="password", key="password_input_admin")
+            if producto_data:
+                st.subheader(f"🔄 Mover Stock: {producto_data['Producto']}")
                 
-                col1, col2 = st.columns([1, 3])
-                with col1:
-                    if st.button("🔑 Ingresar", type="primary", use_container_width=True, key="login_admin"):
-                        if password == CONTRASENA:
-                            st.session_state.admin_logged_in = True
-                            st.success("✅ Acceso concedido")
-                            st.rerun()
-                        else:
-                            st.error("❌ Contraseña incorrecta")
+                with st.form("form_mover_stock"):
+                    col_info1, col_info2 = st.columns(2)
+                    with col_info1:
+                        st.write(f"**📦 Stock Bodega:** {producto_data['Stock_Bodega']}")
+                        st.write(f"**🛍️ Stock Exhibido:** {producto_data['Stock_Exhibido']}")
+                        st.write(f"**📍 Ubicación actual:** {producto_data['Ubicacion']}")
+                    
+                    with col_info2:
+                        # Seleccionar dirección del movimiento
+                        direccion = st.selectbox(
+                            "Dirección del movimiento:",
+                            ["De Bodega a Exhibido", "De Exhibido a Bodega"],
+                            key="direccion_mover"
+                        )
+                        
+                        # Determinar origen y destino
+                        if direccion == "De Bodega a Exhibido":
+                            origen = "Bodega"
+                            destino = "Exhibido"
+                            max_cantidad = producto_data['Stock_Bodega']
+                        else:
+                            origen = "Exhibido"
+                            destino = "Bodega"
+                            max_cantidad = producto_data['Stock_Exhibido']
+                        
+                        cantidad = st.number_input(
+                            f"Cantidad a mover (máx: {max_cantidad}):",
+                            min_value=1,
+                            max_value=max_cantidad,
+                            value=1 if max_cantidad > 0 else 0,
+                            step=1,
+                            key="cantidad_mover"
+                        )
+                    
+                    col_btn1, col_btn2, col_btn3 = st.columns(3)
+                    with col_btn1:
+                        mover = st.form_submit_button("🔄 Mover Stock", type="primary", use_container_width=True)
+                    with col_btn2:
+                        cancelar = st.form_submit_button("❌ Cancelar", use_container_width=True)
+                    
+                    if cancelar:
+                        st.session_state.modo_mover_stock = None
+                        st.session_state.producto_mover = None
+                        st.rerun()
+                    
+                    if mover and cantidad > 0:
+                        success, mensaje = mover_stock(producto_id, cantidad, origen, destino)
+                        if success:
+                            st.success(f"✅ {mensaje}")
+                            st.session_state.modo_mover_stock = None
+                            st.session_state.producto_mover = None
+                            st.rerun()
+                        else:
+                            st.error(f"❌ {mensaje}")
+        
+        # PANEL DE GESTIÓN DE CATEGORÍAS
+        elif st.session_state.mostrar_gestion_categorias:
+            st.subheader("🏷️ Gestión de Categorías")
+            
+            col_info1, col_info2 = st.columns(2)
+            with col_info1:
+                with st.container(border=True):
+                    st.markdown("### 📋 Categorías Existentes")
+                    todas_categorias = obtener_todas_categorias()
+                    
+                    st.write("**Categorías base:**")
+                    for cat in CATEGORIAS_BASE:
+                        st.write(f"- {cat}")
+                    
+                    if st.session_state.categorias_personalizadas:
+                        st.write("\n**Categorías personalizadas:**")
+                        for cat in st.session_state.categorias_personalizadas:
+                            st.write(f"- 📌 {cat}")
+                    else:
+                        st.info("No hay categorías personalizadas aún.")
+            
+            with col_info2:
+                with st.container(border=True):
+                    st.markdown("### ➕ Agregar Nueva Categoría")
+                    
+                    nueva_categoria = st.text_input("Nombre de la nueva categoría:", 
+                                                  placeholder="Ej: Sudaderas, Trajes, Chalecos...")
+                    
+                    if st.button("➕ Agregar Categoría", use_container_width=True):
+                        if nueva_categoria:
+                            if agregar_categoria_personalizada(nueva_categoria):
+                                st.success(f"✅ Categoría '{nueva_categoria}' agregada!")
+                                st.rerun()
+                            else:
+                                st.error(f"❌ La categoría '{nueva_categoria}' ya existe.")
+                        else:
+                            st.error("❌ Ingresa un nombre para la categoría.")
+                    
+                    st.markdown("---")
+                    
+                    st.markdown("### 🗑️ Eliminar Categoría Personalizada")
+                    
+                    if st.session_state.categorias_personalizadas:
+                        cat_a_eliminar = st.selectbox(
+                            "Selecciona categoría a eliminar:",
+                            st.session_state.categorias_personalizadas,
+                            key="select_cat_eliminar"
+                        )
+                        
+                        if st.button("🗑️ Eliminar Categoría", use_container_width=True, type="secondary"):
+                            success, message = eliminar_categoria_personalizada(cat_a_eliminar)
+                            if success:
+                                st.success(message)
+                                st.rerun()
+                            else:
+                                st.error(message)
+                    else:
+                        st.info("No hay categorías personalizadas para eliminar.")
+            
+            st.markdown("---")
+            if st.button("⬅️ Volver a Gestión", use_container_width=True):
+                st.session_state.mostrar_gestion_categorias = False
+                st.rerun()
+        
+        # MODO: ACTUALIZAR PRECIOS
+        elif st.session_state.modo_edicion == 'actualizar_precios':
+            st.subheader("💰 Actualizar Precios")
+            
+            if df.empty:
+                st.info("No hay productos para actualizar.")
+            else:
+                # Seleccionar producto
+                productos_opciones = {f"{row['Producto']} ({row['Talla']}) - Sug:${row['Precio_Sugerido']:.2f} | Ven:${row['Precio_Venta']:.2f}": row['ID'] 
+                                    for _, row in df.iterrows()}
+                
+                producto_seleccionado = st.selectbox(
+                    "Selecciona un producto para actualizar precios:",
+                    list(productos_opciones.keys()),
+                    key="select_actualizar_precios"
+                )
+                
+                if producto_seleccionado:
+                    producto_id = productos_opciones[producto_seleccionado]
+                    producto_data = inv.obtener(producto_id)
+                    
+                    if producto_data:
+                        with st.form("form_actualizar_precios"):
+                            col_precio1, col_precio2 = st.columns(2)
+                            
+                            with col_precio1:
+                                nuevo_precio_sugerido = st.number_input(
+                                    "Nuevo precio sugerido ($):",
+                                    min_value=0.0,
+                                    value=float(producto_data['Precio_Sugerido']),
+                                    step=0.01,
+                                    format="%.2f",
+                                    key="nuevo_sugerido"
+                                )
+                            
+                            with col_precio2:
+                                nuevo_precio_venta = st.number_input(
+                                    "Nuevo precio de venta ($):",
+                                    min_value=0.0,
+                                    value=float(producto_data['Precio_Venta']),
+                                    step=0.01,
+                                    format="%.2f",
+                                    key="nuevo_venta"
+                                )
+                            
+                            col_btn1, col_btn2 = st.columns(2)
+                            with col_btn1:
+                                guardar = st.form_submit_button("💾 Actualizar Precios", type="primary", use_container_width=True)
+                            with col_btn2:
+                                cancelar = st.form_submit_button("❌ Cancelar", use_container_width=True)
+                            
+                            if cancelar:
+                                st.session_state.modo_edicion = None
+                                st.rerun()
+                            
+                            if guardar:
+                                # Actualizar ambos precios
+                                success, mensaje = actualizar_producto(producto_id, {
+                                    'Precio_Sugerido': float(nuevo_precio_sugerido),
+                                    'Precio_Venta': float(nuevo_precio_venta)
+                                })
+                                if success:
+                                    st.success("✅ Ambos precios actualizados")
+                                    st.session_state.modo_edicion = None
+                                    st.rerun()
+                                else:
+                                    st.error(f"❌ {mensaje}")
+        
+        # MODO NORMAL: GESTIÓN DE PRODUCTOS
         else:
-            # Mostrar controles de administrador
-            st.success("✅ **Modo administrador activado**")
+            # Selección de modo
+            st.subheader("📋 Acciones Disponibles")
             
-            # Botones principales
-            col_logout, col_cats, col_mover, col_space = st.columns([1, 1, 1, 1])
-            with col_logout:
-                if st.button("🚪 Cerrar Sesión", use_container_width=True, key="logout_admin"):
-                    st.session_state.admin_logged_in = False
-                    st.session_state.modo_edicion = None
+            col1, col2, col3, col4, col5 = st.columns(5)
+            
+            with col1:
+                if st.button("➕ Agregar Producto", use_container_width=True, 
+                           type="primary" if st.session_state.modo_edicion == 'agregar' else "secondary"):
+                    st.session_state.modo_edicion = 'agregar'
                     st.session_state.producto_editar = None
-                    st.session_state.mostrar_gestion_categorias = False
-                    st.session_state.modo_mover_stock = None
                     st.rerun()
             
-            with col_cats:
-                if st.button("🏷️ Categorías", use_container_width=True, 
-                           type="primary" if st.session_state.mostrar_gestion_categorias else "secondary"):
-                    st.session_state.mostrar_gestion_categorias = not st.session_state.mostrar_gestion_categorias
-                    st.session_state.modo_edicion = None
-                    st.session_state.modo_mover_stock = None
+            with col2:
+                if st.button("✏️ Editar Producto", use_container_width=True,
+                           type="primary" if st.session_state.modo_edicion == 'editar' else "secondary"):
+                    st.session_state.modo_edicion = 'editar'
+                    st.rerun()
+            
+            with col3:
+                if st.button("🗑️ Eliminar Producto", use_container_width=True,
+                           type="primary" if st.session_state.modo_edicion == 'eliminar' else "secondary"):
+                    st.session_state.modo_edicion = 'eliminar'
+                    st.rerun()
+            
+            with col4:
+                if st.button("📥 Importar Archivo", use_container_width=True,
+                           type="primary" if st.session_state.modo_edicion == 'importar' else "secondary"):
+                    st.session_state.modo_edicion = 'importar'
                     st.rerun()
             
-            with col_mover:
-                if st.button("🔄 Mover Stock", use_container_width=True,
-                           type="primary" if st.session_state.modo_mover_stock == 'seleccionar' else "secondary"):
-                    st.session_state.modo_mover_stock = 'seleccionar'
-                    st.session_state.mostrar_gestion_categorias = False
+            with col5:
+                if st.button("📊 Ver Inventario", use_container_width=True,
+                           type="primary" if st.session_state.modo_edicion is None else "secondary"):
                     st.session_state.modo_edicion = None
                     st.rerun()
             
             st.markdown("---")
             
-            # MODO: MOVER STOCK
-            if st.session_state.modo_mover_stock == 'seleccionar':
-                st.subheader("🔄 Mover Stock entre Ubicaciones")
+            # MODO: AGREGAR PRODUCTO - CON ESPECIFICACIÓN DE STOCK
+            if st.session_state.modo_edicion == 'agregar':
+                st.subheader("📝 Agregar Nuevo Producto")
                 
-                if df.empty:
-                    st.info("No hay productos para mover.")
-                else:
-                    # Seleccionar producto
-                    productos_opciones = {f"{row['Producto']} ({row['Talla']}, {row['Color']}) - B:{row['Stock_Bodega']} | E:{row['Stock_Exhibido']}": row['ID'] 
-                                        for _, row in df.iterrows()}
+                with st.form("form_agregar_producto", clear_on_submit=True):
+                    col1, col2 = st.columns(2)
                     
-                    producto_seleccionado = st.selectbox(
-                        "Selecciona un producto para mover stock:",
-                        list(productos_opciones.keys()),
-                        key="select_mover"
-                    )
-                    
-                    if producto_seleccionado:
-                        producto_id = productos_opciones[producto_seleccionado]
-                        producto_data = next((item for item in st.session_state.inventario 
-                                            if item['ID'] == producto_id), None)
+                    with col1:
+                        todas_categorias = obtener_todas_categorias()
                         
-                        if producto_data:
-                            st.session_state.producto_mover = producto_id
-                            st.session_state.modo_mover_stock = 'mover'
-                            st.rerun()
-            
-            elif st.session_state.modo_mover_stock == 'mover' and st.session_state.producto_mover:
-                # Formulario para mover stock
-                producto_id = st.session_state.producto_mover
-                producto_data = next((item for item in st.session_state.inventario 
-                                    if item['ID'] == producto_id), None)
-                
-                if producto_data:
-                    st.subheader(f"🔄 Mover Stock: {producto_data['Producto']}")
+                        categoria = st.selectbox("Categoría:", todas_categorias, key="cat_agregar")
+                        producto = st.text_input("Nombre del Producto*:", key="prod_agregar")
+                        color = st.text_input("Color*:", key="color_agregar")
+                        talla = st.text_input("Talla*:", placeholder="M, 32, Unitalla...", key="talla_agregar")
                     
-                    with st.form("form_mover_stock"):
-                        col_info1, col_info2 = st.columns(2)
-                        with col_info1:
-                            st.write(f"**📦 Stock Bodega:** {producto_data['Stock_Bodega']}")
-                            st.write(f"**🛍️ Stock Exhibido:** {producto_data['Stock_Exhibido']}")
-                            st.write(f"**📍 Ubicación actual:** {producto_data['Ubicacion']}")
+                    with col2:
+                        st.markdown("### 📦 Distribución del Stock")
                         
-                        with col_info2:
-                            # Seleccionar dirección del movimiento
-                            direccion = st.selectbox(
-                                "Dirección del movimiento:",
-                                ["De Bodega a Exhibido", "De Exhibido a Bodega"],
-                                key="direccion_mover"
-                            )
-                            
-                            # Determinar origen y destino
-                            if direccion == "De Bodega a Exhibido":
-                                origen = "Bodega"
-                                destino = "Exhibido"
-                                max_cantidad = producto_data['Stock_Bodega']
-                            else:
-                                origen = "Exhibido"
-                                destino = "Bodega"
-                                max_cantidad = producto_data['Stock_Exhibido']
-                            
-                            cantidad = st.number_input(
-                                f"Cantidad a mover (máx: {max_cantidad}):",
-                                min_value=1,
-                                max_value=max_cantidad,
-                                value=1 if max_cantidad > 0 else 0,
+                        col_stock1, col_stock2 = st.columns(2)
+                        with col_stock1:
+                            stock_bodega = st.number_input(
+                                "Stock en Bodega:",
+                                min_value=0,
+                                value=0,
                                 step=1,
-                                key="cantidad_mover"
+                                key="stock_bodega_agregar"
                             )
                         
-                        col_btn1, col_btn2, col_btn3 = st.columns(3)
-                        with col_btn1:
-                            mover = st.form_submit_button("🔄 Mover Stock", type="primary", use_container_width=True)
-                        with col_btn2:
-                            cancelar = st.form_submit_button("❌ Cancelar", use_container_width=True)
-                        
-                        if cancelar:
-                            st.session_state.modo_mover_stock = None
-                            st.session_state.producto_mover = None
-                            st.rerun()
-                        
-                        if mover and cantidad > 0:
-                            success, mensaje = mover_stock(producto_id, cantidad, origen, destino)
-                            if success:
-                                st.success(f"✅ {mensaje}")
-                                st.session_state.modo_mover_stock = None
-                                st.session_state.producto_mover = None
-                                st.rerun()
-                            else:
-                                st.error(f"❌ {mensaje}")
-            
-            # PANEL DE GESTIÓN DE CATEGORÍAS
-            elif st.session_state.mostrar_gestion_categorias:
-                st.subheader("🏷️ Gestión de Categorías")
-                
-                col_info1, col_info2 = st.columns(2)
-                with col_info1:
-                    with st.container(border=True):
-                        st.markdown("### 📋 Categorías Existentes")
-                        todas_categorias = obtener_todas_categorias()
-                        
-                        st.write("**Categorías base:**")
-                        for cat in CATEGORIAS_BASE:
-                            st.write(f"- {cat}")
+                        with col_stock2:
+                            stock_exhibido = st.number_input(
+                                "Stock en Exhibido:",
+                                min_value=0,
+                                value=1,
+                                step=1,
+                                key="stock_exhibido_agregar"
+                            )
                         
-                        if st.session_state.categorias_personalizadas:
-                            st.write("\n**Categorías personalizadas:**")
-                            for cat in st.session_state.categorias_personalizadas:
-                                st.write(f"- 📌 {cat}")
+                        # Calcular y mostrar total
+                        total_stock = stock_bodega + stock_exhibido
+                        if total_stock == 0:
+                            st.error("⚠️ El stock total debe ser mayor a 0")
                         else:
-                            st.info("No hay categorías personalizadas aún.")
-                
-                with col_info2:
-                    with st.container(border=True):
-                        st.markdown("### ➕ Agregar Nueva Categoría")
+                            # Determinar ubicación principal
+                            ubicacion_principal = "Exhibido" if stock_exhibido > stock_bodega else "Bodega" if stock_bodega > stock_exhibido else "Exhibido (iguales)"
+                            st.info(f"**📊 Stock total:** {total_stock} unidades")
+                            st.info(f"**📍 Ubicación principal:** {ubicacion_principal}")
                         
-                        nueva_categoria = st.text_input("Nombre de la nueva categoría:", 
-                                                      placeholder="Ej: Sudaderas, Trajes, Chalecos...")
+                        st.markdown("### 💰 Precios")
+                        precio_sugerido = st.number_input("Precio Sugerido ($):", 
+                                                        min_value=0.0, 
+                                                        value=0.0, 
+                                                        step=0.01, 
+                                                        format="%.2f", 
+                                                        key="precio_sug_agregar")
                         
-                        if st.button("➕ Agregar Categoría", use_container_width=True):
-                            if nueva_categoria:
-                                if agregar_categoria_personalizada(nueva_categoria):
-                                    st.success(f"✅ Categoría '{nueva_categoria}' agregada!")
-                                    st.rerun()
-                                else:
-                                    st.error(f"❌ La categoría '{nueva_categoria}' ya existe.")
-                            else:
-                                st.error("❌ Ingresa un nombre para la categoría.")
-                        
-                        st.markdown("---")
-                        
-                        st.markdown("### 🗑️ Eliminar Categoría Personalizada")
-                        
-                        if st.session_state.categorias_personalizadas:
-                            cat_a_eliminar = st.selectbox(
-                                "Selecciona categoría a eliminar:",
-                                st.session_state.categorias_personalizadas,
-                                key="select_cat_eliminar"
+                        precio_venta = st.number_input("Precio Venta Inicial ($):", 
+                                                     min_value=0.0, 
+                                                     value=0.0, 
+                                                     step=0.01, 
+                                                     format="%.2f", 
+                                                     key="precio_venta_agregar")
+                    
+                    # Indicar campos obligatorios
+                    st.caption("(*) Campos obligatorios")
+                    
+                    submitted = st.form_submit_button("➕ Agregar al Inventario", type="primary", use_container_width=True)
+                    
+                    if submitted:
+                        # Validaciones
+                        if not producto or not color or not talla:
+                            st.error("❌ Completa los campos obligatorios (*)")
+                        elif total_stock == 0:
+                            st.error("❌ El stock total debe ser mayor a 0")
+                        else:
+                            nuevo_producto = crear_nuevo_producto(
+                                producto=producto,
+                                talla=talla,
+                                color=color,
+                                categoria=categoria,
+                                stock_bodega=stock_bodega,
+                                stock_exhibido=stock_exhibido,
+                                precio_sugerido=precio_sugerido,
+                                precio_venta=precio_venta if precio_venta > 0 else precio_sugerido
                             )
                             
-                            if st.button("🗑️ Eliminar Categoría", use_container_width=True, type="secondary"):
-                                success, message = eliminar_categoria_personalizada(cat_a_eliminar)
-                                if success:
-                                    st.success(message)
-                                    st.rerun()
-                                else:
-                                    st.error(message)
-                        else:
-                            st.info("No hay categorías personalizadas para eliminar.")
-                
-                st.markdown("---")
-                if st.button("⬅️ Volver a Gestión", use_container_width=True):
-                    st.session_state.mostrar_gestion_categorias = False
-                    st.rerun()
+                            if agregar_producto(nuevo_producto):
+                                ubicacion_principal = "Exhibido" if stock_exhibido > stock_bodega else "Bodega" if stock_bodega > stock_exhibido else "Exhibido"
+                                st.success(f"✅ {producto} agregado exitosamente!")
+                                
+                                # Mostrar resumen
+                                col_res1, col_res2 = st.columns(2)
+                                with col_res1:
+                                    st.info(f"📦 **Bodega:** {stock_bodega} unidades")
+                                with col_res2:
+                                    st.info(f"🛍️ **Exhibido:** {stock_exhibido} unidades")
+                                
+                                st.info(f"📍 **Ubicación principal:** {ubicacion_principal}")
+                                
+                                st.balloons()
+                                st.session_state.modo_edicion = None
+                                st.rerun()
             
-            # MODO: ACTUALIZAR PRECIOS
-            elif st.session_state.modo_edicion == 'actualizar_precios':
-                st.subheader("💰 Actualizar Precios")
+            # MODO: EDITAR PRODUCTO - CON ESPECIFICACIÓN DE STOCK
+            elif st.session_state.modo_edicion == 'editar':
+                st.subheader("✏️ Editar Producto Existente")
                 
                 if df.empty:
-                    st.info("No hay productos para actualizar.")
+                    st.info("No hay productos para editar.")
                 else:
-                    # Seleccionar producto
-                    productos_opciones = {f"{row['Producto']} ({row['Talla']}) - Sug:${row['Precio_Sugerido']:.2f} | Ven:${row['Precio_Venta']:.2f}": row['ID'] 
+                    # Lista de productos para seleccionar
+                    productos_opciones = {f"{row['Producto']} ({row['Talla']}, {row['Color']}) - B:{row['Stock_Bodega']} | E:{row['Stock_Exhibido']}": row['ID'] 
                                         for _, row in df.iterrows()}
                     
                     producto_seleccionado = st.selectbox(
-                        "Selecciona un producto para actualizar precios:",
+                        "Selecciona un producto para editar:",
                         list(productos_opciones.keys()),
-                        key="select_actualizar_precios"
+                        key="select_editar"
                     )
                     
                     if producto_seleccionado:
                         producto_id = productos_opciones[producto_seleccionado]
-                        producto_data = next((item for item in st.session_state.inventario 
-                                            if item['ID'] == producto_id), None)
+                        producto_data = inv.obtener(producto_id)
                         
                         if producto_data:
-                            with st.form("form_actualizar_precios"):
-                                col_precio1, col_precio2 = st.columns(2)
+                            # Stock que mostraba el formulario en el rerun anterior: si otra
+                            # caja vendió o movió stock desde entonces, guardar se rechaza
+                            stock_mostrado = st.session_state.get('stock_editar_mostrado')
+                            if not stock_mostrado or stock_mostrado.get('ID') != producto_id:
+                                stock_mostrado = None
+                            st.session_state.stock_editar_mostrado = {
+                                campo: producto_data[campo]
+                                for campo in ('ID', 'Stock_Bodega', 'Stock_Exhibido', 'Ventas_Total')
+                            }
+                            
+                            with st.form("form_editar_producto"):
+                                st.write(f"**Editando:** {producto_data['Producto']}")
                                 
-                                with col_precio1:
-                                    nuevo_precio_sugerido = st.number_input(
-                                        "Nuevo precio sugerido ($):",
-                                        min_value=0.0,
-                                        value=float(producto_data['Precio_Sugerido']),
-                                        step=0.01,
-                                        format="%.2f",
-                                        key="nuevo_sugerido"
-                                    )
+                                col1, col2 = st.columns(2)
                                 
-                                with col_precio2:
-                                    nuevo_precio_venta = st.number_input(
-                                        "Nuevo precio de venta ($):",
-                                        min_value=0.0,
-                                        value=float(producto_data['Precio_Venta']),
-                                        step=0.01,
-                                        format="%.2f",
-                                        key="nuevo_venta"
+                                with col1:
+                                    todas_categorias = obtener_todas_categorias()
+                                    
+                                    nueva_categoria = st.selectbox(
+                                        "Categoría:",
+                                        todas_categorias,
+                                        index=todas_categorias.index(producto_data['Categoria']) 
+                                        if producto_data['Categoria'] in todas_categorias else 0,
+                                        key="cat_editar"
                                     )
-                                
-                                col_btn1, col_btn2 = st.columns(2)
-                                with col_btn1:
-                                    guardar = st.form_submit_button("💾 Actualizar Precios", type="primary", use_container_width=True)
-                                with col_btn2:
-                                    cancelar = st.form_submit_button("❌ Cancelar", use_container_width=True)
-                                
-                                if cancelar:
-                                    st.session_state.modo_edicion = None
-                                    st.rerun()
-                                
-                                if guardar:
-                                    # Actualizar ambos precios
-                                    producto_data['Precio_Sugerido'] = float(nuevo_precio_sugerido)
-                                    producto_data['Precio_Venta'] = float(nuevo_precio_venta)
-                                    guardar_inventario()
-                                    st.success("✅ Ambos precios actualizados")
-                                    st.session_state.modo_edicion = None
-                                    st.rerun()
-            
-            # MODO NORMAL: GESTIÓN DE PRODUCTOS
-            else:
-                # Selección de modo
-                st.subheader("📋 Acciones Disponibles")
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    if st.button("➕ Agregar Producto", use_container_width=True, 
-                               type="primary" if st.session_state.modo_edicion == 'agregar' else "secondary"):
-                        st.session_state.modo_edicion = 'agregar'
-                        st.session_state.producto_editar = None
-                        st.rerun()
-                
-                with col2:
-                    if st.button("✏️ Editar Producto", use_container_width=True,
-                               type="primary" if st.session_state.modo_edicion == 'editar' else "secondary"):
-                        st.session_state.modo_edicion = 'editar'
-                        st.rerun()
-                
-                with col3:
-                    if st.button("🗑️ Eliminar Producto", use_container_width=True,
-                               type="primary" if st.session_state.modo_edicion == 'eliminar' else "secondary"):
-                        st.session_state.modo_edicion = 'eliminar'
-                        st.rerun()
-                
-                with col4:
-                    if st.button("📊 Ver Inventario", use_container_width=True,
-                               type="primary" if st.session_state.modo_edicion is None else "secondary"):
-                        st.session_state.modo_edicion = None
-                        st.rerun()
-                
-                st.markdown("---")
-                
-                # MODO: AGREGAR PRODUCTO - CON ESPECIFICACIÓN DE STOCK
-                if st.session_state.modo_edicion == 'agregar':
-                    st.subheader("📝 Agregar Nuevo Producto")
-                    
-                    with st.form("form_agregar_producto", clear_on_submit=True):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            todas_categorias = obtener_todas_categorias()
-                            
-                            categoria = st.selectbox("Categoría:", todas_categorias, key="cat_agregar")
-                            producto = st.text_input("Nombre del Producto*:", key="prod_agregar")
-                            color = st.text_input("Color*:", key="color_agregar")
-                            talla = st.text_input("Talla*:", placeholder="M, 32, Unitalla...", key="talla_agregar")
-                        
-                        with col2:
-                            st.markdown("### 📦 Distribución del Stock")
-                            
-                            col_stock1, col_stock2 = st.columns(2)
-                            with col_stock1:
-                                stock_bodega = st.number_input(
-                                    "Stock en Bodega:",
-                                    min_value=0,
-                                    value=0,
-                                    step=1,
-                                    key="stock_bodega_agregar"
-                                )
-                            
-                            with col_stock2:
-                                stock_exhibido = st.number_input(
-                                    "Stock en Exhibido:",
-                                    min_value=0,
-                                    value=1,
-                                    step=1,
-                                    key="stock_exhibido_agregar"
-                                )
-                            
-                            # Calcular y mostrar total
-                            total_stock = stock_bodega + stock_exhibido
-                            if total_stock == 0:
-                                st.error("⚠️ El stock total debe ser mayor a 0")
-                            else:
-                                # Determinar ubicación principal
-                                ubicacion_principal = "Exhibido" if stock_exhibido > stock_bodega else "Bodega" if stock_bodega > stock_exhibido else "Exhibido (iguales)"
-                                st.info(f"**📊 Stock total:** {total_stock} unidades")
-                                st.info(f"**📍 Ubicación principal:** {ubicacion_principal}")
-                            
-                            st.markdown("### 💰 Precios")
-                            precio_sugerido = st.number_input("Precio Sugerido ($):", 
-                                                            min_value=0.0, 
-                                                            value=0.0, 
-                                                            step=0.01, 
-                                                            format="%.2f", 
-                                                            key="precio_sug_agregar")
-                            
-                            precio_venta = st.number_input("Precio Venta Inicial ($):", 
-                                                         min_value=0.0, 
-                                                         value=0.0, 
-                                                         step=0.01, 
-                                                         format="%.2f", 
-                                                         key="precio_venta_agregar")
-                        
-                        # Indicar campos obligatorios
-                        st.caption("(*) Campos obligatorios")
-                        
-                        submitted = st.form_submit_button("➕ Agregar al Inventario", type="primary", use_container_width=True)
-                        
-                        if submitted:
-                            # Validaciones
-                            if not producto or not color or not talla:
-                                st.error("❌ Completa los campos obligatorios (*)")
-                            elif total_stock == 0:
-                                st.error("❌ El stock total debe ser mayor a 0")
-                            else:
-                                nuevo_producto = crear_nuevo_producto(
-                                    producto=producto,
-                                    talla=talla,
-                                    color=color,
-                                    categoria=categoria,
-                                    stock_bodega=stock_bodega,
-                                    stock_exhibido=stock_exhibido,
-                                    precio_sugerido=precio_sugerido,
-                                    precio_venta=precio_venta if precio_venta > 0 else precio_sugerido
-                                )
-                                
-                                if agregar_producto(nuevo_producto):
-                                    ubicacion_principal = "Exhibido" if stock_exhibido > stock_bodega else "Bodega" if stock_bodega > stock_exhibido else "Exhibido"
-                                    st.success(f"✅ {producto} agregado exitosamente!")
                                     
-                                    # Mostrar resumen
-                                    col_res1, col_res2 = st.columns(2)
-                                    with col_res1:
-                                        st.info(f"📦 **Bodega:** {stock_bodega} unidades")
-                                    with col_res2:
-                                        st.info(f"🛍️ **Exhibido:** {stock_exhibido} unidades")
+                                    nuevo_producto = st.text_input("Nombre del Producto*:", 
+                                                                  value=producto_data['Producto'],
+                                                                  key="prod_editar")
                                     
-                                    st.info(f"📍 **Ubicación principal:** {ubicacion_principal}")
+                                    nuevo_color = st.text_input("Color*:", 
+                                                              value=producto_data['Color'],
+                                                              key="color_editar")
                                     
-                                    st.balloons()
-                                    st.session_state.modo_edicion = None
-                                    st.rerun()
-                
-                # MODO: EDITAR PRODUCTO - CON ESPECIFICACIÓN DE STOCK
-                elif st.session_state.modo_edicion == 'editar':
-                    st.subheader("✏️ Editar Producto Existente")
-                    
-                    if df.empty:
-                        st.info("No hay productos para editar.")
-                    else:
-                        # Lista de productos para seleccionar
-                        productos_opciones = {f"{row['Producto']} ({row['Talla']}, {row['Color']}) - B:{row['Stock_Bodega']} | E:{row['Stock_Exhibido']}": row['ID'] 
-                                            for _, row in df.iterrows()}
-                        
-                        producto_seleccionado = st.selectbox(
-                            "Selecciona un producto para editar:",
-                            list(productos_opciones.keys()),
-                            key="select_editar"
-                        )
-                        
-                        if producto_seleccionado:
-                            producto_id = productos_opciones[producto_seleccionado]
-                            producto_data = next((item for item in st.session_state.inventario 
-                                                if item['ID'] == producto_id), None)
-                            
-                            if producto_data:
-                                with st.form("form_editar_producto"):
-                                    st.write(f"**Editando:** {producto_data['Producto']}")
+                                    nueva_talla = st.text_input("Talla*:", 
+                                                              value=producto_data['Talla'],
+                                                              key="talla_editar")
+                                
+                                with col2:
+                                    st.markdown("### 📦 Distribución del Stock")
                                     
-                                    col1, col2 = st.columns(2)
+                                    # Calcular total actual
+                                    stock_actual_total = producto_data['Stock_Bodega'] + producto_data['Stock_Exhibido']
+                                    ventas_actuales = producto_data['Ventas_Total']
                                     
-                                    with col1:
-                                        todas_categorias = obtener_todas_categorias()
-                                        
-                                        nueva_categoria = st.selectbox(
-                                            "Categoría:",
-                                            todas_categorias,
-                                            index=todas_categorias.index(producto_data['Categoria']) 
-                                            if producto_data['Categoria'] in todas_categorias else 0,
-                                            key="cat_editar"
+                                    # Nuevos stocks por ubicación
+                                    col_stock1, col_stock2 = st.columns(2)
+                                    with col_stock1:
+                                        nuevo_stock_bodega = st.number_input(
+                                            "Stock en Bodega:",
+                                            min_value=0,
+                                            value=int(producto_data['Stock_Bodega']),
+                                            step=1,
+                                            key="stock_bodega_editar"
                                         )
-                                        
-                                        nuevo_producto = st.text_input("Nombre del Producto*:", 
-                                                                      value=producto_data['Producto'],
-                                                                      key="prod_editar")
-                                        
-                                        nuevo_color = st.text_input("Color*:", 
-                                                                  value=producto_data['Color'],
-                                                                  key="color_editar")
-                                        
-                                        nueva_talla = st.text_input("Talla*:", 
-                                                                  value=producto_data['Talla'],
-                                                                  key="talla_editar")
                                     
-                                    with col2:
-                                        st.markdown("### 📦 Distribución del Stock")
-                                        
-                                        # Calcular total actual
-                                        stock_actual_total = producto_data['Stock_Bodega'] + producto_data['Stock_Exhibido']
-                                        ventas_actuales = producto_data['Ventas_Total']
-                                        
-                                        # Nuevos stocks por ubicación
-                                        col_stock1, col_stock2 = st.columns(2)
-                                        with col_stock1:
-                                            nuevo_stock_bodega = st.number_input(
-                                                "Stock en Bodega:",
-                                                min_value=0,
-                                                value=int(producto_data['Stock_Bodega']),
-                                                step=1,
-                                                key="stock_bodega_editar"
-                                            )
-                                        
-                                        with col_stock2:
-                                            nuevo_stock_exhibido = st.number_input(
-                                                "Stock en Exhibido:",
-                                                min_value=0,
-                                                value=int(producto_data['Stock_Exhibido']),
-                                                step=1,
-                                                key="stock_exhibido_editar"
-                                            )
-                                        
-                                        # Calcular nuevo total y verificar
-                                        nuevo_stock_total = nuevo_stock_bodega + nuevo_stock_exhibido
-                                        nueva_entrada_total = nuevo_stock_total + ventas_actuales
-                                        
-                                        # Verificar que el stock no sea menor a las ventas
-                                        if nuevo_stock_total < 0:
-                                            st.error(f"❌ El stock total no puede ser negativo")
-                                        elif nueva_entrada_total < ventas_actuales:
-                                            st.error(f"❌ No puedes reducir la cantidad por debajo de las ventas ({ventas_actuales})")
-                                        else:
-                                            # Determinar nueva ubicación principal
-                                            if nuevo_stock_bodega > nuevo_stock_exhibido:
-                                                nueva_ubicacion = "Bodega"
-                                            elif nuevo_stock_exhibido > nuevo_stock_bodega:
-                                                nueva_ubicacion = "Exhibido"
-                                            else:
-                                                nueva_ubicacion = "Exhibido"  # Por defecto si son iguales
-                                            
-                                            st.info(f"**📊 Nuevo stock total:** {nuevo_stock_total}")
-                                            st.info(f"**📍 Nueva ubicación:** {nueva_ubicacion}")
-                                        
-                                        st.markdown("### 💰 Precios")
-                                        nuevo_precio_sugerido = st.number_input("Precio Sugerido ($):", 
-                                                                              min_value=0.0, 
-                                                                              value=float(producto_data['Precio_Sugerido']),
-                                                                              step=0.01,
-                                                                              format="%.2f",
-                                                                              key="precio_sug_editar")
-                                        
-                                        nuevo_precio_venta = st.number_input("Precio Venta ($):", 
-                                                                            min_value=0.0, 
-                                                                            value=float(producto_data['Precio_Venta']),
-                                                                            step=0.01,
-                                                                            format="%.2f",
-                                                                            key="precio_venta_editar")
-                                    
-                                    # Información actual
-                                    with st.expander("📊 Información actual", expanded=False):
-                                        col_act1, col_act2 = st.columns(2)
-                                        with col_act1:
-                                            st.write(f"**Ventas totales:** {ventas_actuales}")
-                                            st.write(f"**Entrada total:** {producto_data['Entrada_Total']}")
-                                            st.write(f"**Stock total actual:** {stock_actual_total}")
-                                        with col_act2:
-                                            st.write(f"**Ubicación principal:** {producto_data['Ubicacion']}")
-                                            st.write(f"**Bodega actual:** {producto_data['Stock_Bodega']}")
-                                            st.write(f"**Exhibido actual:** {producto_data['Stock_Exhibido']}")
-                                    
-                                    st.caption("(*) Campos obligatorios")
-                                    
-                                    # Botones de acción
-                                    col_btn1, col_btn2, col_btn3 = st.columns(3)
+                                    with col_stock2:
+                                        nuevo_stock_exhibido = st.number_input(
+                                            "Stock en Exhibido:",
+                                            min_value=0,
+                                            value=int(producto_data['Stock_Exhibido']),
+                                            step=1,
+                                            key="stock_exhibido_editar"
+                                        )
                                     
-                                    with col_btn1:
-                                        guardar = st.form_submit_button("💾 Guardar Cambios", type="primary", use_container_width=True)
+                                    # Calcular nuevo total y verificar
+                                    nuevo_stock_total = nuevo_stock_bodega + nuevo_stock_exhibido
+                                    nueva_entrada_total = nuevo_stock_total + ventas_actuales
                                     
-                                    with col_btn2:
-                                        solo_precios = st.form_submit_button("💰 Solo Cambiar Precios", use_container_width=True)
+                                    # Verificar que el stock no sea menor a las ventas
+                                    if nuevo_stock_total < 0:
+                                        st.error(f"❌ El stock total no puede ser negativo")
+                                    elif nueva_entrada_total < ventas_actuales:
+                                        st.error(f"❌ No puedes reducir la cantidad por debajo de las ventas ({ventas_actuales})")
+                                    else:
+                                        # Determinar nueva ubicación principal
+                                        if nuevo_stock_bodega > nuevo_stock_exhibido:
+                                            nueva_ubicacion = "Bodega"
+                                        elif nuevo_stock_exhibido > nuevo_stock_bodega:
+                                            nueva_ubicacion = "Exhibido"
+                                        else:
+                                            nueva_ubicacion = "Exhibido"  # Por defecto si son iguales
+                                        
+                                        st.info(f"**📊 Nuevo stock total:** {nuevo_stock_total}")
+                                        st.info(f"**📍 Nueva ubicación:** {nueva_ubicacion}")
                                     
-                                    with col_btn3:
-                                        if st.form_submit_button("❌ Cancelar", use_container_width=True):
-                                            st.session_state.modo_edicion = None
-                                            st.rerun()
+                                    st.markdown("### 💰 Precios")
+                                    nuevo_precio_sugerido = st.number_input("Precio Sugerido ($):", 
+                                                                          min_value=0.0, 
+                                                                          value=float(producto_data['Precio_Sugerido']),
+                                                                          step=0.01,
+                                                                          format="%.2f",
+                                                                          key="precio_sug_editar")
                                     
-                                    if solo_precios:
-                                        # Solo actualizar precios
-                                        producto_data['Precio_Sugerido'] = float(nuevo_precio_sugerido)
-                                        producto_data['Precio_Venta'] = float(nuevo_precio_venta)
-                                        guardar_inventario()
+                                    nuevo_precio_venta = st.number_input("Precio Venta ($):", 
+                                                                        min_value=0.0, 
+                                                                        value=float(producto_data['Precio_Venta']),
+                                                                        step=0.01,
+                                                                        format="%.2f",
+                                                                        key="precio_venta_editar")
+                                
+                                # Información actual
+                                with st.expander("📊 Información actual", expanded=False):
+                                    col_act1, col_act2 = st.columns(2)
+                                    with col_act1:
+                                        st.write(f"**Ventas totales:** {ventas_actuales}")
+                                        st.write(f"**Entrada total:** {producto_data['Entrada_Total']}")
+                                        st.write(f"**Stock total actual:** {stock_actual_total}")
+                                    with col_act2:
+                                        st.write(f"**Ubicación principal:** {producto_data['Ubicacion']}")
+                                        st.write(f"**Bodega actual:** {producto_data['Stock_Bodega']}")
+                                        st.write(f"**Exhibido actual:** {producto_data['Stock_Exhibido']}")
+                                
+                                st.caption("(*) Campos obligatorios")
+                                
+                                # Botones de acción
+                                col_btn1, col_btn2, col_btn3 = st.columns(3)
+                                
+                                with col_btn1:
+                                    guardar = st.form_submit_button("💾 Guardar Cambios", type="primary", use_container_width=True)
+                                
+                                with col_btn2:
+                                    solo_precios = st.form_submit_button("💰 Solo Cambiar Precios", use_container_width=True)
+                                
+                                with col_btn3:
+                                    if st.form_submit_button("❌ Cancelar", use_container_width=True):
+                                        st.session_state.modo_edicion = None
+                                        st.rerun()
+                                
+                                if solo_precios:
+                                    # Solo actualizar precios
+                                    success, mensaje = actualizar_producto(producto_id, {
+                                        'Precio_Sugerido': float(nuevo_precio_sugerido),
+                                        'Precio_Venta': float(nuevo_precio_venta)
+                                    })
+                                    if success:
                                         st.success("✅ Precios actualizados correctamente")
                                         st.session_state.modo_edicion = None
                                         st.rerun()
-                                    
-                                    if guardar:
-                                        # Validaciones
-                                        if not nuevo_producto or not nuevo_color or not nueva_talla:
-                                            st.error("❌ Completa los campos obligatorios (*)")
-                                        elif nuevo_stock_total < 0:
-                                            st.error("❌ El stock total no puede ser negativo")
-                                        elif nueva_entrada_total < ventas_actuales:
-                                            st.error(f"❌ No puedes reducir la cantidad por debajo de las ventas ({ventas_actuales})")
+                                    else:
+                                        st.error(f"❌ {mensaje}")
+                                
+                                if guardar:
+                                    # Validaciones
+                                    if not nuevo_producto or not nuevo_color or not nueva_talla:
+                                        st.error("❌ Completa los campos obligatorios (*)")
+                                    elif nuevo_stock_total < 0:
+                                        st.error("❌ El stock total no puede ser negativo")
+                                    elif nueva_entrada_total < ventas_actuales:
+                                        st.error(f"❌ No puedes reducir la cantidad por debajo de las ventas ({ventas_actuales})")
+                                    else:
+                                        # Determinar nueva ubicación principal
+                                        if nuevo_stock_bodega > nuevo_stock_exhibido:
+                                            nueva_ubicacion = "Bodega"
+                                        elif nuevo_stock_exhibido > nuevo_stock_bodega:
+                                            nueva_ubicacion = "Exhibido"
                                         else:
-                                            # Determinar nueva ubicación principal
-                                            if nuevo_stock_bodega > nuevo_stock_exhibido:
-                                                nueva_ubicacion = "Bodega"
-                                            elif nuevo_stock_exhibido > nuevo_stock_bodega:
-                                                nueva_ubicacion = "Exhibido"
-                                            else:
-                                                nueva_ubicacion = "Exhibido"  # Por defecto si son iguales
-                                            
-                                            # Actualizar producto
-                                            producto_data['Categoria'] = nueva_categoria
-                                            producto_data['Producto'] = nuevo_producto
-                                            producto_data['Talla'] = nueva_talla
-                                            producto_data['Color'] = nuevo_color
-                                            producto_data['Entrada_Total'] = nueva_entrada_total
-                                            producto_data['Stock_Bodega'] = nuevo_stock_bodega
-                                            producto_data['Stock_Exhibido'] = nuevo_stock_exhibido
-                                            producto_data['Stock_Total'] = nuevo_stock_total
-                                            producto_data['Precio_Sugerido'] = float(nuevo_precio_sugerido)
-                                            producto_data['Precio_Venta'] = float(nuevo_precio_venta)
-                                            producto_data['Ubicacion'] = nueva_ubicacion
-                                            
-                                            guardar_inventario()
+                                            nueva_ubicacion = "Exhibido"  # Por defecto si son iguales
+                                        
+                                        # Actualizar producto
+                                        success, mensaje = actualizar_producto(producto_id, {
+                                            'Categoria': nueva_categoria,
+                                            'Producto': nuevo_producto,
+                                            'Talla': nueva_talla,
+                                            'Color': nuevo_color,
+                                            'Entrada_Total': nueva_entrada_total,
+                                            'Stock_Bodega': nuevo_stock_bodega,
+                                            'Stock_Exhibido': nuevo_stock_exhibido,
+                                            'Stock_Total': nuevo_stock_total,
+                                            'Precio_Sugerido': float(nuevo_precio_sugerido),
+                                            'Precio_Venta': float(nuevo_precio_venta),
+                                            'Ubicacion': nueva_ubicacion
+                                        }, esperado=stock_mostrado)
+                                        
+                                        if success:
                                             st.success("✅ Producto actualizado correctamente")
                                             st.info(f"📍 **Nueva ubicación principal:** {nueva_ubicacion}")
                                             st.session_state.modo_edicion = None
                                             st.rerun()
+                                        else:
+                                            st.error(f"❌ {mensaje}")
+            
+            # MODO: ELIMINAR PRODUCTO
+            elif st.session_state.modo_edicion == 'eliminar':
+                st.subheader("🗑️ Eliminar Producto")
                 
-                # MODO: ELIMINAR PRODUCTO
-                elif st.session_state.modo_edicion == 'eliminar':
-                    st.subheader("🗑️ Eliminar Producto")
+                if df.empty:
+                    st.info("No hay productos para eliminar.")
+                else:
+                    # Mostrar TODOS los productos
+                    productos_eliminar = {f"{row['Producto']} ({row['Talla']}, {row['Color']}) - Ventas: {row['Ventas_Total']}": row['ID'] 
+                                        for _, row in df.iterrows()}
                     
-                    if df.empty:
-                        st.info("No hay productos para eliminar.")
-                    else:
-                        # Mostrar TODOS los productos
-                        productos_eliminar = {f"{row['Producto']} ({row['Talla']}, {row['Color']}) - Ventas: {row['Ventas_Total']}": row['ID'] 
-                                            for _, row in df.iterrows()}
-                        
-                        producto_eliminar = st.selectbox(
-                            "Selecciona un producto para eliminar:",
-                            list(productos_eliminar.keys()),
-                            key="select_eliminar"
-                        )
+                    producto_eliminar = st.selectbox(
+                        "Selecciona un producto para eliminar:",
+                        list(productos_eliminar.keys()),
+                        key="select_eliminar"
+                    )
+                    
+                    if producto_eliminar:
+                        producto_id = productos_eliminar[producto_eliminar]
+                        producto_data = inv.obtener(producto_id)
                         
-                        if producto_eliminar:
-                            producto_id = productos_eliminar[producto_eliminar]
-                            producto_data = next((item for item in st.session_state.inventario 
-                                                if item['ID'] == producto_id), None)
+                        if producto_data:
+                            st.warning(f"⚠️ ¿Estás seguro de eliminar **{producto_data['Producto']}**?")
                             
-                            if producto_data:
-                                st.warning(f"⚠️ ¿Estás seguro de eliminar **{producto_data['Producto']}**?")
-                                
-                                # Mostrar advertencia si tiene ventas
-                                if producto_data['Ventas_Total'] > 0:
-                                    st.error(f"⚠️ **ADVERTENCIA:** Este producto tiene {producto_data['Ventas_Total']} ventas registradas.")
-                                
-                                col_info1, col_info2 = st.columns(2)
-                                with col_info1:
-                                    st.write(f"**Categoría:** {producto_data['Categoria']}")
-                                    st.write(f"**Talla:** {producto_data['Talla']}")
-                                    st.write(f"**Ubicación:** {producto_data['Ubicacion']}")
-                                with col_info2:
-                                    st.write(f"**Color:** {producto_data['Color']}")
-                                    st.write(f"**Precio Venta:** ${producto_data['Precio_Venta']:,.2f}")
-                                    st.write(f"**Ventas:** {producto_data['Ventas_Total']}")
-                                
-                                col_conf1, col_conf2, col_conf3 = st.columns([1, 1, 2])
-                                
-                                with col_conf1:
-                                    if st.button("✅ Sí, Eliminar", type="primary", use_container_width=True):
-                                        success, message = eliminar_producto(producto_id)
-                                        if success:
-                                            st.success(message)
-                                            st.session_state.modo_edicion = None
-                                            st.rerun()
-                                        else:
-                                            st.error(message)
-                                
-                                with col_conf2:
-                                    if st.button("❌ Cancelar", use_container_width=True):
+                            # Mostrar advertencia si tiene ventas
+                            if producto_data['Ventas_Total'] > 0:
+                                st.error(f"⚠️ **ADVERTENCIA:** Este producto tiene {producto_data['Ventas_Total']} ventas registradas.")
+                            
+                            col_info1, col_info2 = st.columns(2)
+                            with col_info1:
+                                st.write(f"**Categoría:** {producto_data['Categoria']}")
+                                st.write(f"**Talla:** {producto_data['Talla']}")
+                                st.write(f"**Ubicación:** {producto_data['Ubicacion']}")
+                            with col_info2:
+                                st.write(f"**Color:** {producto_data['Color']}")
+                                st.write(f"**Precio Venta:** ${producto_data['Precio_Venta']:,.2f}")
+                                st.write(f"**Ventas:** {producto_data['Ventas_Total']}")
+                            
+                            col_conf1, col_conf2, col_conf3 = st.columns([1, 1, 2])
+                            
+                            with col_conf1:
+                                if st.button("✅ Sí, Eliminar", type="primary", use_container_width=True):
+                                    success, message = eliminar_producto(producto_id)
+                                    if success:
+                                        st.success(message)
                                         st.session_state.modo_edicion = None
                                         st.rerun()
+                                    else:
+                                        st.error(message)
+                            
+                            with col_conf2:
+                                if st.button("❌ Cancelar", use_container_width=True):
+                                    st.session_state.modo_edicion = None
+                                    st.rerun()
+            
+            # MODO: IMPORTAR PRODUCTOS DESDE CSV/EXCEL
+            elif st.session_state.modo_edicion == 'importar':
+                st.subheader("📥 Importar Productos")
+                st.caption("Columnas: " + ", ".join(importacion.COLUMNAS_REQUERIDAS) +
+                           " (Precio_Venta opcional). Las variantes que ya existen "
+                           "(mismo Producto + Talla + Color) suman stock y actualizan precios.")
                 
-                # MODO: VER INVENTARIO
-                else:
-                    st.subheader("📋 Inventario Actual")
+                st.download_button(
+                    "📄 Descargar Plantilla CSV",
+                    data=importacion.plantilla_csv(),
+                    file_name="plantilla_importacion.csv",
+                    mime="text/csv",
+                    key="plantilla_importacion"
+                )
+                
+                archivo = st.file_uploader("Archivo CSV o Excel:", type=['csv', 'xlsx'], key="archivo_importacion")
+                
+                if archivo is not None:
+                    try:
+                        datos_archivo = importacion.leer_archivo(archivo.getvalue(), archivo.name)
+                    except importacion.ErrorImportacion as e:
+                        st.error(f"❌ {e}")
+                        datos_archivo = None
                     
-                    if df.empty:
-                        st.info("No hay productos en el inventario.")
-                    else:
-                        # Resumen del inventario
-                        col_res1, col_res2, col_res3 = st.columns(3)
-                        with col_res1:
-                            st.metric("📦 Total Productos", len(df))
-                        with col_res2:
-                            valor_inventario = (df['Stock_Total'] * df['Precio_Venta']).sum()
-                            st.metric("💰 Valor Inventario", f"${valor_inventario:,.2f}")
-                        with col_res3:
-                            productos_con_stock = len(df[df['Stock_Total'] > 0])
-                            st.metric("📈 Productos con Stock", f"{productos_con_stock}")
+                    if datos_archivo is not None:
+                        validas, errores = importacion.validar(datos_archivo, obtener_todas_categorias())
+                        entradas, nuevos = importacion.planificar(validas, inv)
                         
-                        # Búsqueda
-                        search_inv = st.text_input("🔍 Buscar en inventario:", key="search_inv")
-                        
-                        if search_inv:
-                            filtered_inv = df[
-                                df['Producto'].str.contains(search_inv, case=False, na=False) |
-                                df['Categoria'].str.contains(search_inv, case=False, na=False) |
-                                df['Color'].str.contains(search_inv, case=False, na=False) |
-                                df['Talla'].str.contains(search_inv, case=False, na=False) |
-                                df['Ubicacion'].str.contains(search_inv, case=False, na=False)
-                            ]
-                        else:
-                            filtered_inv = df
+                        col_imp1, col_imp2, col_imp3 = st.columns(3)
+                        with col_imp1:
+                            st.metric("✅ Filas válidas", len(validas))
+                        with col_imp2:
+                            st.metric("🆕 Productos nuevos", len(nuevos))
+                        with col_imp3:
+                            st.metric("🔁 Existentes a actualizar", len(entradas))
                         
-                        # Mostrar tabla
-                        if not filtered_inv.empty:
-                            display_inv = filtered_inv.copy()
-                            display_inv['Precio_Sugerido'] = display_inv['Precio_Sugerido'].apply(lambda x: f"${x:,.2f}")
-                            display_inv['Precio_Venta'] = display_inv['Precio_Venta'].apply(lambda x: f"${x:,.2f}")
-                            
+                        if not errores.empty:
+                            st.warning(f"⚠️ {len(errores)} filas con errores (no se importarán):")
                             st.dataframe(
-                                display_inv[['Categoria', 'Producto', 'Talla', 'Color', 'Ubicacion',
-                                           'Stock_Bodega', 'Stock_Exhibido', 'Stock_Total', 
-                                           'Ventas_Total', 'Precio_Sugerido', 'Precio_Venta']],
+                                errores,
                                 use_container_width=True,
                                 hide_index=True,
                                 column_config={
-                                    'Categoria': st.column_config.TextColumn("Categoría"),
+                                    'fila': st.column_config.NumberColumn("Fila", format="%d"),
                                     'Producto': st.column_config.TextColumn("Producto"),
-                                    'Talla': st.column_config.TextColumn("Talla"),
-                                    'Color': st.column_config.TextColumn("Color"),
-                                    'Ubicacion': st.column_config.TextColumn("📍 Ubicación"),
-                                    'Stock_Bodega': st.column_config.NumberColumn("📦 Bodega", format="%d"),
-                                    'Stock_Exhibido': st.column_config.NumberColumn("🛍️ Exhibido", format="%d"),
-                                    'Stock_Total': st.column_config.NumberColumn("📊 Total", format="%d"),
-                                    'Ventas_Total': st.column_config.NumberColumn("📈 Ventas", format="%d"),
-                                    'Precio_Sugerido': st.column_config.TextColumn("💰 Sugerido"),
-                                    'Precio_Venta': st.column_config.TextColumn("💵 Venta")
+                                    'errores': st.column_config.TextColumn("Errores")
                                 }
                             )
-                        else:
-                            st.info("No hay productos que coincidan con la búsqueda.")
+                        
+                        if nuevos or entradas:
+                            if st.button(f"✅ Importar {len(validas)} filas válidas", type="primary",
+                                         use_container_width=True, key="confirmar_importacion"):
+                                success, mensaje = importar_productos(entradas, nuevos)
+                                if success:
+                                    st.success(f"✅ {mensaje}")
+                                    st.session_state.modo_edicion = None
+                                    st.rerun()
+                                else:
+                                    st.error(f"❌ {mensaje}")
+            
+            # MODO: VER INVENTARIO
+            else:
+                st.subheader("📋 Inventario Actual")
+                
+                if df.empty:
+                    st.info("No hay productos en el inventario.")
+                else:
+                    # Resumen del inventario
+                    col_res1, col_res2, col_res3 = st.columns(3)
+                    with col_res1:
+                        st.metric("📦 Total Productos", len(df))
+                    with col_res2:
+                        valor_inventario = (df['Stock_Total'] * df['Precio_Venta']).sum()
+                        st.metric("💰 Valor Inventario", f"${valor_inventario:,.2f}")
+                    with col_res3:
+                        productos_con_stock = len(df[df['Stock_Total'] > 0])
+                        st.metric("📈 Productos con Stock", f"{productos_con_stock}")
+                    
+                    # Búsqueda
+                    search_inv = st.text_input("🔍 Buscar en inventario:", key="search_inv")
+                    
+                    filtered_inv = cache_tablas().obtener(
+                        ('busqueda', version_datos(inv), search_inv),
+                        lambda: tabla_busqueda(df, search_inv)
+                    )
+                    
+                    # Mostrar tabla
+                    if not filtered_inv.empty:
+                        st.dataframe(
+                            filtered_inv,
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config=CONFIG_TABLA_INVENTARIO
+                        )
+                    else:
+                        st.info("No hay productos que coincidan con la búsqueda.")
+
+# Sección -> función que la dibuja
+DIBUJAR_SECCION = {'ventas': seccion_ventas, 'reporte': seccion_reporte, 'gestion': seccion_gestion}
 
 # ============================================
 # EJECUCIÓN
 # ============================================
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    perfilador().empezar_rerun()
+    try:
+        main()
+    finally:
+        perfilador().terminar_rerun()
\ No newline at end of file
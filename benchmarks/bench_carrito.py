@@ -0,0 +1,65 @@
+"""Benchmark: unidades vendidas por segundo, una a una vs carrito
+
+Uso:
+    python benchmarks/bench_carrito.py [--productos 2000] [--unidades 2000] [--por-carrito 5]
+
+Vende las mismas unidades con registrar_venta (una operación y un guardado
+por unidad) y con registrar_ventas (un guardado por carrito), en los dos
+almacenes, sobre archivos temporales.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import almacenamiento
+from inventario import Inventario
+from sinteticos import catalogo_uniforme
+
+
+def inventario_temporal(tipo, directorio, productos):
+    almacen = almacenamiento.crear_almacen(
+        tipo, os.path.join(directorio, 'inventario.json'), os.path.join(directorio, 'diario.jsonl'),
+        os.path.join(directorio, 'inventario.db'))
+    almacen.guardar(productos, [], 0.0)
+    return Inventario(almacen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--productos', type=int, default=2000)
+    parser.add_argument('--unidades', type=int, default=2000)
+    parser.add_argument('--por-carrito', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(1)
+    ids = [f"PROD_{random.randrange(args.productos):08d}" for _ in range(args.unidades)]
+    stock = args.unidades
+
+    print(f"{'almacén':>8} {'una a una (u/s)':>16} {'carrito (u/s)':>14}")
+    for tipo in ('json', 'sqlite'):
+        with tempfile.TemporaryDirectory() as directorio:
+            inv = inventario_temporal(tipo, directorio, catalogo_uniforme(args.productos, stock))
+            inicio = time.perf_counter()
+            for producto_id in ids:
+                inv.registrar_venta(producto_id)
+            t_una = time.perf_counter() - inicio
+
+        with tempfile.TemporaryDirectory() as directorio:
+            inv = inventario_temporal(tipo, directorio, catalogo_uniforme(args.productos, stock))
+            inicio = time.perf_counter()
+            for i in range(0, len(ids), args.por_carrito):
+                ok, mensaje, _ = inv.registrar_ventas(
+                    [{'producto_id': producto_id, 'cantidad': 1} for producto_id in ids[i:i + args.por_carrito]])
+                assert ok, mensaje
+            t_carrito = time.perf_counter() - inicio
+
+        print(f"{tipo:>8} {args.unidades / t_una:>16.0f} {args.unidades / t_carrito:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: latencia por clic con checkpoint dentro de la operación vs en segundo plano
+
+Uso:
+    python benchmarks/bench_escritura.py [--productos 20000] [--clics 3000] [--pausa-ms 1]
+
+Vende una unidad por clic en el almacén JSON. Cada DIARIO_MAX_EVENTOS
+clics toca un checkpoint del catálogo completo: antes lo pagaba el clic
+que llegaba al límite; con escritura_diferida lo hace el hilo escritor y
+el clic solo espera la copia del estado. Al final se cierra el escritor y
+se comprueba que lo recargado de disco coincide con la memoria.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import almacenamiento
+from inventario import Inventario
+from perfilado import percentil
+from sinteticos import catalogo_uniforme
+
+
+def medir(directorio, args, diferida):
+    rutas = (os.path.join(directorio, 'inventario.json'), os.path.join(directorio, 'diario.jsonl'))
+    almacenamiento.AlmacenJSON(*rutas).guardar(catalogo_uniforme(args.productos, args.clics), [], 0.0)
+    inv = Inventario(almacenamiento.AlmacenJSON(*rutas), escritura_diferida=diferida)
+
+    azar = random.Random(1)
+    tiempos = []
+    for _ in range(args.clics):
+        producto_id = f"PROD_{azar.randrange(args.productos):08d}"
+        inicio = time.perf_counter()
+        ok, _, _ = inv.registrar_venta(producto_id)
+        tiempos.append(time.perf_counter() - inicio)
+        assert ok
+        # Tiempo entre clics de la caja
+        time.sleep(args.pausa_ms / 1000)
+    inv.cerrar()
+
+    recargado = Inventario(almacenamiento.AlmacenJSON(*rutas))
+    assert recargado.caja == inv.caja and len(recargado.ventas_diarias) == args.clics
+    assert [p['Stock_Total'] for p in recargado.productos] == [p['Stock_Total'] for p in inv.productos]
+    escrituras = inv.escritor.escrituras if inv.escritor is not None else None
+    return sorted(tiempos), escrituras
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--productos', type=int, default=20000)
+    parser.add_argument('--clics', type=int, default=3000)
+    parser.add_argument('--pausa-ms', type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{args.productos} productos, {args.clics} clics, checkpoint cada "
+          f"{almacenamiento.DIARIO_MAX_EVENTOS} eventos")
+    print(f"{'modo':>22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'> 20 ms':>8} {'checkpoints':>12}")
+    for nombre, diferida in (('en el clic (antes)', False), ('en segundo plano', True)):
+        with tempfile.TemporaryDirectory() as directorio:
+            tiempos, escrituras = medir(directorio, args, diferida)
+        print(f"{nombre:>22} {statistics.median(tiempos) * 1e3:>8.2f} {percentil(tiempos, 95) * 1e3:>8.2f} "
+              f"{percentil(tiempos, 99) * 1e3:>8.2f} {tiempos[-1] * 1e3:>8.2f} "
+              f"{sum(t > 0.02 for t in tiempos):>8} "
+              f"{escrituras if escrituras is not None else '-':>12}")
+
+
+if __name__ == '__main__':
+    main()
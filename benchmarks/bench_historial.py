@@ -0,0 +1,90 @@
+"""Benchmark: memoria y consultas del historial de ventas por columnas
+
+Uso:
+    python benchmarks/bench_historial.py [--ventas 365000] [--productos 2000]
+
+Compara la memoria de N ventas como lista de dicts (como se guardaban antes)
+contra HistorialVentas, y el tiempo de leer del disco un solo mes contra
+leer todo el año.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from historial import HistorialVentas, DirectorioParticiones
+
+CATEGORIAS = ['Camisas', 'Pantalones', 'Vestidos', 'Chaquetas', 'Accesorios']
+TALLAS = ['XS', 'S', 'M', 'L', 'XL']
+
+
+def ventas_sinteticas(n, productos):
+    """n ventas repartidas en el último año, con textos como los reales"""
+    inicio = datetime(2025, 1, 1)
+    paso = timedelta(days=365) / n
+    for i in range(n):
+        p = random.randrange(productos)
+        yield {
+            'fecha': (inicio + paso * i).isoformat(),
+            'producto': f"Producto {p}",
+            'talla': TALLAS[p % len(TALLAS)],
+            'precio_sugerido': 100.0 + p % 50,
+            'precio_venta': 90.0 + p % 50,
+            'categoria': CATEGORIAS[p % len(CATEGORIAS)],
+            'ubicacion': 'Exhibido' if p % 2 else 'Bodega',
+            'ubicacion_venta': 'exhibido' if p % 2 else 'bodega'
+        }
+
+
+def memoria(construir):
+    """(resultado, bytes retenidos) de construir()"""
+    tracemalloc.start()
+    resultado = construir()
+    retenidos = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, retenidos
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ventas', type=int, default=365000)
+    parser.add_argument('--productos', type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(1)
+    _, bytes_lista = memoria(lambda: list(ventas_sinteticas(args.ventas, args.productos)))
+    random.seed(1)
+    historial, bytes_historial = memoria(
+        lambda: HistorialVentas.desde_lista(ventas_sinteticas(args.ventas, args.productos)))
+
+    print(f"Ventas: {args.ventas}")
+    print(f"  lista de dicts   {bytes_lista / 2**20:>10.1f} MiB")
+    print(f"  por columnas     {bytes_historial / 2**20:>10.1f} MiB "
+          f"({bytes_historial / bytes_lista:.0%})")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        historial.guardar_en(DirectorioParticiones(directorio))
+        tamano = sum(os.path.getsize(os.path.join(directorio, f)) for f in os.listdir(directorio))
+        print(f"  en disco         {tamano / 2**20:>10.1f} MiB en {len(os.listdir(directorio))} meses")
+
+        df, t_mes = cronometrar(lambda: HistorialVentas(DirectorioParticiones(directorio))
+                                .a_dataframe('2025-06-01', '2025-06-30'))
+        print(f"  consulta 1 mes   {t_mes * 1e3:>10.1f} ms ({len(df)} ventas)")
+        df, t_anio = cronometrar(lambda: HistorialVentas(DirectorioParticiones(directorio)).a_dataframe())
+        print(f"  consulta 1 año   {t_anio * 1e3:>10.1f} ms ({len(df)} ventas)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: búsqueda de producto por ID con índice vs recorrido lineal
+
+Uso:
+    python benchmarks/bench_indice.py [--tamanos 1000 10000 100000] [--consultas 2000]
+
+El costo con índice debe mantenerse plano al crecer el catálogo; el
+recorrido lineal (como hacían las funciones antes) crece con él.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventario import Inventario
+from sinteticos import catalogo_uniforme
+
+
+def busqueda_lineal(productos, producto_id):
+    for item in productos:
+        if item['ID'] == producto_id:
+            return item
+    return None
+
+
+def medir(funcion, ids):
+    inicio = time.perf_counter()
+    for producto_id in ids:
+        funcion(producto_id)
+    return (time.perf_counter() - inicio) / len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--consultas', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'SKUs':>10} {'índice (µs)':>14} {'lineal (µs)':>14}")
+    for n in args.tamanos:
+        productos = catalogo_uniforme(n)
+        inv = Inventario(None, {'inventario': productos, 'ventas_diarias': [], 'caja': 0.0})
+        ids = [productos[random.randrange(n)]['ID'] for _ in range(args.consultas)]
+
+        t_indice = medir(inv.obtener, ids)
+        # El recorrido lineal es lento: basta con menos consultas
+        t_lineal = medir(lambda pid: busqueda_lineal(productos, pid), ids[:200])
+        print(f"{n:>10} {t_indice * 1e6:>14.3f} {t_lineal * 1e6:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
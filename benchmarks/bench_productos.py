@@ -0,0 +1,60 @@
+"""Benchmark: memoria del catálogo como tabla tipada vs DataFrame por rerun
+
+Uso:
+    python benchmarks/bench_productos.py [--skus 50000]
+
+Antes, cada rerun armaba pd.DataFrame(productos) y la pestaña de ventas y
+la del reporte hacían además df.copy() del catálogo completo. Ahora hay una
+sola tabla tipada (Inventario.tabla()) que las pestañas filtran.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventario import Inventario
+from sinteticos import catalogo
+
+def mib(n):
+    return n / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skus', type=int, default=50000)
+    args = parser.parse_args()
+
+    productos = catalogo(args.skus)
+    inv = Inventario(None, {'inventario': productos, 'ventas_diarias': [], 'caja': 0.0})
+
+    inicio = time.perf_counter()
+    df_antes = pd.DataFrame(productos)
+    t_antes = time.perf_counter() - inicio
+    por_copia = df_antes.memory_usage(deep=True).sum()
+    # DataFrame del rerun + df.copy() en ventas + df.copy() en el reporte
+    antes = 3 * por_copia
+
+    inicio = time.perf_counter()
+    tabla = inv.tabla()
+    t_tabla = time.perf_counter() - inicio
+    ahora = tabla.memory_usage(deep=True).sum()
+
+    print(f"SKUs: {args.skus}")
+    print(f"  DataFrame por rerun   {mib(por_copia):>8.1f} MiB x3 copias = {mib(antes):.1f} MiB "
+          f"(armado {t_antes * 1e3:.0f} ms en cada rerun)")
+    print(f"  tabla tipada          {mib(ahora):>8.1f} MiB, una vez "
+          f"(armado {t_tabla * 1e3:.0f} ms solo al cargar)")
+    print(f"  ahorro                {mib(antes - ahora):>8.1f} MiB ({1 - ahora / antes:.0%})")
+
+    # Una venta actualiza la fila en la tabla sin reconstruirla
+    inicio = time.perf_counter()
+    inv._actualizar_tabla(productos[0], {'Stock_Exhibido': 0, 'Stock_Total': 0})
+    print(f"  actualizar una fila   {(time.perf_counter() - inicio) * 1e6:>8.0f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: guardar y cargar el snapshot en JSON vs binario (con y sin compresión)
+
+Uso:
+    python benchmarks/bench_snapshot.py [--tamanos 1000 50000 500000] [--rondas 3] [--salida res.json]
+
+Mide, por tamaño de catálogo, lo que tarda el checkpoint en armar y escribir
+el snapshot (temporal + fsync + rename), lo que tarda leer_snapshot en
+leerlo (el formato se reconoce solo) y el tamaño del archivo. Los datos son
+los de sinteticos.py, con agregados de un año de ventas. zstd se mide solo
+si está instalado el paquete 'zstandard'.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import almacenamiento
+import snapshot_binario
+from agregados import Agregados
+from reportes import resumen_diario
+from sinteticos import catalogo, particiones_ventas
+
+# (formato, compresión)
+VARIANTES = [('json', None), ('binario', None), ('binario', 'gzip'), ('binario', 'zstd')]
+
+
+def variantes_disponibles():
+    disponibles = []
+    for formato, compresion in VARIANTES:
+        try:
+            snapshot_binario.codificar({'inventario': []}, compresion)
+        except snapshot_binario.ErrorSnapshot as e:
+            print(f"(se omite {formato}+{compresion}: {e})")
+            continue
+        disponibles.append((formato, compresion))
+    return disponibles
+
+
+def datos_sinteticos(skus, ventas):
+    productos = catalogo(skus)
+    resumenes = [resumen_diario(p.a_dataframe()) for p in particiones_ventas(productos, ventas)]
+    agregados = Agregados.desde_cero(productos, [], resumenes)
+    return almacenamiento.datos_snapshot(productos, 12345.5, ventas, agregados.a_dict())
+
+
+def mejor_de(rondas, funcion):
+    mejor = None
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        funcion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 50000, 500000])
+    parser.add_argument('--ventas', type=int, default=100000, help="Ventas para los agregados")
+    parser.add_argument('--rondas', type=int, default=3, help="Se toma la mejor de N rondas")
+    parser.add_argument('--salida', help="Guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    variantes = variantes_disponibles()
+    resultados = []
+    print(f"{'SKUs':>8} {'formato':>14} {'guardar (ms)':>13} {'cargar (ms)':>12} {'tamaño (KB)':>12} {'vs JSON':>8}")
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'inventario.json')
+        for skus in args.tamanos:
+            data = datos_sinteticos(skus, args.ventas)
+            tamano_json = None
+            for formato, compresion in variantes:
+                guardar = mejor_de(args.rondas, lambda: almacenamiento.escribir_atomico(
+                    ruta, almacenamiento.contenido_snapshot(data, formato, compresion)))
+                cargar = mejor_de(args.rondas, lambda: almacenamiento.leer_snapshot(ruta))
+                assert almacenamiento.leer_snapshot(ruta)['inventario'] == data['inventario']
+                tamano = os.path.getsize(ruta)
+                tamano_json = tamano_json or tamano
+                nombre = formato + (f"+{compresion}" if compresion else '')
+                print(f"{skus:>8} {nombre:>14} {guardar * 1e3:>13.1f} {cargar * 1e3:>12.1f} "
+                      f"{tamano / 1024:>12.1f} {tamano / tamano_json:>7.0%}")
+                resultados.append({'skus': skus, 'formato': formato, 'compresion': compresion,
+                                   'guardar_s': guardar, 'cargar_s': cargar, 'bytes': tamano})
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
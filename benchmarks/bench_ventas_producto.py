@@ -0,0 +1,74 @@
+"""Benchmark: ventas de un producto recorriendo todo el historial vs con el índice por producto
+
+Uso:
+    python benchmarks/bench_ventas_producto.py [--ventas 365000] [--productos 2000] [--consultas 200]
+
+Antes, eliminar_producto recorría todas las ventas comparando el nombre.
+Ahora cada mes tiene un índice producto_id -> filas: la primera consulta lo
+arma (una vez por mes) y las siguientes solo tocan las ventas del producto.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from historial import HistorialVentas
+
+
+def ventas_sinteticas(n, productos):
+    """n ventas repartidas en el último año, con producto_id"""
+    inicio = datetime(2025, 1, 1)
+    paso = timedelta(days=365) / n
+    for i in range(n):
+        p = random.randrange(productos)
+        yield {
+            'fecha': (inicio + paso * i).isoformat(),
+            'producto_id': f"PROD_{p:08d}",
+            'producto': f"Producto {p % 300}",
+            'talla': 'M',
+            'precio_sugerido': 100.0,
+            'precio_venta': 90.0 + p % 10,
+            'categoria': 'Camisas',
+            'ubicacion': 'Exhibido',
+            'ubicacion_venta': 'exhibido'
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ventas', type=int, default=365000)
+    parser.add_argument('--productos', type=int, default=2000)
+    parser.add_argument('--consultas', type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(1)
+    historial = HistorialVentas.desde_lista(ventas_sinteticas(args.ventas, args.productos))
+    ids = [f"PROD_{random.randrange(args.productos):08d}" for _ in range(args.consultas)]
+
+    # Como antes: recorrer todas las ventas (por nombre, aquí por ID para comparar lo mismo)
+    inicio = time.perf_counter()
+    for producto_id in ids[:5]:
+        sum(v['precio_venta'] for v in historial if v.get('producto_id') == producto_id)
+    t_recorrido = (time.perf_counter() - inicio) / 5
+
+    inicio = time.perf_counter()
+    historial.total_de(ids[0])
+    t_primera = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for producto_id in ids:
+        historial.total_de(producto_id)
+    t_indice = (time.perf_counter() - inicio) / len(ids)
+
+    print(f"{args.ventas} ventas, {args.productos} productos (~{args.ventas // args.productos} ventas cada uno)")
+    print(f"  recorrido completo        {t_recorrido * 1e3:>10.2f} ms por producto")
+    print(f"  índice, primera consulta  {t_primera * 1e3:>10.2f} ms (arma el índice de cada mes)")
+    print(f"  índice, siguientes        {t_indice * 1e3:>10.3f} ms por producto")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""Prueba de carga de la API HTTP (api.py): peticiones por segundo sostenidas en un núcleo
+
+Uso:
+    python benchmarks/carga_api.py [--skus 10000] [--clientes 4] [--segundos 15] [--almacen json]
+
+Crea una tienda sintética (ver sinteticos.py), levanta api.py en otro
+proceso fijo a un núcleo (--cpu) y la carga con varios procesos cliente,
+cada uno con su conexión persistente, con una mezcla de consultas y ventas
+como la de las cajas y lectores. Reporta peticiones por segundo y latencia
+por ruta, y cuánto núcleo usó el servidor: si los clientes comparten el
+núcleo con él (máquina de un núcleo), las peticiones por segundo de CPU del
+servidor dan su capacidad real.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import almacenamiento
+from inventario import Inventario
+from perfilado import percentil
+from sinteticos import crear_tienda
+
+API = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api.py')
+
+# (ruta, peso): sobre todo escaneos y ventas, algo de lotes, movimientos y búsquedas
+MEZCLA = [('producto', 30), ('stock', 25), ('venta', 25), ('lote', 5), ('mover', 5), ('stock_varios', 5),
+          ('buscar', 5)]
+
+# Stock por producto para que las ventas no se acaben durante la prueba
+STOCK_PRUEBA = 1_000_000
+
+
+def preparar_tienda(tipo, directorio, skus, ventas):
+    """Tienda sintética con stock de sobra; devuelve las rutas para api.py"""
+    _, rutas = crear_tienda(tipo, directorio, skus, ventas, meses=3)
+    inv = Inventario(almacenamiento.crear_almacen(tipo, rutas[0], rutas[1], rutas[2], rutas[3]))
+    entradas = [{'ID': item['ID'], 'Stock_Bodega': STOCK_PRUEBA, 'Stock_Exhibido': STOCK_PRUEBA,
+                 'Precio_Sugerido': item['Precio_Sugerido'], 'Precio_Venta': item['Precio_Venta']}
+                for item in inv.productos]
+    inv.importar_productos(entradas, [])
+    inv.guardar()
+    return rutas
+
+
+def peticion(ruta, azar, skus):
+    """(método, path, cuerpo) de una petición de la mezcla"""
+    pid = f"PROD_{azar.randrange(skus):08d}"
+    if ruta == 'producto':
+        return 'GET', f'/productos/{pid}', None
+    if ruta == 'stock':
+        return 'GET', f'/stock/{pid}', None
+    if ruta == 'stock_varios':
+        return 'GET', '/stock?ids=' + ','.join(f"PROD_{azar.randrange(skus):08d}" for _ in range(5)), None
+    if ruta == 'buscar':
+        return 'GET', '/productos?buscar=' + quote(azar.choice(['camisa', 'jeans negro', 'playera m', 'azul'])), None
+    if ruta == 'venta':
+        return 'POST', '/ventas', {'producto_id': pid}
+    if ruta == 'lote':
+        return 'POST', '/ventas/lote', {'lineas': [{'producto_id': f"PROD_{azar.randrange(skus):08d}",
+                                                    'cantidad': azar.randint(1, 3)} for _ in range(3)]}
+    origen, destino = azar.sample(['Bodega', 'Exhibido'], 2)
+    return 'POST', '/stock/mover', {'producto_id': pid, 'cantidad': 1, 'origen': origen, 'destino': destino}
+
+
+def cliente(puerto, skus, desde, hasta, semilla, cpus):
+    """Un cliente con conexión persistente hasta 'hasta'; devuelve {ruta: [latencias]} y {estado: cuenta}
+
+    Solo cuenta las peticiones que empiezan después de 'desde' (lo anterior
+    es calentamiento: índice de búsqueda, cachés, conexiones).
+    """
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    azar = random.Random(semilla)
+    rutas = [ruta for ruta, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto)
+    latencias = {ruta: [] for ruta in rutas}
+    estados = {}
+    while True:
+        antes = time.time()
+        if antes >= hasta:
+            break
+        ruta = azar.choices(rutas, pesos)[0]
+        metodo, path, cuerpo = peticion(ruta, azar, skus)
+        conexion.request(metodo, path, json.dumps(cuerpo) if cuerpo is not None else None,
+                         {'Content-Type': 'application/json'} if cuerpo is not None else {})
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        if antes >= desde:
+            latencias[ruta].append(time.time() - antes)
+            estados[respuesta.status] = estados.get(respuesta.status, 0) + 1
+    conexion.close()
+    return latencias, estados
+
+
+def tiempo_cpu(pid):
+    """Segundos de CPU (usuario + sistema) de un proceso, o None fuera de Linux"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            campos = f.read().rsplit(')', 1)[1].split()
+        return (int(campos[11]) + int(campos[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--almacen', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--skus', type=int, default=10000)
+    parser.add_argument('--ventas', type=int, default=100000, help="Ventas previas en el historial")
+    parser.add_argument('--clientes', type=int, default=4, help="Procesos cliente (uno por caja o lector)")
+    parser.add_argument('--segundos', type=float, default=15)
+    parser.add_argument('--calentamiento', type=float, default=2)
+    parser.add_argument('--cpu', type=int, default=0, help="Núcleo del servidor (-1 = sin fijar)")
+    parser.add_argument('--salida', help="Guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    fijar = args.cpu >= 0 and hasattr(os, 'sched_getaffinity')
+    otros = (os.sched_getaffinity(0) - {args.cpu}) if fijar else set()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        print(f"Preparando tienda: {args.skus:,} SKUs, {args.ventas:,} ventas ({args.almacen})...", flush=True)
+        rutas = preparar_tienda(args.almacen, directorio, args.skus, args.ventas)
+        servidor = subprocess.Popen(
+            [sys.executable, API, '--puerto', '0', '--almacen', args.almacen, '--json', rutas[0],
+             '--diario', rutas[1], '--sqlite', rutas[2], '--ventas', rutas[3],
+             '--archivo', os.path.join(directorio, 'archivo')],
+            stdout=subprocess.PIPE, text=True, env=dict(os.environ, INVENTARIO_API_TOKEN=''))
+        try:
+            puerto = int(servidor.stdout.readline().split('http://')[1].split(':')[1].split()[0])
+            if fijar:
+                os.sched_setaffinity(servidor.pid, {args.cpu})
+
+            # Los clientes van en los otros núcleos si los hay
+            with multiprocessing.Pool(args.clientes) as pool:
+                desde = time.time() + args.calentamiento
+                hasta = desde + args.segundos
+                pendientes = [pool.apply_async(cliente, (puerto, args.skus, desde, hasta, i, otros or None))
+                              for i in range(args.clientes)]
+                time.sleep(max(0.0, desde - time.time()))
+                cpu_antes, reloj_antes = tiempo_cpu(servidor.pid), time.time()
+                time.sleep(max(0.0, hasta - time.time()))
+                cpu_despues, reloj_despues = tiempo_cpu(servidor.pid), time.time()
+                resultados = [p.get() for p in pendientes]
+        finally:
+            # Como Ctrl+C: el servidor escribe lo pendiente y sale
+            servidor.send_signal(signal.SIGINT)
+            servidor.wait()
+
+    duracion = args.segundos
+    latencias = {ruta: sorted(l for resultado in resultados for l in resultado[0][ruta]) for ruta, _ in MEZCLA}
+    estados = {}
+    for _, por_estado in resultados:
+        for estado, n in por_estado.items():
+            estados[estado] = estados.get(estado, 0) + n
+    total = sum(map(len, latencias.values()))
+
+    print(f"\n{'ruta':>14} {'peticiones':>11} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    filas = []
+    for ruta, valores in latencias.items():
+        if not valores:
+            continue
+        fila = {'ruta': ruta, 'peticiones': len(valores), 'req_s': len(valores) / duracion,
+                'p50_ms': percentil(valores, 50) * 1e3, 'p95_ms': percentil(valores, 95) * 1e3,
+                'p99_ms': percentil(valores, 99) * 1e3}
+        filas.append(fila)
+        print(f"{ruta:>14} {fila['peticiones']:>11,} {fila['req_s']:>9.0f} {fila['p50_ms']:>9.2f} "
+              f"{fila['p95_ms']:>9.2f} {fila['p99_ms']:>9.2f}")
+    print(f"{'total':>14} {total:>11,} {total / duracion:>9.0f}")
+    print(f"Estados HTTP: {dict(sorted(estados.items()))}")
+
+    resumen = {'almacen': args.almacen, 'skus': args.skus, 'clientes': args.clientes, 'segundos': duracion,
+               'req_s': total / duracion, 'estados': estados, 'rutas': filas}
+    if cpu_antes is not None and cpu_despues is not None:
+        cpu = cpu_despues - cpu_antes
+        uso = cpu / (reloj_despues - reloj_antes)
+        resumen['cpu_servidor'] = uso
+        resumen['req_por_segundo_cpu'] = total / cpu if cpu else None
+        print(f"Servidor: {uso:.0%} de un núcleo; {total / cpu:,.0f} peticiones por segundo de CPU"
+              + (" (los clientes comparten el núcleo)" if fijar and not otros else ""))
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resumen, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""Datos sintéticos para los benchmarks: catálogo y ventas con distribuciones realistas
+
+- Categorías, tallas y colores con pesos como los de una tienda de ropa
+  (más camisas y playeras que suéteres; más M y L que XS o XXL).
+- Cada producto viene en varias tallas y colores (un SKU por variante).
+- Las ventas se reparten en los últimos meses con más movimiento en fin de
+  semana y en horario de tienda; la popularidad de los SKUs sigue una ley
+  de Zipf (pocos productos concentran muchas ventas) y una parte de las
+  ventas lleva descuento frente al precio sugerido.
+
+Las ventas se generan por mes directo en columnas de NumPy (ver
+historial.ParticionVentas), sin pasar por un dict por venta, así que
+millones de ventas caben en memoria y se escriben en segundos.
+"""
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import almacenamiento
+from agregados import Agregados
+from historial import HistorialVentas, DirectorioParticiones, ParticionVentas, COLUMNAS_TEXTO
+from reportes import resumen_diario
+
+# (valor, peso)
+CATEGORIAS = [('Camisas', 20), ('Playeras', 20), ('Pantalones', 14), ('Jeans', 14),
+              ('Suéteres', 8), ('Chamarras', 7), ('Shorts', 9), ('Niño', 8)]
+TALLAS = [('XS', 4), ('S', 15), ('M', 30), ('L', 28), ('XL', 16), ('XXL', 7)]
+COLORES = [('Negro', 24), ('Azul', 20), ('Blanco', 15), ('Gris', 12), ('Beige', 8),
+           ('Rojo', 7), ('Verde', 7), ('Rosa', 7)]
+
+# Precio sugerido base por categoría
+PRECIO_BASE = {'Camisas': 450, 'Playeras': 250, 'Pantalones': 550, 'Jeans': 650,
+               'Suéteres': 600, 'Chamarras': 1200, 'Shorts': 300, 'Niño': 280}
+
+# Exponente de la popularidad de los SKUs (Zipf)
+ZIPF = 0.9
+
+# Peso de cada día de la semana (lunes a domingo) y horario de tienda
+PESO_DIA_SEMANA = [0.8, 0.8, 0.9, 0.9, 1.2, 1.7, 1.4]
+HORA_APERTURA, HORA_CIERRE = 10, 20
+
+
+def _pesos(pares):
+    valores = [v for v, _ in pares]
+    pesos = np.array([p for _, p in pares], dtype=np.float64)
+    return valores, pesos / pesos.sum()
+
+
+def catalogo_uniforme(n, stock=1):
+    """n productos iguales salvo el ID, con 'stock' unidades en exhibido cada uno
+
+    Para medir una operación sin que la distribución del catálogo cuente
+    (p. ej. vender siempre con stock disponible).
+    """
+    return [
+        {'ID': f"PROD_{i:08d}", 'Categoria': 'Camisas', 'Producto': f"Producto {i}", 'Talla': 'M',
+         'Color': 'Azul', 'Ubicacion': 'Exhibido', 'Entrada_Total': stock, 'Stock_Bodega': 0,
+         'Stock_Exhibido': stock, 'Stock_Total': stock, 'Ventas_Total': 0,
+         'Precio_Sugerido': 100.0, 'Precio_Venta': 90.0}
+        for i in range(n)
+    ]
+
+
+def catalogo(skus, semilla=0):
+    """Lista de productos (dicts como los de la app) con 'skus' variantes"""
+    azar = np.random.default_rng(semilla)
+    categorias, p_categoria = _pesos(CATEGORIAS)
+    tallas, p_talla = _pesos(TALLAS)
+    colores, p_color = _pesos(COLORES)
+
+    # ~2 a 8 variantes (talla x color) por producto
+    variantes = azar.integers(2, 9, size=skus)
+    producto = np.repeat(np.arange(skus), variantes)[:skus]
+    categoria = azar.choice(len(categorias), size=producto[-1] + 1, p=p_categoria)[producto]
+    talla = azar.choice(len(tallas), size=skus, p=p_talla)
+    color = azar.choice(len(colores), size=skus, p=p_color)
+    factor_precio = np.round(azar.lognormal(0, 0.25, size=producto[-1] + 1), 1)[producto]
+    bodega = azar.poisson(6, size=skus)
+    exhibido = azar.poisson(3, size=skus)
+
+    productos = []
+    for i in range(skus):
+        cat = categorias[categoria[i]]
+        sugerido = float(round(PRECIO_BASE[cat] * factor_precio[i], -1)) or 10.0
+        b, e = int(bodega[i]), int(exhibido[i])
+        productos.append({
+            'ID': f"PROD_{i:08d}",
+            'Categoria': cat,
+            'Producto': f"{cat[:-1] if cat.endswith('s') else cat} modelo {producto[i]}",
+            'Talla': tallas[talla[i]],
+            'Color': colores[color[i]],
+            'Ubicacion': 'Bodega' if b > e else 'Exhibido',
+            'Entrada_Total': b + e,
+            'Stock_Bodega': b,
+            'Stock_Exhibido': e,
+            'Stock_Total': b + e,
+            'Ventas_Total': 0,
+            'Precio_Sugerido': sugerido,
+            'Precio_Venta': sugerido
+        })
+    return productos
+
+
+def _meses_hasta(fin, n):
+    """Los n meses que terminan en el de 'fin', como 'AAAA-MM'"""
+    anio, mes = fin.year, fin.month
+    meses = []
+    for _ in range(n):
+        meses.append(f"{anio:04d}-{mes:02d}")
+        anio, mes = (anio - 1, 12) if mes == 1 else (anio, mes - 1)
+    return meses[::-1]
+
+
+def _codificar(valores_por_fila):
+    """(códigos int32, valores) de un arreglo de textos"""
+    valores, codigos = np.unique(valores_por_fila, return_inverse=True)
+    return codigos.astype(np.int32), valores
+
+
+def particiones_ventas(productos, ventas, meses=12, semilla=0, hasta=None):
+    """Generar 'ventas' ventas repartidas en los últimos 'meses' meses, una ParticionVentas por mes
+
+    También suma a cada producto sus ventas (Ventas_Total) y las agrega a la
+    entrada, así el stock queda igual y los datos son consistentes.
+    """
+    azar = np.random.default_rng(semilla + 1)
+    hasta = hasta or datetime.now()
+    n_skus = len(productos)
+
+    # Popularidad: el SKU de rango r pesa 1 / r^ZIPF, en orden al azar
+    popularidad = 1.0 / np.arange(1, n_skus + 1) ** ZIPF
+    popularidad = popularidad[azar.permutation(n_skus)]
+    popularidad /= popularidad.sum()
+
+    columnas = {
+        'producto_id': np.array([p['ID'] for p in productos]),
+        'producto': np.array([p['Producto'] for p in productos]),
+        'talla': np.array([p['Talla'] for p in productos]),
+        'categoria': np.array([p['Categoria'] for p in productos]),
+        'ubicacion': np.array([p['Ubicacion'] for p in productos]),
+    }
+    # Se vende desde la ubicación principal ('exhibido'/'bodega')
+    columnas['ubicacion_venta'] = np.char.lower(columnas['ubicacion'])
+    sugerido = np.array([p['Precio_Sugerido'] for p in productos])
+    vendidas = np.zeros(n_skus, dtype=np.int64)
+
+    lista_meses = _meses_hasta(hasta, meses)
+    por_mes = np.full(meses, ventas // meses)
+    por_mes[:ventas % meses] += 1
+    ultimo_dia = np.datetime64(hasta.strftime('%Y-%m-%d'), 'D') + 1
+    for mes, n in zip(lista_meses, por_mes):
+        inicio = np.datetime64(mes, 'M')
+        dias = np.arange(inicio.astype('datetime64[D]'), min((inicio + 1).astype('datetime64[D]'), ultimo_dia))
+        # 1970-01-01 fue jueves: (días + 3) % 7 da 0 = lunes
+        peso_dia = np.array(PESO_DIA_SEMANA)[(dias.view('int64') + 3) % 7]
+        dia = azar.choice(dias, size=n, p=peso_dia / peso_dia.sum())
+        segundos = azar.integers(HORA_APERTURA * 3600, HORA_CIERRE * 3600, size=n)
+        fecha = np.sort(dia.astype('datetime64[us]') + segundos.astype('timedelta64[s]'))
+
+        sku = azar.choice(n_skus, size=n, p=popularidad)
+        np.add.at(vendidas, sku, 1)
+        # 70% a precio sugerido, el resto con 10-30% de descuento
+        descuento = np.where(azar.random(n) < 0.7, 1.0, azar.choice([0.9, 0.8, 0.7], size=n))
+
+        arreglos = {'fecha': fecha, 'secuencia': np.array(0, dtype=np.int64),
+                    'precio_sugerido': sugerido[sku], 'precio_venta': np.round(sugerido[sku] * descuento, 2)}
+        for col in COLUMNAS_TEXTO:
+            arreglos[f'{col}__codigos'], arreglos[f'{col}__valores'] = _codificar(columnas[col][sku])
+        yield ParticionVentas.desde_arreglos(mes, arreglos)
+
+    for producto, n in zip(productos, vendidas.tolist()):
+        producto['Ventas_Total'] = n
+        producto['Entrada_Total'] += n
+
+
+def crear_tienda(tipo, directorio, skus, ventas, meses=12, semilla=0):
+    """Crear en 'directorio' un almacén ('json' o 'sqlite') con datos sintéticos
+
+    Devuelve (almacén, rutas para crear_almacen). Los agregados se calculan
+    desde el resumen diario de cada mes, sin recorrer las ventas una a una.
+    """
+    rutas = (os.path.join(directorio, 'inventario.json'), os.path.join(directorio, 'diario.jsonl'),
+             os.path.join(directorio, 'inventario.db'), os.path.join(directorio, 'ventas'))
+    productos = catalogo(skus, semilla)
+    fuente = DirectorioParticiones(rutas[3])
+    resumenes = []
+    caja = 0.0
+    for particion in particiones_ventas(productos, ventas, meses, semilla):
+        fuente.escribir(particion)
+        resumenes.append(resumen_diario(particion.a_dataframe()))
+        caja += float(particion.numeros['precio_venta'][:len(particion)].sum())
+    agregados = Agregados.desde_cero(productos, [], resumenes)
+
+    if tipo == 'sqlite':
+        almacen = almacenamiento.AlmacenSQLite(rutas[2])
+    else:
+        # El JSON lee las ventas del mismo directorio de particiones
+        almacen = almacenamiento.AlmacenJSON(rutas[0], rutas[1], rutas[3])
+    almacen.guardar(productos, HistorialVentas(fuente), caja, agregados)
+    return almacen, rutas
@@ -0,0 +1,163 @@
+"""Prueba de carga: muchas cajas vendiendo a la vez sin perder unidades ni pesos
+
+Uso:
+    python benchmarks/stress_concurrencia.py [--hilos 16] [--ventas 200] [--productos 20] [--procesos 4]
+                                             [--diferida]
+
+Simula tres formas de compartir los datos, en los dos almacenes:
+
+- hilos que usan el mismo Inventario (sesiones de un mismo servidor);
+- hilos con su propio Inventario y su propio almacén sobre los mismos
+  archivos (memorias que quedan viejas en cuanto otro vende);
+- procesos separados, cada uno con su Inventario.
+
+Hay menos stock que ventas pedidas, así que varias se rechazan. Al final se
+recarga todo desde disco y se comprueba que unidades vendidas = ventas
+aceptadas, stock + vendidas = entrada, caja = suma de precios cobrados y
+que los agregados coinciden con un recálculo desde cero. Con --diferida los
+checkpoints los hace el hilo escritor (ver escritor.py).
+
+tests/test_concurrencia.py corre una versión corta con pytest.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import almacenamiento
+from agregados import Agregados
+from inventario import Inventario
+from sinteticos import catalogo_uniforme
+
+
+def crear_almacen(tipo, directorio):
+    return almacenamiento.crear_almacen(
+        tipo, os.path.join(directorio, 'inventario.json'), os.path.join(directorio, 'diario.jsonl'),
+        os.path.join(directorio, 'inventario.db'))
+
+
+def vender(inv, semilla, ventas, productos):
+    """Vender 'ventas' unidades al azar; devuelve (aceptadas, pesos cobrados)"""
+    azar = random.Random(semilla)
+    aceptadas, pesos = 0, 0.0
+    for _ in range(ventas):
+        producto_id = f"PROD_{azar.randrange(productos):08d}"
+        # Precios con centavos para que un peso perdido se note
+        precio = round(azar.uniform(50, 150), 2)
+        ok, resultado, _ = inv.registrar_venta(producto_id, precio)
+        if ok:
+            aceptadas += 1
+            pesos += resultado
+    return aceptadas, pesos
+
+
+def trabajador_proceso(tipo, directorio, semilla, ventas, productos, diferida, cola):
+    inv = Inventario(crear_almacen(tipo, directorio), escritura_diferida=diferida)
+    resultado = vender(inv, semilla, ventas, productos)
+    inv.cerrar()
+    cola.put(resultado)
+
+
+def con_hilos(tipo, directorio, args, compartido):
+    def nuevo_inventario():
+        return Inventario(crear_almacen(tipo, directorio), escritura_diferida=args.diferida)
+
+    inv_compartido = nuevo_inventario() if compartido else None
+    resultados = [None] * args.hilos
+
+    def trabajar(i):
+        inv = inv_compartido or nuevo_inventario()
+        resultados[i] = vender(inv, i, args.ventas, args.productos)
+        if inv is not inv_compartido:
+            inv.cerrar()
+
+    hilos = [threading.Thread(target=trabajar, args=(i,)) for i in range(args.hilos)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    if inv_compartido is not None:
+        inv_compartido.cerrar()
+    return resultados
+
+
+def con_procesos(tipo, directorio, args):
+    cola = multiprocessing.Queue()
+    procesos = [multiprocessing.Process(target=trabajador_proceso,
+                                        args=(tipo, directorio, i, args.ventas, args.productos,
+                                              args.diferida, cola))
+                for i in range(args.procesos)]
+    for proceso in procesos:
+        proceso.start()
+    resultados = [cola.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+    return resultados
+
+
+def verificar(tipo, directorio, entrada, resultados):
+    """Lista de diferencias entre lo que quedó en disco y lo que se cobró"""
+    aceptadas = sum(n for n, _ in resultados)
+    pesos = round(sum(p for _, p in resultados), 2)
+    inv = Inventario(crear_almacen(tipo, directorio))
+    vendidas = sum(item['Ventas_Total'] for item in inv.productos)
+    stock = sum(item['Stock_Total'] for item in inv.productos)
+
+    errores = []
+    if vendidas != aceptadas:
+        errores.append(f"unidades vendidas {vendidas} != ventas aceptadas {aceptadas}")
+    if len(inv.ventas_diarias) != aceptadas:
+        errores.append(f"registros de venta {len(inv.ventas_diarias)} != ventas aceptadas {aceptadas}")
+    if stock + vendidas != entrada:
+        errores.append(f"stock {stock} + vendidas {vendidas} != entrada {entrada}")
+    if any(item['Stock_Total'] < 0 for item in inv.productos):
+        errores.append("stock negativo")
+    if round(inv.caja, 2) != pesos:
+        errores.append(f"caja {inv.caja:.2f} != cobrado {pesos:.2f}")
+    errores += almacenamiento.verificar_agregados(inv.almacen)
+    return aceptadas, errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--ventas', type=int, default=200, help="ventas pedidas por hilo o proceso")
+    parser.add_argument('--productos', type=int, default=20)
+    parser.add_argument('--procesos', type=int, default=4)
+    parser.add_argument('--diferida', action='store_true', help="checkpoints en segundo plano")
+    args = parser.parse_args()
+
+    escenarios = [
+        ('hilos, un Inventario', lambda tipo, d: con_hilos(tipo, d, args, compartido=True), args.hilos),
+        ('hilos, uno por hilo', lambda tipo, d: con_hilos(tipo, d, args, compartido=False), args.hilos),
+        ('procesos', lambda tipo, d: con_procesos(tipo, d, args), args.procesos),
+    ]
+
+    fallas = 0
+    print(f"{'almacén':>8} {'escenario':<22} {'pedidas':>8} {'aceptadas':>10} {'ventas/s':>9}  resultado")
+    for tipo in ('json', 'sqlite'):
+        for nombre, correr, trabajadores in escenarios:
+            pedidas = trabajadores * args.ventas
+            # Stock para ~3/4 de lo pedido: también se prueban los rechazos
+            stock = max(1, pedidas * 3 // 4 // args.productos)
+            with tempfile.TemporaryDirectory() as directorio:
+                productos = catalogo_uniforme(args.productos, stock)
+                crear_almacen(tipo, directorio).guardar(productos, [], 0.0, Agregados.desde_cero(productos, []))
+                inicio = time.perf_counter()
+                resultados = correr(tipo, directorio)
+                duracion = time.perf_counter() - inicio
+                aceptadas, errores = verificar(tipo, directorio, stock * args.productos, resultados)
+            fallas += bool(errores)
+            print(f"{tipo:>8} {nombre:<22} {pedidas:>8} {aceptadas:>10} {aceptadas / duracion:>9.0f}  "
+                  f"{'; '.join(errores) if errores else 'ok'}")
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == '__main__':
+    main()
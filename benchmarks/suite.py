@@ -0,0 +1,309 @@
+"""Suite de benchmarks con datos sintéticos: tiempo y memoria de las operaciones principales
+
+Uso:
+    python benchmarks/suite.py [--perfil rapido|completo] [--escenarios 1000x10000 50000x1000000 ...]
+                               [--almacen json sqlite] [--repeticiones 200] [--salida resultados.json]
+    python benchmarks/suite.py --comparar base.json nuevo.json [--tolerancia 0.25]
+
+Cada escenario (SKUs x ventas) se genera con sinteticos.py y se corre en un
+proceso aparte, así la memoria máxima de uno no se mezcla con la del
+siguiente. Se mide:
+
+- crear:    escribir el almacén sintético (no es una operación de la app);
+- cargar:   abrir el Inventario desde disco, como al arrancar la app;
+- tabla:    el DataFrame de productos que muestra la interfaz;
+- caja:     calcular_caja_total;
+- reporte_dia / reporte_mes: ventas por categoría (últimos 30 días / todo);
+- vender / mover: registrar_venta y mover_stock repetidos (p50, p95, máx.);
+- guardar:  un checkpoint completo.
+
+De cada operación se guarda el mejor tiempo de --rondas pasadas y el pico
+de memoria que reserva Python (tracemalloc, en una pasada aparte para no
+inflar el tiempo), y del escenario el pico de memoria del proceso (RSS).
+Todo sale en JSON para comparar versiones: --comparar marca las operaciones
+que se hicieron más lentas que la tolerancia y termina con código 1 si hay
+alguna.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from perfilado import percentil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PERFILES = {
+    'rapido': ['1000x10000', '10000x100000'],
+    'completo': ['1000x10000', '10000x100000', '50000x1000000', '100000x3000000', '500000x10000000'],
+}
+
+# Por debajo de esto (segundos) el ruido pesa más que el cambio
+MINIMO_COMPARABLE = 0.001
+
+
+def _parsear_escenario(texto):
+    skus, ventas = texto.lower().split('x')
+    return int(skus), int(ventas)
+
+
+def _pico_rss_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    return round(pico / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def _medir(funcion, memoria=True, rondas=1):
+    """(resultado, segundos, pico de memoria en MB o None); el tiempo es el mejor de 'rondas'"""
+    segundos = None
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        transcurrido = time.perf_counter() - inicio
+        segundos = transcurrido if segundos is None else min(segundos, transcurrido)
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        funcion()
+        pico = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 2)
+        tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+def _medir_repetida(funcion, argumentos, memoria=True):
+    """Tiempos de 'funcion' con cada argumento; el pico se mide con unos pocos"""
+    tiempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    ordenados = sorted(tiempos)
+    resultado = {
+        'repeticiones': len(tiempos),
+        'total_s': round(sum(tiempos), 6),
+        'p50_s': round(percentil(ordenados, 50), 6),
+        'p95_s': round(percentil(ordenados, 95), 6),
+        'max_s': round(max(tiempos), 6),
+        'pico_mb': None,
+    }
+    if memoria and argumentos:
+        tracemalloc.start()
+        for args in argumentos[:10]:
+            funcion(*args)
+        resultado['pico_mb'] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 2)
+        tracemalloc.stop()
+    return resultado
+
+
+# ============================================
+# UN ESCENARIO (corre en su propio proceso)
+# ============================================
+def correr_escenario(tipo, skus, ventas, meses, repeticiones, memoria, rondas=3, semilla=0):
+    """Resultados de un escenario como dict"""
+    import almacenamiento
+    import sinteticos
+    from inventario import Inventario, tabla_productos
+    from reportes import ReportesVentas
+
+    operaciones = {}
+
+    def anotar(nombre, segundos, pico):
+        operaciones[nombre] = {'s': round(segundos, 6), 'pico_mb': pico}
+
+    def medir(funcion):
+        return _medir(funcion, memoria, rondas)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        _, rutas = sinteticos.crear_tienda(tipo, directorio, skus, ventas, meses, semilla)
+        anotar('crear', time.perf_counter() - inicio, None)
+
+        def abrir():
+            return Inventario(almacenamiento.crear_almacen(tipo, *rutas))
+
+        inv, segundos, pico = medir(abrir)
+        anotar('cargar', segundos, pico)
+
+        _, segundos, pico = medir(lambda: tabla_productos(inv.productos))
+        anotar('tabla', segundos, pico)
+
+        _, segundos, pico = medir(inv.calcular_caja_total)
+        anotar('caja', segundos, pico)
+
+        # Reportes sin caché: uno nuevo en cada pasada
+        hoy = datetime.now()
+        _, segundos, pico = medir(
+            lambda: ReportesVentas(inv.ventas_diarias).reporte('dia', 'categoria', hoy - timedelta(days=30), hoy))
+        anotar('reporte_dia', segundos, pico)
+        _, segundos, pico = medir(lambda: ReportesVentas(inv.ventas_diarias).reporte('mes', 'categoria'))
+        anotar('reporte_mes', segundos, pico)
+
+        # Una muestra repartida por el catálogo; los que no tienen stock también cuentan (se rechazan)
+        ids = [p['ID'] for p in inv.productos]
+        paso = max(1, len(ids) // repeticiones)
+        muestra = ids[::paso][:repeticiones]
+        operaciones['vender'] = _medir_repetida(inv.registrar_venta, [(i, None) for i in muestra], memoria)
+        operaciones['mover'] = _medir_repetida(inv.mover_stock, [(i, 1, 'Bodega', 'Exhibido') for i in muestra],
+                                               memoria)
+
+        _, segundos, pico = medir(inv.guardar)
+        anotar('guardar', segundos, pico)
+        inv.cerrar()
+
+    return {
+        'almacen': tipo,
+        'skus': skus,
+        'ventas': ventas,
+        'meses': meses,
+        'operaciones': operaciones,
+        'pico_rss_mb': _pico_rss_mb(),
+    }
+
+
+def _en_subproceso(tipo, skus, ventas, args):
+    """Correr el escenario en un proceso nuevo de este mismo script y leer su JSON"""
+    comando = [sys.executable, os.path.abspath(__file__), '--interno', tipo, f"{skus}x{ventas}",
+               '--meses', str(args.meses), '--repeticiones', str(args.repeticiones), '--rondas', str(args.rondas)]
+    if args.sin_memoria:
+        comando.append('--sin-memoria')
+    proceso = subprocess.run(comando, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        return {'almacen': tipo, 'skus': skus, 'ventas': ventas,
+                'error': proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else 'falló'}
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+# ============================================
+# SALIDA Y COMPARACIÓN
+# ============================================
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _segundos(medida):
+    return medida.get('s', medida.get('p50_s'))
+
+
+def imprimir(resultado):
+    if 'error' in resultado:
+        print(f"{resultado['almacen']:>7} {resultado['skus']:>8} x {resultado['ventas']:<9} ERROR: {resultado['error']}")
+        return
+    partes = []
+    for nombre, medida in resultado['operaciones'].items():
+        if 'p50_s' in medida:
+            partes.append(f"{nombre} p50 {medida['p50_s'] * 1e3:.2f}/p95 {medida['p95_s'] * 1e3:.2f} ms")
+        else:
+            partes.append(f"{nombre} {medida['s'] * 1e3:.1f} ms")
+    print(f"{resultado['almacen']:>7} {resultado['skus']:>8} x {resultado['ventas']:<9} "
+          f"RSS {resultado['pico_rss_mb']} MB | " + ', '.join(partes))
+
+
+def comparar(ruta_base, ruta_nueva, tolerancia):
+    """Imprimir la razón nuevo/base por operación; devuelve las regresiones"""
+    with open(ruta_base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(ruta_nueva, encoding='utf-8') as f:
+        nueva = json.load(f)
+
+    def por_clave(datos):
+        return {(r['almacen'], r['skus'], r['ventas']): r for r in datos['resultados'] if 'error' not in r}
+
+    anteriores = por_clave(base)
+    regresiones = []
+    print(f"base {base['meta'].get('commit')} -> nuevo {nueva['meta'].get('commit')} (tolerancia {tolerancia:.0%})")
+    for clave, resultado in por_clave(nueva).items():
+        anterior = anteriores.get(clave)
+        if anterior is None:
+            continue
+        for nombre, medida in resultado['operaciones'].items():
+            if nombre == 'crear' or nombre not in anterior['operaciones']:
+                continue
+            antes, ahora = _segundos(anterior['operaciones'][nombre]), _segundos(medida)
+            if antes is None or ahora is None or max(antes, ahora) < MINIMO_COMPARABLE:
+                continue
+            razon = ahora / antes if antes else float('inf')
+            marca = ''
+            if razon > 1 + tolerancia:
+                marca = '  <-- más lento'
+                regresiones.append((clave, nombre, razon))
+            print(f"{clave[0]:>7} {clave[1]:>8} x {clave[2]:<9} {nombre:<12} "
+                  f"{antes * 1e3:>10.2f} -> {ahora * 1e3:>10.2f} ms  x{razon:.2f}{marca}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--perfil', default='rapido', choices=list(PERFILES))
+    parser.add_argument('--escenarios', nargs='+', help="SKUSxVENTAS, p. ej. 1000x10000 (reemplaza al perfil)")
+    parser.add_argument('--almacen', nargs='+', default=['json', 'sqlite'], choices=['json', 'sqlite'])
+    parser.add_argument('--meses', type=int, default=12, help="meses de historial")
+    parser.add_argument('--repeticiones', type=int, default=200, help="ventas y movimientos por escenario")
+    parser.add_argument('--rondas', type=int, default=3, help="se toma el mejor tiempo de estas pasadas")
+    parser.add_argument('--sin-memoria', action='store_true', help="no medir con tracemalloc (más rápido)")
+    parser.add_argument('--salida', default=None, help="archivo JSON de resultados")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NUEVO'))
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="lentitud aceptada al comparar (0.25 = 25%%)")
+    parser.add_argument('--interno', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        tipo, escenario = args.interno
+        skus, ventas = _parsear_escenario(escenario)
+        resultado = correr_escenario(tipo, skus, ventas, args.meses, args.repeticiones, not args.sin_memoria,
+                                     args.rondas)
+        print(json.dumps(resultado))
+        return
+
+    if args.comparar:
+        regresiones = comparar(*args.comparar, args.tolerancia)
+        print(f"{len(regresiones)} regresiones")
+        sys.exit(1 if regresiones else 0)
+
+    escenarios = [_parsear_escenario(e) for e in (args.escenarios or PERFILES[args.perfil])]
+    resultados = []
+    for skus, ventas in escenarios:
+        for tipo in args.almacen:
+            resultado = _en_subproceso(tipo, skus, ventas, args)
+            imprimir(resultado)
+            resultados.append(resultado)
+
+    salida = {
+        'meta': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+            'meses': args.meses,
+            'repeticiones': args.repeticiones,
+            'rondas': args.rondas,
+            'memoria': not args.sin_memoria,
+        },
+        'resultados': resultados,
+    }
+    ruta = args.salida or f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(salida, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {ruta}")
+    sys.exit(1 if any('error' in r for r in resultados) else 0)
+
+
+if __name__ == '__main__':
+    main()
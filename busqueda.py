@@ -0,0 +1,192 @@
+"""Índice de búsqueda de productos
+
+Índice invertido incremental sobre Producto, Categoria, Color y Talla:
+
+- token -> IDs de producto que lo contienen
+- trigrama -> tokens del vocabulario que lo contienen
+- vocabulario ordenado para búsquedas por prefijo
+
+La búsqueda ignora mayúsculas y acentos. Cada término de la consulta
+coincide con un token si es su prefijo, si aparece dentro de él (como el
+antiguo str.contains) o si está a uno o dos errores de distancia (letras
+cambiadas, de más, de menos o intercambiadas). Un producto coincide cuando
+todos los términos coinciden.
+"""
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+# Campos de texto del producto que se indexan
+CAMPOS_BUSQUEDA = ['Producto', 'Categoria', 'Color', 'Talla']
+
+# Longitud mínima de término para tolerar errores, y errores permitidos
+MIN_LARGO_TOLERANCIA = 4
+LARGO_DOS_ERRORES = 8
+
+_SEPARADORES = re.compile(r"[^0-9a-zñ]+")
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos ('Suéter' -> 'sueter'); la ñ se conserva"""
+    texto = str(texto).lower().replace('ñ', '\0')
+    texto = unicodedata.normalize('NFKD', texto)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return texto.replace('\0', 'ñ')
+
+
+def tokenizar(texto):
+    """Palabras normalizadas de un texto"""
+    return [t for t in _SEPARADORES.split(normalizar(texto)) if t]
+
+
+def trigramas(token, relleno=True):
+    """Trigramas del token; con relleno también los de inicio y fin"""
+    if relleno:
+        token = f"^{token}$"
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def distancia_edicion(a, b, maximo):
+    """Distancia de edición (letras cambiadas, sobrantes, faltantes o
+    intercambiadas), cortando en cuanto supera 'maximo'"""
+    if abs(len(a) - len(b)) > maximo:
+        return maximo + 1
+    antepenultima = None
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            costo = min(anterior[j] + 1, actual[j - 1] + 1,
+                        anterior[j - 1] + (ca != cb))
+            # Dos letras intercambiadas ('oxfrod' -> 'oxford') cuentan como un error
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                costo = min(costo, antepenultima[j - 2] + 1)
+            actual.append(costo)
+        if min(actual) > maximo:
+            return maximo + 1
+        antepenultima, anterior = anterior, actual
+    return anterior[-1]
+
+
+class IndiceBusqueda:
+    """Índice invertido de productos, actualizable producto a producto"""
+
+    def __init__(self, productos=()):
+        self._tokens_por_id = {}
+        self._ids_por_token = {}
+        self._tokens_por_trigrama = {}
+        self._vocabulario = []
+        for producto in productos:
+            self.agregar(producto)
+
+    def __len__(self):
+        return len(self._tokens_por_id)
+
+    # ------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------
+    def agregar(self, producto):
+        """Indexar un producto (si ya estaba, se reemplaza)"""
+        producto_id = producto['ID']
+        if producto_id in self._tokens_por_id:
+            self.quitar(producto_id)
+
+        tokens = set()
+        for campo in CAMPOS_BUSQUEDA:
+            tokens.update(tokenizar(producto.get(campo, '')))
+        self._tokens_por_id[producto_id] = tokens
+
+        for token in tokens:
+            ids = self._ids_por_token.get(token)
+            if ids is None:
+                # Token nuevo en el vocabulario
+                ids = self._ids_por_token[token] = set()
+                insort(self._vocabulario, token)
+                for tri in trigramas(token):
+                    self._tokens_por_trigrama.setdefault(tri, set()).add(token)
+            ids.add(producto_id)
+
+    def quitar(self, producto_id):
+        """Sacar un producto del índice"""
+        tokens = self._tokens_por_id.pop(producto_id, set())
+        for token in tokens:
+            ids = self._ids_por_token[token]
+            ids.discard(producto_id)
+            if not ids:
+                # Ningún producto usa ya el token
+                del self._ids_por_token[token]
+                del self._vocabulario[bisect_left(self._vocabulario, token)]
+                for tri in trigramas(token):
+                    con_tri = self._tokens_por_trigrama[tri]
+                    con_tri.discard(token)
+                    if not con_tri:
+                        del self._tokens_por_trigrama[tri]
+
+    def actualizar(self, producto):
+        """Reindexar un producto después de editarlo"""
+        self.agregar(producto)
+
+    # ------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------
+    def _tokens_con_prefijo(self, termino):
+        inicio = bisect_left(self._vocabulario, termino)
+        encontrados = set()
+        for token in self._vocabulario[inicio:]:
+            if not token.startswith(termino):
+                break
+            encontrados.add(token)
+        return encontrados
+
+    def _tokens_que_contienen(self, termino):
+        tris = trigramas(termino, relleno=False)
+        if not tris:
+            return set()
+        candidatos = None
+        for tri in sorted(tris, key=lambda t: len(self._tokens_por_trigrama.get(t, ()))):
+            con_tri = self._tokens_por_trigrama.get(tri)
+            if not con_tri:
+                return set()
+            candidatos = set(con_tri) if candidatos is None else candidatos & con_tri
+        return {token for token in candidatos if termino in token}
+
+    def _tokens_parecidos(self, termino):
+        maximo = 2 if len(termino) >= LARGO_DOS_ERRORES else 1
+        tris = trigramas(termino)
+        # Cada error cambia a lo sumo 4 trigramas (3, o 4 si es un intercambio):
+        # lo que comparte menos no puede estar a 'maximo' errores
+        minimo_comun = len(tris) - 4 * maximo
+        conteo = {}
+        for tri in tris:
+            for token in self._tokens_por_trigrama.get(tri, ()):
+                conteo[token] = conteo.get(token, 0) + 1
+        return {
+            token for token, comunes in conteo.items()
+            if comunes >= minimo_comun and distancia_edicion(termino, token, maximo) <= maximo
+        }
+
+    def tokens_para(self, termino):
+        """Tokens del vocabulario que coinciden con un término de búsqueda"""
+        tokens = self._tokens_con_prefijo(termino)
+        if len(termino) >= 3:
+            tokens |= self._tokens_que_contienen(termino)
+        if len(termino) >= MIN_LARGO_TOLERANCIA:
+            tokens |= self._tokens_parecidos(termino)
+        return tokens
+
+    def buscar(self, texto):
+        """IDs de los productos que coinciden con todos los términos del texto"""
+        terminos = tokenizar(texto)
+        if not terminos:
+            return set(self._tokens_por_id)
+
+        resultado = None
+        # Primero los términos más largos: suelen ser los más selectivos
+        for termino in sorted(terminos, key=len, reverse=True):
+            ids = set()
+            for token in self.tokens_para(termino):
+                ids |= self._ids_por_token[token]
+            resultado = ids if resultado is None else resultado & ids
+            if not resultado:
+                break
+        return resultado
@@ -0,0 +1,44 @@
+"""Caché con descarte LRU, compartida entre hilos
+
+La usa la interfaz para no rearmar en cada rerun las figuras y tablas que
+no cambiaron (ver app.py): quien llama arma la clave con la versión de los
+datos y los filtros, así una entrada vieja nunca se vuelve a pedir y sale
+sola por ser la usada hace más tiempo.
+"""
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Hasta 'maximo' valores por clave; al pasarse descarta el usado hace más tiempo"""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._valores = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, crear):
+        """Valor guardado para 'clave'; si no está, se arma con crear() y se guarda"""
+        with self._lock:
+            if clave in self._valores:
+                self._valores.move_to_end(clave)
+                self.aciertos += 1
+                return self._valores[clave]
+            self.fallos += 1
+        # Fuera del lock: armar una figura no frena a las otras sesiones
+        valor = crear()
+        with self._lock:
+            self._valores[clave] = valor
+            self._valores.move_to_end(clave)
+            while len(self._valores) > self.maximo:
+                self._valores.popitem(last=False)
+        return valor
+
+    def vaciar(self):
+        with self._lock:
+            self._valores.clear()
+
+    def __len__(self):
+        return len(self._valores)
@@ -0,0 +1,81 @@
+"""Escritura del estado completo en segundo plano
+
+Cada operación ya queda guardada en el diario (una línea); lo caro es el
+checkpoint que vuelca todo el inventario al snapshot. EscritorDiferido lo
+saca del clic: la operación solo pide un guardado y un hilo aparte lo hace.
+Los pedidos que llegan durante INTERVALO_SEGUNDOS se juntan en una sola
+escritura.
+
+Al cerrar el proceso (atexit) se escribe lo pendiente; cerrar() y vaciar()
+permiten hacerlo a mano.
+"""
+import atexit
+import threading
+import time
+
+# Espera desde el primer pedido hasta escribir, para juntar los siguientes
+INTERVALO_SEGUNDOS = 2.0
+
+
+class EscritorDiferido:
+    """Hilo que ejecuta 'escribir' como mucho una vez por intervalo mientras haya pedidos"""
+
+    def __init__(self, escribir, intervalo=INTERVALO_SEGUNDOS):
+        self._escribir = escribir
+        self.intervalo = intervalo
+        self._condicion = threading.Condition()
+        # Evita que vaciar() y el hilo escriban a la vez
+        self._escribiendo = threading.Lock()
+        self._pendiente = False
+        self._cerrado = False
+        self.escrituras = 0
+        self.ultimo_error = None
+        self._hilo = threading.Thread(target=self._bucle, name='escritor-inventario', daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def pedir(self):
+        """Marcar que hay algo que escribir (no espera)"""
+        with self._condicion:
+            self._pendiente = True
+            self._condicion.notify()
+
+    def vaciar(self):
+        """Escribir ya lo pendiente, en este hilo"""
+        with self._escribiendo:
+            with self._condicion:
+                if not self._pendiente:
+                    return
+                self._pendiente = False
+            try:
+                self._escribir()
+                self.escrituras += 1
+                self.ultimo_error = None
+            except Exception as e:
+                # Se reintenta en el siguiente intervalo
+                self.ultimo_error = e
+                with self._condicion:
+                    self._pendiente = True
+
+    def cerrar(self):
+        """Escribir lo pendiente y detener el hilo"""
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify()
+        self._hilo.join()
+        self.vaciar()
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while not self._pendiente and not self._cerrado:
+                    self._condicion.wait()
+                if self._cerrado:
+                    return
+                # Juntar los pedidos que lleguen durante el intervalo
+                limite = time.monotonic() + self.intervalo
+                while not self._cerrado and time.monotonic() < limite:
+                    self._condicion.wait(limite - time.monotonic())
+                if self._cerrado:
+                    return
+            self.vaciar()
@@ -0,0 +1,223 @@
+"""Exportación por partes de inventario, ventas y resúmenes por periodo
+
+Cada exportación es un generador de bloques de bytes: el inventario sale en
+bloques de FILAS_POR_BLOQUE productos y las ventas mes por mes, leyendo
+una sola partición a la vez (ver HistorialVentas.particiones), así que la
+memoria no crece con los años de historial. Con comprimir=True el CSV sale
+como gzip a medida que se genera.
+
+Excel (.xlsx) se arma con openpyxl en modo de solo escritura sobre un
+archivo temporal; si las ventas pasan del límite de filas de una hoja,
+siguen en otra.
+
+Uso como script (escribe directo al archivo, sin pasar por la interfaz):
+
+    python exportacion.py ventas --desde 2024-01-01 --hasta 2024-12-31 --gzip
+"""
+import argparse
+import os
+import tempfile
+import zlib
+from datetime import datetime
+
+import pandas as pd
+
+from inventario import TIPOS_TABLA
+from reportes import COLUMNAS_REPORTE
+
+FILAS_POR_BLOQUE = 5000
+
+COLUMNAS_INVENTARIO = list(TIPOS_TABLA)
+COLUMNAS_VENTAS = ['fecha', 'producto_id', 'producto', 'talla', 'categoria', 'ubicacion',
+                   'ubicacion_venta', 'precio_sugerido', 'precio_venta']
+
+# Filas por hoja de Excel (el límite es 1.048.576 con el encabezado)
+MAX_FILAS_HOJA = 1_000_000
+
+# Tamaño de los bloques al leer el .xlsx temporal
+BLOQUE_BYTES = 1 << 20
+
+
+class ErrorExportacion(Exception):
+    """No se puede generar el archivo pedido"""
+
+
+# ============================================
+# FUENTES: DataFrames por bloques
+# ============================================
+def bloques_inventario(productos):
+    """El catálogo en DataFrames de FILAS_POR_BLOQUE productos"""
+    for inicio in range(0, len(productos), FILAS_POR_BLOQUE):
+        bloque = pd.DataFrame(productos[inicio:inicio + FILAS_POR_BLOQUE])
+        yield bloque.reindex(columns=COLUMNAS_INVENTARIO)
+
+
+def bloques_ventas(historial, desde=None, hasta=None, categorias=None):
+    """Las ventas entre 'desde' y 'hasta' (inclusive), un DataFrame por mes
+
+    'categorias' (opcional) limita a esas categorías.
+    """
+    inicio = pd.Timestamp(desde) if desde is not None else None
+    fin = pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1) if hasta is not None else None
+    # Incluye los meses cerrados, leídos del archivo
+    for particion in historial.particiones(desde, hasta, conservar=False, archivadas=True):
+        if not len(particion):
+            continue
+        df = particion.a_dataframe()
+        mascara = pd.Series(True, index=df.index)
+        if inicio is not None:
+            mascara &= df['fecha'] >= inicio
+        if fin is not None:
+            mascara &= df['fecha'] < fin
+        if categorias:
+            mascara &= df['categoria'].isin(list(categorias))
+        if mascara.any():
+            yield df.loc[mascara, COLUMNAS_VENTAS]
+
+
+def bloques_resumen(reportes, frecuencia='mes', por='categoria', desde=None, hasta=None):
+    """Resumen por periodo y grupo (ver reportes.agrupar): una sola tabla chica"""
+    yield reportes.reporte(frecuencia, por, desde, hasta)
+
+
+# ============================================
+# FORMATOS
+# ============================================
+def csv_por_bloques(frames, columnas):
+    """CSV (UTF-8 con BOM, como lo abre Excel) a partir de DataFrames, bloque a bloque"""
+    yield ('\ufeff' + ','.join(columnas) + '\n').encode('utf-8')
+    for frame in frames:
+        yield frame.to_csv(index=False, header=False).encode('utf-8')
+
+
+def gzip_por_bloques(bloques):
+    """Comprimir en formato gzip a medida que llegan los bloques"""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = encabezado gzip
+    for bloque in bloques:
+        comprimido = compresor.compress(bloque)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+def xlsx_por_bloques(frames, columnas, hoja):
+    """Libro de Excel a partir de DataFrames; se escribe a un temporal y se lee en bloques"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ErrorExportacion("Para exportar a Excel hace falta el paquete 'openpyxl' (pip install openpyxl)")
+
+    libro = Workbook(write_only=True)
+    numero, filas = 1, 0
+    actual = libro.create_sheet(hoja)
+    actual.append(columnas)
+    for frame in frames:
+        for fila in frame.astype(object).where(frame.notna(), None).itertuples(index=False):
+            if filas == MAX_FILAS_HOJA:
+                numero, filas = numero + 1, 0
+                actual = libro.create_sheet(f"{hoja}_{numero}")
+                actual.append(columnas)
+            actual.append(list(fila))
+            filas += 1
+
+    with tempfile.TemporaryFile() as temporal:
+        libro.save(temporal)
+        temporal.seek(0)
+        while True:
+            bloque = temporal.read(BLOQUE_BYTES)
+            if not bloque:
+                break
+            yield bloque
+
+
+# ============================================
+# EXPORTACIONES
+# ============================================
+# tipo -> (nombre base del archivo, hoja de Excel)
+TIPOS = {
+    'inventario': ('inventario', 'Inventario'),
+    'ventas': ('ventas', 'Ventas'),
+    'resumen': ('resumen_ventas', 'Resumen'),
+}
+
+
+def exportar(inventario, tipo, formato='csv', comprimir=False, desde=None, hasta=None,
+             categorias=None, frecuencia='mes', por='categoria'):
+    """Bloques de bytes del archivo pedido
+
+    tipo: 'inventario', 'ventas' (filtrable por fechas y categorías) o
+    'resumen' (por frecuencia y agrupación, ver reportes.py).
+    formato: 'csv' o 'xlsx'; comprimir (gzip) solo aplica al CSV.
+    """
+    if tipo == 'inventario':
+        frames, columnas = bloques_inventario(inventario.productos), COLUMNAS_INVENTARIO
+    elif tipo == 'ventas':
+        frames, columnas = bloques_ventas(inventario.ventas_diarias, desde, hasta, categorias), COLUMNAS_VENTAS
+    elif tipo == 'resumen':
+        frames, columnas = bloques_resumen(inventario.reportes, frecuencia, por, desde, hasta), COLUMNAS_REPORTE
+    else:
+        raise ErrorExportacion(f"Exportación desconocida: {tipo}")
+
+    if formato == 'xlsx':
+        return xlsx_por_bloques(frames, columnas, TIPOS[tipo][1])
+    if formato != 'csv':
+        raise ErrorExportacion(f"Formato no soportado: {formato} (usa csv o xlsx)")
+    bloques = csv_por_bloques(frames, columnas)
+    return gzip_por_bloques(bloques) if comprimir else bloques
+
+
+def nombre_archivo(tipo, formato='csv', comprimir=False):
+    """Nombre sugerido con fecha y hora, p. ej. ventas_20240131_1830.csv.gz"""
+    extension = '.xlsx' if formato == 'xlsx' else '.csv.gz' if comprimir else '.csv'
+    return f"{TIPOS[tipo][0]}_{datetime.now().strftime('%Y%m%d_%H%M')}{extension}"
+
+
+def tipo_mime(formato='csv', comprimir=False):
+    """Tipo MIME para la descarga"""
+    if formato == 'xlsx':
+        return 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return 'application/gzip' if comprimir else 'text/csv'
+
+
+def escribir(bloques, destino):
+    """Escribir los bloques en un archivo abierto en binario; devuelve los bytes escritos"""
+    total = 0
+    for bloque in bloques:
+        destino.write(bloque)
+        total += len(bloque)
+    return total
+
+
+if __name__ == '__main__':
+    import almacenamiento
+    from inventario import Inventario
+
+    parser = argparse.ArgumentParser(description="Exportar inventario, ventas o resúmenes")
+    parser.add_argument('tipo', choices=list(TIPOS))
+    parser.add_argument('--almacen', default=os.environ.get("INVENTARIO_ALMACEN", "json"), choices=['json', 'sqlite'])
+    parser.add_argument('--json', default=almacenamiento.RUTA_SNAPSHOT)
+    parser.add_argument('--diario', default=almacenamiento.RUTA_DIARIO)
+    parser.add_argument('--db', default=almacenamiento.RUTA_SQLITE)
+    parser.add_argument('--ventas', default=almacenamiento.RUTA_VENTAS, help="Directorio de ventas por mes")
+    parser.add_argument('--archivo', default=almacenamiento.RUTA_ARCHIVO, help="Directorio de meses cerrados")
+    parser.add_argument('--formato', default='csv', choices=['csv', 'xlsx'])
+    parser.add_argument('--gzip', action='store_true', help="Comprimir el CSV")
+    parser.add_argument('--desde', default=None, help="AAAA-MM-DD")
+    parser.add_argument('--hasta', default=None, help="AAAA-MM-DD (inclusive)")
+    parser.add_argument('--categoria', action='append', help="Solo esta categoría (se puede repetir)")
+    parser.add_argument('--frecuencia', default='mes', choices=['dia', 'semana', 'mes'])
+    parser.add_argument('--por', default='categoria', choices=['categoria', 'ubicacion'])
+    parser.add_argument('--salida', default=None, help="Archivo de salida (nombre con fecha por omisión)")
+    args = parser.parse_args()
+
+    inv = Inventario(almacenamiento.crear_almacen(args.almacen, args.json, args.diario, args.db, args.ventas,
+                                                  args.archivo))
+    salida = args.salida or nombre_archivo(args.tipo, args.formato, args.gzip)
+    try:
+        bloques = exportar(inv, args.tipo, args.formato, args.gzip, args.desde, args.hasta,
+                           args.categoria, args.frecuencia, args.por)
+        with open(salida, 'wb') as f:
+            total = escribir(bloques, f)
+    except ErrorExportacion as e:
+        raise SystemExit(str(e))
+    print(f"{salida}: {total:,} bytes")
@@ -0,0 +1,542 @@
+"""Historial de ventas en columnas, particionado por mes
+
+Cada venta ocupaba un dict con los mismos textos repetidos (producto,
+talla, categoría, ubicación). Aquí las ventas de cada mes se guardan como
+arreglos de NumPy: fecha y precios como números y cada texto codificado
+contra un diccionario de valores del mes, así un texto repetido cuesta
+4 bytes.
+
+Los meses se leen de la fuente (archivos .npz por mes, o la tabla de
+ventas de SQLite) solo cuando alguien los pide: una consulta por rango de
+fechas no toca los meses fuera del rango.
+
+HistorialVentas se comporta como la antigua lista de ventas para quien la
+recorre (cada venta sale como dict) o le agrega con append(). La fecha de
+cada venta sale escrita como entró ('2024-01-05 10:00:00' o la de
+datetime.isoformat()): guardar datos viejos no los reescribe.
+
+Cada partición tiene además un índice producto_id -> filas, armado la
+primera vez que se consulta un producto y mantenido en cada venta: las
+ventas de un producto (ventas_de, total_de) cuestan lo que sus ventas y
+no lo que el historial completo.
+
+Los meses ya cerrados (ver Inventario.cerrar_periodo) pasan a un archivo
+aparte, ArchivoVentas: cada mes queda en un .npz comprimido con sus ventas
+y el resumen diario ya calculado. Los reportes leen solo ese resumen, así
+que el historial activo solo tiene el periodo abierto.
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Textos de una venta (codificados con diccionario) y columnas numéricas
+COLUMNAS_TEXTO = ['producto_id', 'producto', 'talla', 'categoria', 'ubicacion', 'ubicacion_venta']
+COLUMNAS_NUMERO = ['precio_sugerido', 'precio_venta']
+
+# Partición para ventas sin fecha legible
+MES_SIN_FECHA = 'sin-fecha'
+
+# Cómo venía escrita la fecha de cada venta (banderas; 0 = como datetime.isoformat())
+FECHA_ESPACIO = 1  # ' ' entre el día y la hora en lugar de 'T'
+FECHA_FRACCION = 2  # con '.ffffff' aunque sea cero
+FECHA_SOLO_DIA = 4  # 'AAAA-MM-DD', sin hora
+
+# Columnas del resumen diario de un mes cerrado (ver reportes.resumen_diario)
+COLUMNAS_RESUMEN_TEXTO = ['categoria', 'ubicacion']
+COLUMNAS_RESUMEN_NUMERO = ['unidades', 'ingresos', 'sugerido']
+
+
+def mes_de(fecha):
+    """'AAAA-MM' de una fecha ISO (texto o datetime)"""
+    texto = fecha.isoformat() if hasattr(fecha, 'isoformat') else str(fecha or '')
+    if len(texto) >= 7 and texto[:4].isdigit() and texto[4] == '-' and texto[5:7].isdigit():
+        return texto[:7]
+    return MES_SIN_FECHA
+
+
+def _a_datetime64(fecha):
+    try:
+        return np.datetime64(fecha, 'us')
+    except (ValueError, TypeError):
+        return np.datetime64('NaT', 'us')
+
+
+def _formato_fecha(fecha):
+    """Banderas FECHA_* del texto de una fecha"""
+    if not isinstance(fecha, str):
+        return 0
+    texto = fecha.strip()
+    if len(texto) == 10:
+        return FECHA_SOLO_DIA
+    banderas = 0
+    if len(texto) > 10 and texto[10] == ' ':
+        banderas |= FECHA_ESPACIO
+    if '.' in texto[19:]:
+        banderas |= FECHA_FRACCION
+    return banderas
+
+
+def _texto_fecha(fecha, banderas):
+    """Fecha como texto, escrita como indican las banderas FECHA_*"""
+    if np.isnat(fecha):
+        return ''
+    texto = str(np.datetime_as_string(fecha, unit='us'))
+    if banderas & FECHA_SOLO_DIA:
+        return texto[:10]
+    if not banderas & FECHA_FRACCION and texto.endswith('.000000'):
+        texto = texto[:19]
+    if banderas & FECHA_ESPACIO:
+        texto = texto[:10] + ' ' + texto[11:]
+    return texto
+
+
+class ParticionVentas:
+    """Ventas de un mes en columnas"""
+
+    def __init__(self, mes, capacidad=64):
+        self.mes = mes
+        # Última secuencia del diario incluida al guardar (ver almacenamiento.py)
+        self.secuencia = 0
+        self.n = 0
+        self.fecha = np.empty(capacidad, dtype='datetime64[us]')
+        self.formato_fecha = np.zeros(capacidad, dtype=np.int8)
+        self.numeros = {col: np.empty(capacidad, dtype=np.float64) for col in COLUMNAS_NUMERO}
+        self.codigos = {col: np.empty(capacidad, dtype=np.int32) for col in COLUMNAS_TEXTO}
+        self.valores = {col: [] for col in COLUMNAS_TEXTO}
+        self._posiciones = {col: {} for col in COLUMNAS_TEXTO}
+        # producto_id -> [filas], armado al primer uso (ver filas_de)
+        self._por_producto = None
+
+    def __len__(self):
+        return self.n
+
+    def _crecer(self):
+        capacidad = max(64, 2 * len(self.fecha))
+        self.fecha = np.resize(self.fecha, capacidad)
+        self.formato_fecha = np.resize(self.formato_fecha, capacidad)
+        self.numeros = {col: np.resize(arr, capacidad) for col, arr in self.numeros.items()}
+        self.codigos = {col: np.resize(arr, capacidad) for col, arr in self.codigos.items()}
+
+    def _codificar(self, columna, valor):
+        """Código del valor en el diccionario de la columna (-1 = sin valor)"""
+        if valor is None:
+            return -1
+        valor = str(valor)
+        posiciones = self._posiciones[columna]
+        codigo = posiciones.get(valor)
+        if codigo is None:
+            codigo = posiciones[valor] = len(self.valores[columna])
+            self.valores[columna].append(valor)
+        return codigo
+
+    def agregar(self, venta):
+        """Agregar una venta (dict) al final"""
+        if self.n == len(self.fecha):
+            self._crecer()
+        i = self.n
+        self.fecha[i] = _a_datetime64(venta.get('fecha'))
+        self.formato_fecha[i] = _formato_fecha(venta.get('fecha'))
+        for col in COLUMNAS_NUMERO:
+            valor = venta.get(col)
+            self.numeros[col][i] = np.nan if valor is None else float(valor)
+        for col in COLUMNAS_TEXTO:
+            self.codigos[col][i] = self._codificar(col, venta.get(col))
+        self.n += 1
+        if self._por_producto is not None and venta.get('producto_id') is not None:
+            self._por_producto.setdefault(str(venta['producto_id']), []).append(i)
+
+    def filas_de(self, producto_id):
+        """Filas de las ventas de un producto (lista vacía si no tiene)"""
+        if self._por_producto is None:
+            # Agrupar los códigos de una vez: un solo ordenamiento vectorizado
+            codigos = self.codigos['producto_id'][:self.n]
+            orden = np.argsort(codigos, kind='stable')
+            cortes = np.flatnonzero(np.diff(codigos[orden])) + 1
+            self._por_producto = {}
+            for filas in np.split(orden, cortes) if self.n else []:
+                codigo = codigos[filas[0]]
+                if codigo >= 0:
+                    self._por_producto[self.valores['producto_id'][codigo]] = filas.tolist()
+        return self._por_producto.get(producto_id, [])
+
+    def completar_producto_id(self, ids):
+        """Poner producto_id a las ventas sin él, por descripción (ver identificadores.ids_por_descripcion)
+
+        Devuelve cuántas se completaron.
+        """
+        faltan = np.flatnonzero(self.codigos['producto_id'][:self.n] < 0)
+        completadas = 0
+        for i in faltan:
+            venta = self.fila(i)
+            producto_id = ids.get((venta['producto'], venta['talla'], venta['categoria']))
+            if producto_id is not None:
+                self.codigos['producto_id'][i] = self._codificar('producto_id', producto_id)
+                completadas += 1
+        if completadas:
+            self._por_producto = None
+        return completadas
+
+    def fila(self, i):
+        """Venta i como dict (mismo formato que registrar_venta)"""
+        fecha = self.fecha[i]
+        venta = {'fecha': _texto_fecha(fecha, self.formato_fecha[i])}
+        for col in COLUMNAS_TEXTO:
+            codigo = self.codigos[col][i]
+            if codigo >= 0:
+                venta[col] = self.valores[col][codigo]
+            elif col != 'producto_id':
+                venta[col] = None
+        for col in COLUMNAS_NUMERO:
+            valor = self.numeros[col][i]
+            venta[col] = 0.0 if np.isnan(valor) else float(valor)
+        return venta
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self.fila(i)
+
+    def a_dataframe(self):
+        """DataFrame de la partición; los textos como Categorical sin copiar cadenas"""
+        n = self.n
+        data = {'fecha': self.fecha[:n]}
+        for col in COLUMNAS_TEXTO:
+            data[col] = pd.Categorical.from_codes(self.codigos[col][:n],
+                                                  categories=pd.Index(self.valores[col], dtype=object))
+        for col in COLUMNAS_NUMERO:
+            data[col] = self.numeros[col][:n]
+        return pd.DataFrame(data)
+
+    def nbytes(self):
+        """Memoria aproximada de la partición"""
+        total = self.fecha.nbytes + self.formato_fecha.nbytes
+        total += sum(arr.nbytes for arr in self.numeros.values())
+        total += sum(arr.nbytes for arr in self.codigos.values())
+        total += sum(len(v) + 49 for valores in self.valores.values() for v in valores)
+        return total
+
+    # ------------------------------------------------------------
+    # Serialización a arreglos (.npz)
+    # ------------------------------------------------------------
+    def a_arreglos(self):
+        n = self.n
+        arreglos = {'fecha': self.fecha[:n], 'fecha__formato': self.formato_fecha[:n],
+                    'secuencia': np.array(self.secuencia, dtype=np.int64)}
+        for col in COLUMNAS_NUMERO:
+            arreglos[col] = self.numeros[col][:n]
+        for col in COLUMNAS_TEXTO:
+            arreglos[f'{col}__codigos'] = self.codigos[col][:n]
+            arreglos[f'{col}__valores'] = np.array(self.valores[col], dtype=str)
+        return arreglos
+
+    @classmethod
+    def desde_arreglos(cls, mes, arreglos):
+        particion = cls(mes, capacidad=0)
+        particion.n = len(arreglos['fecha'])
+        particion.secuencia = int(arreglos['secuencia'])
+        particion.fecha = np.array(arreglos['fecha'], dtype='datetime64[us]')
+        # Meses guardados antes de recordar el formato: como datetime.isoformat()
+        particion.formato_fecha = (np.array(arreglos['fecha__formato'], dtype=np.int8)
+                                   if 'fecha__formato' in arreglos else np.zeros(particion.n, dtype=np.int8))
+        particion.numeros = {col: np.array(arreglos[col], dtype=np.float64) for col in COLUMNAS_NUMERO}
+        particion.codigos = {col: np.array(arreglos[f'{col}__codigos'], dtype=np.int32) for col in COLUMNAS_TEXTO}
+        particion.valores = {col: [str(v) for v in arreglos[f'{col}__valores']] for col in COLUMNAS_TEXTO}
+        particion._posiciones = {col: {v: i for i, v in enumerate(valores)}
+                                 for col, valores in particion.valores.items()}
+        particion._por_producto = None
+        return particion
+
+
+class DirectorioParticiones:
+    """Un archivo .npz comprimido por mes dentro de un directorio"""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+
+    def _ruta(self, mes):
+        return os.path.join(self.directorio, f"{mes}.npz")
+
+    def meses(self):
+        if not os.path.isdir(self.directorio):
+            return []
+        return [nombre[:-4] for nombre in os.listdir(self.directorio) if nombre.endswith('.npz')]
+
+    def leer(self, mes):
+        with np.load(self._ruta(mes), allow_pickle=False) as arreglos:
+            return ParticionVentas.desde_arreglos(mes, arreglos)
+
+    def escribir(self, particion):
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self._ruta(particion.mes)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'wb') as f:
+            np.savez_compressed(f, **particion.a_arreglos())
+        os.replace(temporal, ruta)
+
+    def borrar(self, mes):
+        try:
+            os.remove(self._ruta(mes))
+        except FileNotFoundError:
+            pass
+
+
+class ArchivoVentas(DirectorioParticiones):
+    """Meses cerrados: ventas y resumen diario en un .npz comprimido por mes
+
+    El resumen (una fila por día, categoría y ubicación, ver
+    reportes.resumen_diario) va en el mismo archivo con el prefijo
+    'resumen__'; np.load lee cada arreglo por separado, así que leer el
+    resumen no descomprime las ventas.
+    """
+
+    def archivar(self, particion, resumen):
+        """Escribir un mes cerrado con su resumen diario (DataFrame)"""
+        arreglos = particion.a_arreglos()
+        arreglos['resumen__dia'] = resumen['dia'].to_numpy(dtype='datetime64[us]')
+        for col in COLUMNAS_RESUMEN_TEXTO:
+            arreglos[f'resumen__{col}'] = np.array(resumen[col].astype(str).tolist(), dtype=str)
+        for col in COLUMNAS_RESUMEN_NUMERO:
+            arreglos[f'resumen__{col}'] = resumen[col].to_numpy()
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self._ruta(particion.mes)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'wb') as f:
+            np.savez_compressed(f, **arreglos)
+        os.replace(temporal, ruta)
+
+    def resumen(self, mes):
+        """Resumen diario del mes, sin leer sus ventas"""
+        with np.load(self._ruta(mes), allow_pickle=False) as arreglos:
+            data = {'dia': np.array(arreglos['resumen__dia'], dtype='datetime64[us]')}
+            for col in COLUMNAS_RESUMEN_TEXTO:
+                data[col] = np.array(arreglos[f'resumen__{col}'], dtype=object)
+            for col in COLUMNAS_RESUMEN_NUMERO:
+                data[col] = arreglos[f'resumen__{col}']
+        return pd.DataFrame(data)
+
+    def apartar(self):
+        """Mover el archivo completo a un directorio con fecha (reset); devuelve la ruta nueva o None"""
+        if not os.path.isdir(self.directorio):
+            return None
+        destino = f"{self.directorio}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        os.replace(self.directorio, destino)
+        return destino
+
+
+class HistorialVentas:
+    """Todas las ventas, por mes, cargando cada mes de la fuente al usarlo
+
+    'archivo' (opcional) es el ArchivoVentas con los meses cerrados: no se
+    recorren con el resto, solo se consultan sus resúmenes.
+    """
+
+    def __init__(self, fuente=None, archivo=None):
+        self.fuente = fuente
+        self.archivo = archivo
+        self.archivados = set(archivo.meses()) if archivo is not None else set()
+        self._particiones = {}
+        en_fuente = set(fuente.meses()) if fuente is not None else set()
+        # Un mes archivado que sigue en la fuente quedó de un cierre
+        # interrumpido: vale el archivo y la copia se borra al guardar
+        self._en_fuente = en_fuente - self.archivados
+        self._sucias = set()
+        self._borradas = en_fuente & self.archivados
+
+    @classmethod
+    def desde_lista(cls, ventas):
+        """Historial en memoria a partir de una lista de dicts"""
+        historial = cls()
+        for venta in ventas:
+            historial.append(venta)
+        return historial
+
+    def _particion(self, mes):
+        particion = self._particiones.get(mes)
+        if particion is None:
+            if mes in self._en_fuente:
+                particion = self.fuente.leer(mes)
+            else:
+                particion = ParticionVentas(mes)
+            self._particiones[mes] = particion
+        return particion
+
+    def append(self, venta, secuencia=None):
+        """Agregar una venta; con 'secuencia' se omite si el mes ya la tenía guardada"""
+        mes = mes_de(venta.get('fecha'))
+        if secuencia is not None and mes in self.archivados:
+            # Evento del diario de un mes que ya se cerró (y archivó con esta venta)
+            return False
+        particion = self._particion(mes)
+        if secuencia is not None and secuencia <= particion.secuencia:
+            return False
+        particion.agregar(venta)
+        self._sucias.add(mes)
+        return True
+
+    def meses(self):
+        """Meses con ventas, en orden"""
+        return sorted((self._en_fuente | set(self._particiones)) - self._borradas)
+
+    @staticmethod
+    def _en_rango(meses, desde=None, hasta=None):
+        """Meses (en orden) entre 'desde' y 'hasta'; el de ventas sin fecha solo sin rango"""
+        mes_desde = mes_de(desde) if desde is not None else None
+        mes_hasta = mes_de(hasta) if hasta is not None else None
+        for mes in sorted(meses):
+            if mes == MES_SIN_FECHA:
+                if desde is not None or hasta is not None:
+                    continue
+            elif (mes_desde is not None and mes < mes_desde) or (mes_hasta is not None and mes > mes_hasta):
+                continue
+            yield mes
+
+    def particiones(self, desde=None, hasta=None, conservar=True, archivadas=False):
+        """Particiones de los meses entre 'desde' y 'hasta' (fechas o 'AAAA-MM-DD')
+
+        Con conservar=False los meses que no estaban en memoria se leen de la
+        fuente sin quedarse en ella (recorridos completos como la exportación).
+        Con archivadas=True también salen los meses cerrados, leídos del
+        archivo (nunca se quedan en memoria).
+        """
+        activos = set(self.meses())
+        archivados = self.archivados if archivadas else set()
+        for mes in self._en_rango(activos | archivados, desde, hasta):
+            if mes in archivados:
+                yield self.archivo.leer(mes)
+            if mes not in activos:
+                continue
+            if not conservar and mes not in self._particiones and mes in self._en_fuente:
+                yield self.fuente.leer(mes)
+            else:
+                yield self._particion(mes)
+
+    def meses_archivados(self, desde=None, hasta=None):
+        """Meses cerrados entre 'desde' y 'hasta', en orden"""
+        return list(self._en_rango(self.archivados, desde, hasta))
+
+    def resumenes_archivados(self, desde=None, hasta=None):
+        """Resumen diario (DataFrame) de cada mes cerrado entre 'desde' y 'hasta'"""
+        for mes in self.meses_archivados(desde, hasta):
+            yield self.archivo.resumen(mes)
+
+    def archivar(self, mes, resumen):
+        """Pasar un mes al archivo con su resumen y quitarlo del historial activo
+
+        El archivo se escribe ya; el mes se borra de la fuente al guardar.
+        """
+        self.archivo.archivar(self._particion(mes), resumen)
+        self.archivados.add(mes)
+        self._particiones.pop(mes, None)
+        self._sucias.discard(mes)
+        if mes in self._en_fuente:
+            self._en_fuente.discard(mes)
+            self._borradas.add(mes)
+
+    def __iter__(self):
+        for particion in self.particiones():
+            yield from particion
+
+    def __len__(self):
+        return sum(len(particion) for particion in self.particiones())
+
+    def a_dataframe(self, desde=None, hasta=None):
+        """Ventas entre 'desde' y 'hasta' (inclusive) como DataFrame, leyendo solo esos meses"""
+        frames = [p.a_dataframe() for p in self.particiones(desde, hasta) if len(p)]
+        if not frames:
+            columnas = ['fecha'] + COLUMNAS_TEXTO + COLUMNAS_NUMERO
+            return pd.DataFrame({col: pd.Series(dtype='datetime64[us]' if col == 'fecha' else object)
+                                 for col in columnas})
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if desde is not None:
+            df = df[df['fecha'] >= pd.Timestamp(desde)]
+        if hasta is not None:
+            # 'hasta' incluye todo ese día
+            df = df[df['fecha'] < pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1)]
+        return df
+
+    def rango(self, desde=None, hasta=None):
+        """Ventas (dicts) entre 'desde' y 'hasta', leyendo solo esos meses"""
+        inicio = pd.Timestamp(desde).to_datetime64() if desde is not None else None
+        fin = (pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1)).to_datetime64() if hasta is not None else None
+        for particion in self.particiones(desde, hasta):
+            for i in range(len(particion)):
+                fecha = particion.fecha[i]
+                if inicio is not None and fecha < inicio:
+                    continue
+                if fin is not None and fecha >= fin:
+                    continue
+                yield particion.fila(i)
+
+    def ventas_de(self, producto_id, desde=None, hasta=None):
+        """Ventas (dicts) de un producto entre 'desde' y 'hasta', por el índice de cada mes"""
+        for particion in self.particiones(desde, hasta):
+            for i in particion.filas_de(producto_id):
+                yield particion.fila(i)
+
+    def total_de(self, producto_id):
+        """(unidades, importe) vendidos de un producto"""
+        unidades, importe = 0, 0.0
+        for particion in self.particiones():
+            filas = particion.filas_de(producto_id)
+            if filas:
+                unidades += len(filas)
+                importe += float(np.nansum(particion.numeros['precio_venta'][filas]))
+        return unidades, importe
+
+    def completar_producto_id(self, ids):
+        """Completar el producto_id de las ventas viejas que no lo tienen; devuelve cuántas
+
+        'ids' como identificadores.ids_por_descripcion. Los meses que cambian
+        se reescriben al guardar; los meses cerrados no se tocan.
+        """
+        completadas = 0
+        for particion in self.particiones():
+            n = particion.completar_producto_id(ids)
+            if n:
+                completadas += n
+                self._sucias.add(particion.mes)
+        return completadas
+
+    def vaciar(self):
+        """Borrar todas las ventas (los archivos se borran al guardar)
+
+        Los meses cerrados dejan de contarse; el archivo en disco se aparta
+        aparte (ArchivoVentas.apartar).
+        """
+        self._borradas |= self._en_fuente
+        self._en_fuente = set()
+        self._particiones = {}
+        self._sucias = set()
+        self.archivados = set()
+
+    def guardar(self, secuencia=0):
+        """Escribir en la fuente los meses que cambiaron y borrar los vaciados"""
+        for mes in self._borradas:
+            self.fuente.borrar(mes)
+        self._borradas = set()
+        for mes in sorted(self._sucias):
+            particion = self._particiones[mes]
+            particion.secuencia = secuencia
+            self.fuente.escribir(particion)
+            self._en_fuente.add(mes)
+        self._sucias = set()
+
+    def guardar_en(self, fuente, secuencia=0):
+        """Escribir todos los meses en otra fuente, reemplazando lo que tuviera, y quedarse con ella"""
+        particiones = list(self.particiones())
+        meses = {particion.mes for particion in particiones}
+        for mes in fuente.meses():
+            if mes not in meses:
+                fuente.borrar(mes)
+        for particion in particiones:
+            particion.secuencia = secuencia
+            fuente.escribir(particion)
+        self.fuente = fuente
+        self._en_fuente = meses
+        self._sucias = set()
+        self._borradas = set()
+
+    def nbytes(self):
+        """Memoria de los meses ya cargados"""
+        return sum(particion.nbytes() for particion in self._particiones.values())
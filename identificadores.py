@@ -0,0 +1,102 @@
+"""IDs de producto únicos y ordenados por tiempo
+
+Los IDs tienen la forma PROD_AAAAMMDD_HHMMSS_NNNN: la fecha y hora de
+creación más un contador dentro de ese segundo. El generador es único por
+proceso y protegido con un lock, así que las sesiones que crean productos
+a la vez nunca reciben el mismo ID. Si en un segundo se crean más de
+MAX_POR_SEGUNDO productos, se sigue con el segundo siguiente: los IDs no
+se repiten y siguen en orden.
+
+reparar_duplicados() busca IDs repetidos en datos existentes (creados con
+el formato anterior, que solo tenía el segundo) y les asigna IDs nuevos.
+
+ids_por_descripcion() sirve para completar el ID de producto en ventas
+viejas, que solo guardaban producto, talla y categoría.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+PREFIJO = "PROD_"
+MAX_POR_SEGUNDO = 10000
+
+
+class GeneradorIDs:
+    """Genera IDs PROD_AAAAMMDD_HHMMSS_NNNN crecientes y sin repetir"""
+
+    def __init__(self, reloj=time.time):
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._segundo = 0
+        self._contador = -1
+
+    def nuevo(self, existe=None):
+        """Siguiente ID; 'existe' (opcional) descarta IDs ya usados en los datos"""
+        while True:
+            nuevo_id = self._siguiente()
+            if existe is None or not existe(nuevo_id):
+                return nuevo_id
+
+    def _siguiente(self):
+        with self._lock:
+            ahora = int(self._reloj())
+            # Si el reloj retrocede, se sigue desde el último segundo usado
+            if ahora > self._segundo:
+                self._segundo, self._contador = ahora, 0
+            else:
+                self._contador += 1
+                if self._contador >= MAX_POR_SEGUNDO:
+                    self._segundo, self._contador = self._segundo + 1, 0
+            segundo, contador = self._segundo, self._contador
+        return f"{PREFIJO}{datetime.fromtimestamp(segundo).strftime('%Y%m%d_%H%M%S')}_{contador:04d}"
+
+
+# Generador compartido por todo el proceso
+generador = GeneradorIDs()
+
+
+def nuevo_id_producto(existe=None):
+    """ID nuevo del generador del proceso"""
+    return generador.nuevo(existe)
+
+
+def _descripcion(producto):
+    return (producto.get('Producto'), producto.get('Talla'), producto.get('Categoria'))
+
+
+def ids_por_descripcion(productos):
+    """{(producto, talla, categoría): ID} de las descripciones que tiene un solo producto
+
+    Si varios productos comparten la descripción (otro color), no se adivina
+    a cuál corresponde una venta y la descripción no aparece.
+    """
+    conteo = Counter(_descripcion(p) for p in productos)
+    return {_descripcion(p): p['ID'] for p in productos if conteo[_descripcion(p)] == 1}
+
+
+def reparar_duplicados(productos):
+    """Asignar un ID nuevo a cada producto cuyo ID ya lo tenía otro anterior en la lista
+
+    Modifica los productos en su lugar. Devuelve [(id_anterior, id_nuevo, producto)].
+    """
+    repetidos = {producto_id for producto_id, n in Counter(p.get('ID') for p in productos).items() if n > 1}
+    if not repetidos:
+        return []
+
+    usados = {p.get('ID') for p in productos}
+    vistos = set()
+    cambios = []
+    for producto in productos:
+        producto_id = producto.get('ID')
+        if producto_id not in repetidos:
+            continue
+        if producto_id not in vistos:
+            # La primera aparición conserva el ID
+            vistos.add(producto_id)
+            continue
+        nuevo_id = nuevo_id_producto(usados.__contains__)
+        usados.add(nuevo_id)
+        producto['ID'] = nuevo_id
+        cambios.append((producto_id, nuevo_id, producto))
+    return cambios
@@ -0,0 +1,178 @@
+"""Importación masiva de productos desde CSV o Excel
+
+El archivo trae una fila por variante con las columnas de COLUMNAS_REQUERIDAS
+(y opcionalmente Precio_Venta). La validación se hace por columnas sobre el
+DataFrame completo; cada fila con problemas queda en un reporte con todos
+sus errores.
+
+Las filas válidas se agrupan por Producto + Talla + Color (sin distinguir
+mayúsculas ni espacios de más): si la variante ya existe se le suma el
+stock y se actualizan sus precios; si no, se crea un producto nuevo.
+Inventario.importar_productos guarda todo de una vez y suma el stock sobre
+los datos al día, no sobre los que se vieron al armar el plan.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from inventario import crear_nuevo_producto
+
+COLUMNAS_REQUERIDAS = ['Producto', 'Talla', 'Color', 'Categoria',
+                       'Stock_Bodega', 'Stock_Exhibido', 'Precio_Sugerido']
+COLUMNAS_OPCIONALES = ['Precio_Venta']
+COLUMNAS_TEXTO = ['Producto', 'Talla', 'Color', 'Categoria']
+COLUMNAS_STOCK = ['Stock_Bodega', 'Stock_Exhibido']
+
+# Variante = Producto + Talla + Color
+CLAVE_VARIANTE = ['Producto', 'Talla', 'Color']
+
+
+class ErrorImportacion(Exception):
+    """El archivo no se puede leer o le faltan columnas"""
+
+
+def leer_archivo(archivo, nombre):
+    """DataFrame con el contenido de un CSV o XLSX (todo como texto)"""
+    extension = os.path.splitext(nombre)[1].lower()
+    contenido = archivo.read() if hasattr(archivo, 'read') else archivo
+    try:
+        if extension == '.csv':
+            df = pd.read_csv(io.BytesIO(contenido), dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        elif extension in ('.xlsx', '.xlsm'):
+            df = pd.read_excel(io.BytesIO(contenido), dtype=str, keep_default_na=False)
+        else:
+            raise ErrorImportacion(f"Formato no soportado: {extension or nombre} (usa .csv o .xlsx)")
+    except ImportError:
+        raise ErrorImportacion("Para leer Excel hace falta el paquete 'openpyxl' (pip install openpyxl)")
+    except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as e:
+        raise ErrorImportacion(f"No se pudo leer el archivo: {e}")
+
+    df.columns = [str(col).strip() for col in df.columns]
+    faltantes = [col for col in COLUMNAS_REQUERIDAS if col not in df.columns]
+    if faltantes:
+        raise ErrorImportacion(f"Faltan columnas: {', '.join(faltantes)}")
+    return df
+
+
+def plantilla_csv():
+    """CSV de ejemplo con las columnas esperadas"""
+    ejemplo = pd.DataFrame([{
+        'Producto': 'Camisa Oxford', 'Talla': 'M', 'Color': 'Azul', 'Categoria': 'Camisas',
+        'Stock_Bodega': 10, 'Stock_Exhibido': 2, 'Precio_Sugerido': 450.0, 'Precio_Venta': 399.0
+    }])
+    return ejemplo.to_csv(index=False).encode('utf-8-sig')
+
+
+def validar(df, categorias):
+    """Validar todas las filas a la vez
+
+    Devuelve (validas, errores): 'validas' con columnas ya convertidas a su
+    tipo y 'fila' (número de fila en el archivo), y 'errores' con una fila
+    por renglón con problemas: fila, Producto y la lista de errores.
+    """
+    datos = pd.DataFrame({'fila': np.arange(len(df)) + 2})  # +1 encabezado, +1 desde 1
+    for col in COLUMNAS_TEXTO:
+        datos[col] = df[col].astype(str).str.strip()
+
+    numeros = {}
+    for col in COLUMNAS_STOCK + ['Precio_Sugerido'] + COLUMNAS_OPCIONALES:
+        texto = df[col].astype(str).str.strip() if col in df.columns else pd.Series('', index=df.index)
+        numeros[col] = pd.to_numeric(texto.str.replace(r'[$,\s]', '', regex=True), errors='coerce')
+        numeros[col][texto == ''] = np.nan
+
+    reglas = []
+    for col in COLUMNAS_TEXTO:
+        reglas.append((datos[col] == '', f"falta {col}"))
+    reglas.append(((datos['Categoria'] != '') & ~datos['Categoria'].isin(list(categorias)),
+                   "categoría desconocida"))
+    for col in COLUMNAS_STOCK:
+        valor = numeros[col].fillna(0)
+        reglas.append((numeros[col].notna() & ((valor < 0) | (valor != valor.round())),
+                       f"{col} debe ser un entero >= 0"))
+        reglas.append((numeros[col].isna() & (df[col].astype(str).str.strip() != ''),
+                       f"{col} no es un número"))
+    stock_total = numeros['Stock_Bodega'].fillna(0) + numeros['Stock_Exhibido'].fillna(0)
+    reglas.append((stock_total <= 0, "el stock total debe ser mayor a 0"))
+    reglas.append((numeros['Precio_Sugerido'].isna(), "Precio_Sugerido falta o no es un número"))
+    reglas.append((numeros['Precio_Sugerido'] < 0, "Precio_Sugerido negativo"))
+    reglas.append((numeros['Precio_Venta'] < 0, "Precio_Venta negativo"))
+
+    # Mensajes por fila, unidos con '; '
+    mensajes = pd.Series('', index=df.index)
+    for mascara, mensaje in reglas:
+        mascara = mascara.fillna(False).to_numpy(dtype=bool)
+        mensajes[mascara] = mensajes[mascara] + np.where(mensajes[mascara] == '', '', '; ') + mensaje
+    con_error = mensajes != ''
+
+    errores = pd.DataFrame({
+        'fila': datos.loc[con_error, 'fila'],
+        'Producto': datos.loc[con_error, 'Producto'],
+        'errores': mensajes[con_error]
+    }).reset_index(drop=True)
+
+    validas = datos[~con_error].copy()
+    for col in COLUMNAS_STOCK:
+        validas[col] = numeros[col][~con_error].fillna(0).astype(int)
+    validas['Precio_Sugerido'] = numeros['Precio_Sugerido'][~con_error].astype(float)
+    # Sin precio de venta se usa el sugerido, como en el formulario
+    venta = numeros['Precio_Venta'][~con_error]
+    validas['Precio_Venta'] = venta.where(venta > 0, validas['Precio_Sugerido']).astype(float)
+    return validas.reset_index(drop=True), errores
+
+
+def _clave(df):
+    """Clave de variante normalizada (minúsculas, espacios simples)"""
+    partes = [df[col].astype(str).str.strip().str.casefold().str.replace(r'\s+', ' ', regex=True)
+              for col in CLAVE_VARIANTE]
+    return partes[0] + '|' + partes[1] + '|' + partes[2]
+
+
+def planificar(validas, inventario):
+    """Entradas a variantes existentes y productos nuevos
+
+    Las filas repetidas del archivo se juntan primero (stock sumado, último
+    precio). Devuelve (entradas, nuevos): cada entrada es {'ID',
+    'Stock_Bodega', 'Stock_Exhibido', 'Precio_Sugerido', 'Precio_Venta'} con
+    las unidades que entran (no el stock resultante); 'nuevos' son productos
+    completos.
+    """
+    if validas.empty:
+        return [], []
+
+    filas = validas.assign(clave=_clave(validas))
+    agrupadas = filas.groupby('clave', sort=False).agg(
+        Producto=('Producto', 'first'), Talla=('Talla', 'first'), Color=('Color', 'first'),
+        Categoria=('Categoria', 'last'), Stock_Bodega=('Stock_Bodega', 'sum'),
+        Stock_Exhibido=('Stock_Exhibido', 'sum'), Precio_Sugerido=('Precio_Sugerido', 'last'),
+        Precio_Venta=('Precio_Venta', 'last')
+    ).reset_index()
+
+    tabla = inventario.tabla()
+    existentes = pd.DataFrame({'clave': _clave(tabla), 'ID': tabla['ID']}).drop_duplicates('clave', keep='last')
+    unidas = agrupadas.merge(existentes, on='clave', how='left')
+
+    entradas = []
+    nuevos = []
+    for fila in unidas.itertuples(index=False):
+        if isinstance(fila.ID, str):
+            entradas.append({
+                'ID': fila.ID,
+                'Stock_Bodega': int(fila.Stock_Bodega),
+                'Stock_Exhibido': int(fila.Stock_Exhibido),
+                'Precio_Sugerido': float(fila.Precio_Sugerido),
+                'Precio_Venta': float(fila.Precio_Venta)
+            })
+        else:
+            nuevos.append(crear_nuevo_producto(
+                producto=fila.Producto,
+                talla=fila.Talla,
+                color=fila.Color,
+                categoria=fila.Categoria,
+                stock_bodega=int(fila.Stock_Bodega),
+                stock_exhibido=int(fila.Stock_Exhibido),
+                precio_sugerido=fila.Precio_Sugerido,
+                precio_venta=fila.Precio_Venta
+            ))
+    return entradas, nuevos
@@ -0,0 +1,674 @@
+"""Lógica de negocio del inventario, independiente de la interfaz
+
+Inventario guarda en memoria productos, ventas y caja, mantiene un índice
+ID -> producto para que toda operación sobre un producto sea O(1) y persiste
+cada cambio en el almacén configurado (ver almacenamiento.py).
+
+Cada operación arma primero el registro actualizado, lo guarda y solo
+entonces lo aplica en memoria: si el almacén falla, la memoria no cambia.
+
+Varias sesiones (o procesos) pueden escribir en el mismo almacén. Cada
+operación se ejecuta con el bloqueo del almacén tomado y, antes de decidir
+nada, compara la versión del almacén con la que refleja la memoria: si otro
+escribió desde entonces, recarga y la operación se calcula sobre los datos
+al día (nunca pisa una venta ajena con un stock viejo). Si con los datos al
+día ya no es válida (sin stock, producto borrado), se rechaza.
+
+Para la interfaz, Inventario.tabla() da los productos como un DataFrame
+tipado (textos repetidos como categorías, stock como enteros) que se arma
+una vez y se actualiza fila por fila con cada operación.
+"""
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+
+from agregados import Agregados
+from busqueda import IndiceBusqueda, CAMPOS_BUSQUEDA
+from escritor import EscritorDiferido
+from historial import HistorialVentas, MES_SIN_FECHA, mes_de
+from identificadores import nuevo_id_producto
+from reportes import ReportesVentas, resumen_diario
+
+
+def crear_nuevo_producto(producto, talla, color, categoria, stock_bodega, stock_exhibido, precio_sugerido, precio_venta):
+    """Crear un nuevo producto especificando stock por ubicación"""
+    # Único aunque se creen muchos en el mismo segundo (ver identificadores.py)
+    nuevo_id = nuevo_id_producto()
+
+    # Calcular totales
+    entrada_total = stock_bodega + stock_exhibido
+    stock_total = entrada_total
+
+    # Determinar ubicación principal (donde haya más stock)
+    if stock_bodega > stock_exhibido:
+        ubicacion_principal = "Bodega"
+    elif stock_exhibido > stock_bodega:
+        ubicacion_principal = "Exhibido"
+    else:
+        # Si son iguales, poner en Exhibido por defecto
+        ubicacion_principal = "Exhibido"
+
+    return {
+        'ID': nuevo_id,
+        'Categoria': categoria,
+        'Producto': producto,
+        'Talla': talla,
+        'Color': color,
+        'Ubicacion': ubicacion_principal,
+        'Entrada_Total': entrada_total,
+        'Stock_Bodega': stock_bodega,
+        'Stock_Exhibido': stock_exhibido,
+        'Stock_Total': stock_total,
+        'Ventas_Total': 0,
+        'Precio_Sugerido': float(precio_sugerido),
+        'Precio_Venta': float(precio_venta) if precio_venta > 0 else float(precio_sugerido)
+    }
+
+
+# Columnas de la tabla de productos y su tipo
+TIPOS_TABLA = {
+    'ID': str,
+    'Categoria': 'category',
+    'Producto': str,
+    'Talla': 'category',
+    'Color': 'category',
+    'Ubicacion': 'category',
+    'Entrada_Total': 'int32',
+    'Stock_Bodega': 'int32',
+    'Stock_Exhibido': 'int32',
+    'Stock_Total': 'int32',
+    'Ventas_Total': 'int32',
+    'Precio_Sugerido': 'float64',
+    'Precio_Venta': 'float64',
+}
+
+
+def tabla_productos(productos):
+    """DataFrame tipado de los productos, columna por columna"""
+    columnas = {}
+    for col, tipo in TIPOS_TABLA.items():
+        if tipo in ('int32', 'float64'):
+            valores = [p.get(col) or 0 for p in productos]
+        else:
+            valores = [p.get(col, '') for p in productos]
+        columnas[col] = pd.Series(valores, dtype=tipo)
+    return pd.DataFrame(columnas)
+
+
+def ubicacion_principal(stock_bodega, stock_exhibido, actual="Exhibido"):
+    """Ubicación con más stock; si empatan se conserva la actual"""
+    if stock_bodega > stock_exhibido:
+        return "Bodega"
+    if stock_exhibido > stock_bodega:
+        return "Exhibido"
+    return actual
+
+
+def sumar_entrada(item, entrada):
+    """Producto 'item' con las unidades y precios de una entrada de importación (ver importacion.planificar)"""
+    stock_bodega = item['Stock_Bodega'] + entrada['Stock_Bodega']
+    stock_exhibido = item['Stock_Exhibido'] + entrada['Stock_Exhibido']
+    unidades = entrada['Stock_Bodega'] + entrada['Stock_Exhibido']
+    return dict(item, **{
+        'Stock_Bodega': stock_bodega,
+        'Stock_Exhibido': stock_exhibido,
+        'Entrada_Total': item['Entrada_Total'] + unidades,
+        'Stock_Total': item['Stock_Total'] + unidades,
+        'Ubicacion': ubicacion_principal(stock_bodega, stock_exhibido, item['Ubicacion']),
+        'Precio_Sugerido': entrada['Precio_Sugerido'],
+        'Precio_Venta': entrada['Precio_Venta']
+    })
+
+
+def _operacion(metodo):
+    """Ejecutar una operación con el almacén bloqueado y sobre los datos al día"""
+    @wraps(metodo)
+    def envuelto(self, *args, **kwargs):
+        with self._lock, self._bloqueo():
+            self.sincronizar()
+            return metodo(self, *args, **kwargs)
+    return envuelto
+
+
+class Inventario:
+    """Productos, ventas y caja en memoria, con índice por ID"""
+
+    def __init__(self, almacen, data=None, escritura_diferida=False):
+        self.almacen = almacen
+        # Hilos de la misma sesión o de sesiones que comparten este objeto
+        self._lock = threading.RLock()
+        # Versión del almacén que refleja la memoria (ver sincronizar)
+        self.version = None
+        # Contador de cambios en memoria: la interfaz lo compara para saber si redibujar
+        self.cambios = 0
+        if data is None:
+            with self._bloqueo():
+                data = almacen.cargar()
+                self.version = almacen.version()
+        self._cargar(data)
+        # Checkpoints en un hilo aparte en lugar de dentro de la operación (ver escritor.py)
+        self.escritor = None
+        if escritura_diferida and almacen is not None:
+            self.escritor = EscritorDiferido(self._checkpoint_diferido)
+
+    def _cargar(self, data):
+        """Reemplazar el estado en memoria por 'data' (ver almacen.cargar)"""
+        self.cambios += 1
+        self.productos = data['inventario']
+        # Ventas por mes en columnas (ver historial.py)
+        self.ventas_diarias = data['ventas_diarias']
+        if isinstance(self.ventas_diarias, list):
+            self.ventas_diarias = HistorialVentas.desde_lista(self.ventas_diarias)
+        self.caja = data['caja']
+        # Totales por categoría, ubicación y día (ver agregados.py)
+        self.agregados = data.get('agregados')
+        if self.agregados is None:
+            self.agregados = Agregados.desde_cero(self.productos, self.ventas_diarias,
+                                                  self.ventas_diarias.resumenes_archivados())
+        # Ventas por día/semana/mes (ver reportes.py)
+        self.reportes = ReportesVentas(self.ventas_diarias)
+        self._por_id = {}
+        self._busqueda = None
+        self._tabla = None
+        self._filas_tabla = {}
+        self.reindexar()
+
+    # ------------------------------------------------------------
+    # Concurrencia
+    # ------------------------------------------------------------
+    def _bloqueo(self):
+        return self.almacen.bloqueo if self.almacen is not None else nullcontext()
+
+    def sincronizar(self):
+        """Recargar si el almacén cambió desde la última lectura o escritura propia
+
+        Devuelve True si recargó.
+        """
+        # Sin bloquear en el caso común: nadie escribió
+        if self.almacen is None or self.almacen.version() == self.version:
+            return False
+        with self._lock, self._bloqueo():
+            if self.almacen.version() == self.version:
+                return False
+            self._cargar(self.almacen.cargar())
+            self.version = self.almacen.version()
+            return True
+
+    # ------------------------------------------------------------
+    # Índice por ID
+    # ------------------------------------------------------------
+    def reindexar(self):
+        """Reconstruir el índice ID -> producto desde la lista"""
+        self._por_id = {item['ID']: item for item in self.productos}
+        # El índice de búsqueda y la tabla se reconstruyen al pedirlos
+        self._busqueda = None
+        self._tabla = None
+
+    def obtener(self, producto_id):
+        """Producto con ese ID (o None) en tiempo constante"""
+        return self._por_id.get(producto_id)
+
+    def buscar(self, texto):
+        """IDs de productos que coinciden con el texto (ver busqueda.py)"""
+        with self._lock:
+            if self._busqueda is None:
+                self._busqueda = IndiceBusqueda(self.productos)
+            return self._busqueda.buscar(texto)
+
+    # ------------------------------------------------------------
+    # Tabla para la interfaz
+    # ------------------------------------------------------------
+    def tabla(self):
+        """Productos como DataFrame tipado; no modificarlo, filtrarlo o copiar lo necesario"""
+        with self._lock:
+            if self._tabla is None:
+                self._tabla = tabla_productos(self.productos)
+                self._filas_tabla = {item['ID']: i for i, item in enumerate(self.productos)}
+            return self._tabla
+
+    def _actualizar_tabla(self, item, cambios):
+        """Llevar a la tabla los cambios de un producto (solo esa fila)"""
+        if self._tabla is None:
+            return
+        fila = self._filas_tabla.get(item['ID'])
+        if fila is None or any(col not in TIPOS_TABLA for col in cambios):
+            self._tabla = None
+            return
+        for col, valor in cambios.items():
+            serie = self._tabla[col]
+            if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+                self._tabla[col] = serie.cat.add_categories([valor])
+            self._tabla.iat[fila, self._tabla.columns.get_loc(col)] = valor
+
+    # ------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------
+    def guardar(self):
+        """Guardar el estado completo (en JSON hace checkpoint y vacía el diario)"""
+        self.almacen.guardar(self.productos, self.ventas_diarias, self.caja, self.agregados)
+        self.version = self.almacen.version()
+        self.cambios += 1
+
+    @contextmanager
+    def _cambio_agregados_lote(self, cambios, ventas=()):
+        """Aplicar cambios (antes, despues) y ventas a los agregados; si el guardado falla, deshacerlos"""
+        for antes, despues in cambios:
+            self.agregados.cambiar_producto(antes, despues)
+        for venta in ventas:
+            self.agregados.sumar_venta(venta)
+        try:
+            yield
+        except Exception:
+            for venta in ventas:
+                self.agregados.sumar_venta(venta, -1)
+            for antes, despues in reversed(cambios):
+                self.agregados.cambiar_producto(despues, antes)
+            raise
+
+    def _cambio_agregados(self, antes, despues, venta=None):
+        """Igual que _cambio_agregados_lote para un solo producto"""
+        return self._cambio_agregados_lote([(antes, despues)], [venta] if venta is not None else [])
+
+    def _despues_de_escribir(self):
+        """Tras escribir, la memoria coincide con el disco; checkpoint si toca"""
+        if self.almacen.necesita_checkpoint() and self.escritor is None:
+            self.guardar()
+            return
+        self.version = self.almacen.version()
+        self.cambios += 1
+        if self.almacen.necesita_checkpoint():
+            # Lo hace el hilo escritor; la operación no espera
+            self.escritor.pedir()
+
+    def _checkpoint_diferido(self):
+        """Checkpoint desde el hilo escritor: solo la copia bloquea las operaciones"""
+        with self._lock, self._bloqueo():
+            self.sincronizar()
+            if not self.almacen.necesita_checkpoint():
+                return
+            pendiente = self.almacen.preparar_checkpoint(self.productos, self.ventas_diarias,
+                                                         self.caja, self.agregados)
+        self.almacen.escribir_checkpoint(pendiente)
+        with self._lock, self._bloqueo():
+            al_dia = self.almacen.version() == self.version
+            if self.almacen.completar_checkpoint(pendiente) and al_dia:
+                self.version = self.almacen.version()
+
+    def cerrar(self):
+        """Escribir lo pendiente del hilo escritor (al apagar el servidor)"""
+        if self.escritor is not None:
+            self.escritor.cerrar()
+
+    def _aplicar_cambios(self, item, cambios):
+        """Guardar el producto con los cambios y después aplicarlos en memoria"""
+        actualizado = dict(item)
+        actualizado.update(cambios)
+        with self._cambio_agregados(item, actualizado):
+            self.almacen.guardar_producto(actualizado, self.agregados)
+        item.update(cambios)
+        self._actualizar_tabla(item, cambios)
+        self._despues_de_escribir()
+
+    # ------------------------------------------------------------
+    # Operaciones
+    # ------------------------------------------------------------
+    @staticmethod
+    def _stock_de_venta(item):
+        """(campo de stock, ubicación de la venta): se vende desde la ubicación principal"""
+        if item['Ubicacion'] == 'Exhibido':
+            return 'Stock_Exhibido', "exhibido"
+        return 'Stock_Bodega', "bodega"
+
+    @staticmethod
+    def _registro_venta(item, precio_final, ubicacion_venta, fecha):
+        """Registro de una unidad vendida con precio real"""
+        return {
+            'fecha': fecha,
+            'producto_id': item['ID'],
+            'producto': item['Producto'],
+            'talla': item['Talla'],
+            'precio_sugerido': item['Precio_Sugerido'],
+            'precio_venta': precio_final,
+            'categoria': item['Categoria'],
+            'ubicacion': item['Ubicacion'],
+            'ubicacion_venta': ubicacion_venta
+        }
+
+    @_operacion
+    def registrar_venta(self, producto_id, precio_venta_real=None):
+        """Registrar una venta con precio de venta real"""
+        item = self.obtener(producto_id)
+        if item is None:
+            return False, "Producto no encontrado", None
+
+        # Verificar stock disponible según ubicación
+        campo_stock, ubicacion_venta = self._stock_de_venta(item)
+
+        if item[campo_stock] <= 0:
+            return False, f"No hay stock disponible en {item['Ubicacion']}", None
+
+        # Usar precio de venta real si se proporciona, sino el Precio_Venta guardado
+        precio_final = float(precio_venta_real) if precio_venta_real else item['Precio_Venta']
+
+        actualizado = dict(item)
+        actualizado[campo_stock] -= 1
+        actualizado['Ventas_Total'] += 1
+        actualizado['Stock_Total'] -= 1
+
+        # Registrar venta diaria con precio real
+        venta = self._registro_venta(item, precio_final, ubicacion_venta, datetime.now().isoformat())
+
+        # Actualizar caja con precio REAL
+        caja = self.caja + precio_final
+
+        with self._cambio_agregados(item, actualizado, venta):
+            self.almacen.guardar_venta(actualizado, venta, caja, self.agregados)
+        item.update(actualizado)
+        self._actualizar_tabla(item, {campo: actualizado[campo]
+                                      for campo in (campo_stock, 'Ventas_Total', 'Stock_Total')})
+        self.ventas_diarias.append(venta)
+        self.caja = caja
+        self._despues_de_escribir()
+        return True, precio_final, ubicacion_venta
+
+    @_operacion
+    def registrar_ventas(self, lineas):
+        """Vender varias unidades de varios productos en una sola operación (carrito)
+
+        'lineas' es una lista de {'producto_id', 'cantidad', 'precio'}; 'precio'
+        (por unidad) es opcional, como en registrar_venta. Se revisa el stock
+        de todas las líneas antes de vender: si alguna falla no se vende nada.
+        Todo se guarda de una vez. Devuelve (éxito, total o mensaje, unidades).
+        """
+        errores = []
+        pedidas = {}
+        for linea in lineas:
+            item = self.obtener(linea['producto_id'])
+            cantidad = int(linea.get('cantidad', 1))
+            if item is None:
+                errores.append(f"{linea['producto_id']}: Producto no encontrado")
+            elif cantidad <= 0:
+                errores.append(f"{item['Producto']}: cantidad inválida ({cantidad})")
+            else:
+                # Un producto puede venir en varias líneas
+                pedidas[item['ID']] = pedidas.get(item['ID'], 0) + cantidad
+
+        for producto_id, cantidad in pedidas.items():
+            item = self.obtener(producto_id)
+            campo_stock, _ = self._stock_de_venta(item)
+            if item[campo_stock] < cantidad:
+                errores.append(f"{item['Producto']} ({item['Talla']}, {item['Color']}): "
+                               f"se piden {cantidad} y hay {item[campo_stock]} en {item['Ubicacion']}")
+
+        if errores:
+            return False, "; ".join(errores), 0
+        if not pedidas:
+            return False, "No hay productos para vender", 0
+
+        fecha = datetime.now().isoformat()
+        actualizados = {}
+        ventas = []
+        total = 0.0
+        for linea in lineas:
+            item = self.obtener(linea['producto_id'])
+            cantidad = int(linea.get('cantidad', 1))
+            campo_stock, ubicacion_venta = self._stock_de_venta(item)
+            precio_final = float(linea['precio']) if linea.get('precio') else item['Precio_Venta']
+
+            actualizado = actualizados.setdefault(item['ID'], dict(item))
+            actualizado[campo_stock] -= cantidad
+            actualizado['Ventas_Total'] += cantidad
+            actualizado['Stock_Total'] -= cantidad
+
+            # Un registro por unidad, como en registrar_venta
+            venta = self._registro_venta(item, precio_final, ubicacion_venta, fecha)
+            ventas.extend((item['ID'], dict(venta)) for _ in range(cantidad))
+            total += precio_final * cantidad
+
+        caja = self.caja + total
+        cambios = [(self.obtener(producto_id), actualizado) for producto_id, actualizado in actualizados.items()]
+
+        with self._cambio_agregados_lote(cambios, [venta for _, venta in ventas]):
+            self.almacen.guardar_ventas(list(actualizados.values()), ventas, caja, self.agregados)
+        for item, actualizado in cambios:
+            item.update(actualizado)
+            self._actualizar_tabla(item, {campo: actualizado[campo] for campo in
+                                          ('Stock_Bodega', 'Stock_Exhibido', 'Ventas_Total', 'Stock_Total')})
+        for _, venta in ventas:
+            self.ventas_diarias.append(venta)
+        self.caja = caja
+        self._despues_de_escribir()
+        return True, total, len(ventas)
+
+    def _asegurar_id_unico(self, producto):
+        """Dar un ID nuevo al producto si el suyo ya está en uso"""
+        if producto['ID'] in self._por_id:
+            producto['ID'] = nuevo_id_producto(self._por_id.__contains__)
+
+    @_operacion
+    def agregar_producto(self, nuevo_producto):
+        """Agregar nuevo producto al inventario"""
+        self._asegurar_id_unico(nuevo_producto)
+        with self._cambio_agregados(None, nuevo_producto):
+            self.almacen.guardar_producto(nuevo_producto, self.agregados)
+        self.productos.append(nuevo_producto)
+        self._por_id[nuevo_producto['ID']] = nuevo_producto
+        if self._busqueda is not None:
+            self._busqueda.agregar(nuevo_producto)
+        self._tabla = None
+        self._despues_de_escribir()
+        return True
+
+    @_operacion
+    def importar_productos(self, entradas, nuevos):
+        """Guardar de una vez entradas a productos existentes y productos nuevos (importación masiva)
+
+        'entradas' trae unidades que se suman y precios nuevos (ver
+        importacion.planificar), no el producto completo: se aplican aquí,
+        sobre los datos al día, para no deshacer ventas o movimientos hechos
+        después de armar el plan.
+        """
+        for producto in nuevos:
+            self._asegurar_id_unico(producto)
+        cambios = []
+        omitidas = 0
+        for entrada in entradas:
+            item = self.obtener(entrada['ID'])
+            if item is None:
+                # Eliminado desde que se armó el plan
+                omitidas += 1
+                continue
+            cambios.append((item, sumar_entrada(item, entrada)))
+        actualizados = len(cambios)
+        cambios += [(None, producto) for producto in nuevos]
+        if not cambios:
+            return False, "No hay productos para importar"
+
+        with self._cambio_agregados_lote(cambios):
+            self.almacen.guardar_productos([producto for _, producto in cambios], self.agregados)
+        for item, producto in cambios:
+            if item is None:
+                self.productos.append(producto)
+                self._por_id[producto['ID']] = producto
+            else:
+                item.update(producto)
+        # Muchas filas cambiadas: índice de búsqueda y tabla se rehacen al pedirlos
+        self._busqueda = None
+        self._tabla = None
+        self._despues_de_escribir()
+        mensaje = f"{len(nuevos)} productos nuevos y {actualizados} actualizados"
+        if omitidas:
+            mensaje += f" ({omitidas} ya no existen)"
+        return True, mensaje
+
+    @_operacion
+    def eliminar_producto(self, producto_id):
+        """Eliminar un producto del inventario"""
+        producto_eliminado = self.obtener(producto_id)
+        if producto_eliminado is None:
+            return False, "Producto no encontrado"
+
+        caja = self.caja
+        # Si tenía ventas, restamos de la caja
+        if producto_eliminado['Ventas_Total'] > 0:
+            # Solo las de este producto (por ID, no por nombre), desde el índice del historial
+            _, total_ventas_producto = self.ventas_diarias.total_de(producto_id)
+            caja = max(caja - total_ventas_producto, 0)
+
+        with self._cambio_agregados(producto_eliminado, None):
+            self.almacen.eliminar_producto(producto_id, caja, self.agregados)
+        del self._por_id[producto_id]
+        if self._busqueda is not None:
+            self._busqueda.quitar(producto_id)
+        self._tabla = None
+        # Quitar de la lista por identidad (los IDs repetidos no se confunden)
+        for i, item in enumerate(self.productos):
+            if item is producto_eliminado:
+                del self.productos[i]
+                break
+        self.caja = caja
+        self._despues_de_escribir()
+        return True, f"Producto '{producto_eliminado['Producto']}' eliminado correctamente"
+
+    @_operacion
+    def mover_stock(self, producto_id, cantidad, origen, destino):
+        """Mover stock entre bodega y exhibido"""
+        item = self.obtener(producto_id)
+        if item is None:
+            return False, "Producto no encontrado"
+
+        # Verificar stock disponible en origen
+        stock_origen = item['Stock_Bodega'] if origen == 'Bodega' else item['Stock_Exhibido']
+
+        if stock_origen < cantidad:
+            return False, f"No hay suficiente stock en {origen} (solo hay {stock_origen})"
+
+        # Actualizar stocks
+        if origen == 'Bodega':
+            stock_bodega = item['Stock_Bodega'] - cantidad
+            stock_exhibido = item['Stock_Exhibido'] + cantidad
+        else:
+            stock_exhibido = item['Stock_Exhibido'] - cantidad
+            stock_bodega = item['Stock_Bodega'] + cantidad
+
+        self._aplicar_cambios(item, {
+            'Stock_Bodega': stock_bodega,
+            'Stock_Exhibido': stock_exhibido,
+            # Actualizar ubicación principal basada en dónde hay más stock
+            'Ubicacion': ubicacion_principal(stock_bodega, stock_exhibido, item['Ubicacion'])
+        })
+        return True, f"{cantidad} unidades movidas de {origen} a {destino}"
+
+    @_operacion
+    def actualizar_precio_venta(self, producto_id, nuevo_precio_venta):
+        """Actualizar el precio de venta de un producto"""
+        item = self.obtener(producto_id)
+        if item is None:
+            return False, "Producto no encontrado"
+        self._aplicar_cambios(item, {'Precio_Venta': float(nuevo_precio_venta)})
+        return True, "Precio de venta actualizado"
+
+    @_operacion
+    def actualizar_precio_sugerido(self, producto_id, nuevo_precio_sugerido):
+        """Actualizar el precio sugerido de un producto"""
+        item = self.obtener(producto_id)
+        if item is None:
+            return False, "Producto no encontrado"
+        self._aplicar_cambios(item, {'Precio_Sugerido': float(nuevo_precio_sugerido)})
+        return True, "Precio sugerido actualizado"
+
+    @_operacion
+    def actualizar_producto(self, producto_id, cambios, esperado=None):
+        """Actualizar campos de un producto (edición desde gestión)
+
+        'esperado' (opcional) son los valores que tenía el producto cuando se
+        abrió el formulario: si alguno cambió mientras tanto (otra caja
+        vendió o movió stock) la edición se rechaza en lugar de pisarlo.
+        """
+        item = self.obtener(producto_id)
+        if item is None:
+            return False, "Producto no encontrado"
+        if esperado and any(item.get(campo) != valor for campo, valor in esperado.items()):
+            return False, ("El producto cambió mientras lo editabas (otra venta o movimiento de stock); "
+                           "revisa los valores actuales y vuelve a guardar")
+        cambios = {campo: valor for campo, valor in cambios.items() if campo != 'ID'}
+        self._aplicar_cambios(item, cambios)
+        if self._busqueda is not None and any(campo in cambios for campo in CAMPOS_BUSQUEDA):
+            self._busqueda.actualizar(item)
+        return True, "Producto actualizado correctamente"
+
+    def periodos_por_cerrar(self, hasta=None):
+        """Meses con ventas anteriores al de 'hasta' (hoy por omisión); el mes en curso nunca se cierra"""
+        corte = mes_de(datetime.now())
+        if hasta is not None:
+            corte = min(corte, mes_de(hasta))
+        return [mes for mes in self.ventas_diarias.meses() if mes != MES_SIN_FECHA and mes < corte]
+
+    @_operacion
+    def cerrar_periodo(self, hasta=None):
+        """Archivar las ventas de los meses anteriores al de 'hasta' (ver periodos_por_cerrar)
+
+        Cada mes pasa al archivo del almacén con su resumen diario y deja el
+        historial activo; los totales y la caja no cambian y los reportes
+        siguen mostrándolo desde el resumen.
+        """
+        meses = self.periodos_por_cerrar(hasta)
+        if self.ventas_diarias.archivo is None:
+            return False, "Este almacén no tiene archivo de ventas"
+        if not meses:
+            return False, "No hay ventas de meses anteriores por cerrar"
+
+        ventas = 0
+        try:
+            for mes in meses:
+                particion = next(self.ventas_diarias.particiones(mes, mes))
+                ventas += len(particion)
+                self.ventas_diarias.archivar(mes, resumen_diario(particion.a_dataframe()))
+            # Checkpoint: borra los meses del historial activo y vacía el diario
+            self.guardar()
+        except Exception:
+            # Lo ya archivado vale al recargar (ver HistorialVentas)
+            self._cargar(self.almacen.cargar())
+            self.version = self.almacen.version()
+            raise
+        self.reportes = ReportesVentas(self.ventas_diarias)
+        return True, f"{len(meses)} meses cerrados ({ventas} ventas archivadas)"
+
+    def _apartar_archivo(self):
+        """Tras un reset, los meses cerrados tampoco cuentan: su archivo se aparta (no se borra)"""
+        if self.ventas_diarias.archivo is not None:
+            self.ventas_diarias.archivo.apartar()
+
+    @_operacion
+    def resetear_ventas(self):
+        """Vaciar el registro de ventas (reset de gráficas)"""
+        self.ventas_diarias.vaciar()
+        self.agregados = Agregados.desde_cero(self.productos, self.ventas_diarias)
+        self.guardar()
+        self._apartar_archivo()
+
+    @_operacion
+    def reiniciar_caja(self):
+        """Caja en cero, sin ventas, y stock total de vuelta a la entrada"""
+        self.caja = 0.0
+        self.ventas_diarias.vaciar()
+        for item in self.productos:
+            item['Ventas_Total'] = 0
+            item['Stock_Total'] = item['Entrada_Total']
+            # Mantener la distribución original de stock
+        self._tabla = None
+        self.agregados = Agregados.desde_cero(self.productos, self.ventas_diarias)
+        self.guardar()
+        self._apartar_archivo()
+
+    def ventas_producto(self, producto_id, desde=None, hasta=None):
+        """Ventas (dicts) de un producto en el periodo abierto, por el índice del historial"""
+        with self._lock:
+            return list(self.ventas_diarias.ventas_de(producto_id, desde, hasta))
+
+    def calcular_caja_total(self):
+        """Total de caja de las ventas registradas (con precios reales), ya acumulado"""
+        return self.agregados.totales['ingresos']
@@ -0,0 +1,147 @@
+"""Tiempos por etapa de cada rerun, para saber dónde se va el tiempo de la app
+
+Un Perfilador (uno por sesión) junta lo que tarda cada etapa medida con
+medir() o iterar() durante un rerun; si una etapa se mide varias veces en
+el mismo rerun (p. ej. dos gráficas) se suma. Al terminar el rerun cada
+etapa deja una muestra en su historia, que guarda las últimas HISTORIA
+muestras, y estadisticas() da p50/p95 por etapa.
+
+Un fragmento que se vuelve a ejecutar solo (st.fragment) cuenta como su
+propio rerun, con su etapa total aparte (p. ej. RERUN_FILA); cuando corre
+dentro del rerun de la app completa, se anida y sus tiempos van a ese rerun.
+
+Apagado (activo=False), medir() devuelve siempre el mismo contexto vacío e
+iterar() el iterable tal cual: no se toma el tiempo ni se guarda nada.
+"""
+import json
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+# Reruns que se recuerdan por etapa
+HISTORIA = 200
+
+# Etapa con el tiempo total de cada rerun
+RERUN = "rerun"
+
+# Etapa con el tiempo total de cada rerun de una fila de "Registrar Ventas"
+RERUN_FILA = "rerun fila"
+
+_APAGADO = nullcontext()
+
+
+def percentil(ordenados, p):
+    """Valor del percentil p (0 a 100) de una lista ya ordenada"""
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class _Cronometro:
+    """Contexto que suma su duración a una etapa del rerun actual"""
+
+    __slots__ = ('_perfilador', '_etapa', '_inicio')
+
+    def __init__(self, perfilador, etapa):
+        self._perfilador = perfilador
+        self._etapa = etapa
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._perfilador.sumar(self._etapa, time.perf_counter() - self._inicio)
+        return False
+
+
+class Perfilador:
+    """Historia de tiempos por etapa de los últimos reruns de una sesión"""
+
+    def __init__(self, activo=False, historia=HISTORIA):
+        self.activo = activo
+        self.historia = historia
+        self._muestras = {}  # etapa -> deque de segundos (una por rerun)
+        self._actual = {}  # etapa -> segundos en el rerun en curso
+        self._inicio_rerun = None
+        self._etapa_rerun = RERUN
+        self._anidados = 0  # empezar_rerun() sin su terminar_rerun()
+
+    def medir(self, etapa):
+        """Contexto que mide un bloque: with perfilador.medir('Tabla'): ..."""
+        if not self.activo:
+            return _APAGADO
+        return _Cronometro(self, etapa)
+
+    def iterar(self, etapa, iterable):
+        """Recorrer 'iterable' midiendo desde el primer elemento hasta el último, cuerpo del for incluido
+
+        Sirve para medir un ciclo largo sin meterlo en un with. Si el ciclo
+        se corta (break, st.rerun), cuenta hasta ahí.
+        """
+        if not self.activo:
+            return iterable
+        return self._iterar(etapa, iterable)
+
+    def _iterar(self, etapa, iterable):
+        inicio = time.perf_counter()
+        try:
+            yield from iterable
+        finally:
+            self.sumar(etapa, time.perf_counter() - inicio)
+
+    def sumar(self, etapa, segundos):
+        """Sumar tiempo a una etapa del rerun en curso"""
+        self._actual[etapa] = self._actual.get(etapa, 0.0) + segundos
+
+    def empezar_rerun(self, etapa=RERUN):
+        """Empezar un rerun con su tiempo total en 'etapa'; dentro de otro rerun solo se anida"""
+        self._anidados += 1
+        if self._anidados > 1:
+            return
+        self._actual = {}
+        self._etapa_rerun = etapa
+        self._inicio_rerun = time.perf_counter() if self.activo else None
+
+    def terminar_rerun(self):
+        """Pasar los tiempos del rerun a la historia de cada etapa"""
+        self._anidados = max(self._anidados - 1, 0)
+        if self._anidados:
+            return
+        if self._inicio_rerun is not None:
+            self._actual[self._etapa_rerun] = time.perf_counter() - self._inicio_rerun
+            self._inicio_rerun = None
+        for etapa, segundos in self._actual.items():
+            muestras = self._muestras.get(etapa)
+            if muestras is None:
+                muestras = self._muestras[etapa] = deque(maxlen=self.historia)
+            muestras.append(segundos)
+        self._actual = {}
+
+    def vaciar(self):
+        self._muestras = {}
+        self._actual = {}
+
+    def estadisticas(self):
+        """Lista de {'etapa', 'muestras', 'p50_ms', 'p95_ms', 'max_ms', 'ultimo_ms'}, de la más lenta a la más rápida"""
+        filas = []
+        for etapa, muestras in self._muestras.items():
+            ordenados = sorted(muestras)
+            filas.append({
+                'etapa': etapa,
+                'muestras': len(ordenados),
+                'p50_ms': round(percentil(ordenados, 50) * 1e3, 2),
+                'p95_ms': round(percentil(ordenados, 95) * 1e3, 2),
+                'max_ms': round(ordenados[-1] * 1e3, 2),
+                'ultimo_ms': round(muestras[-1] * 1e3, 2),
+            })
+        filas.sort(key=lambda fila: fila['p95_ms'], reverse=True)
+        return filas
+
+    def a_json(self):
+        """Estadísticas y muestras en crudo (segundos, de la más vieja a la más nueva) como texto JSON"""
+        return json.dumps({
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'historia': self.historia,
+            'estadisticas': self.estadisticas(),
+            'muestras': {etapa: list(muestras) for etapa, muestras in self._muestras.items()},
+        }, indent=2, ensure_ascii=False)
@@ -0,0 +1,142 @@
+"""Reportes de ventas en el tiempo
+
+Agrupa las ventas por día, semana o mes y por categoría o ubicación, con
+unidades, ingresos y descuento frente al precio sugerido, todo con
+operaciones vectorizadas de pandas.
+
+Los cálculos se hacen en dos pasos:
+
+1. Cada mes del historial se resume a una fila por día, categoría y
+   ubicación. Ese resumen se guarda y solo se rehace si el mes cambió
+   (normalmente solo el actual). Los meses cerrados y archivados ya
+   traen su resumen (ver historial.ArchivoVentas): no se leen sus ventas.
+2. El reporte pedido se arma sobre esos resúmenes diarios, que son mucho
+   más chicos que las ventas. Los últimos reportes se guardan por versión
+   de los datos y parámetros, así que volver a un rango ya visto no
+   recalcula nada.
+"""
+import pandas as pd
+
+from cache_lru import CacheLRU
+
+# Frecuencias de agrupación -> Grouper de pandas; cada periodo se etiqueta
+# con su primer día (las semanas van de lunes a domingo)
+FRECUENCIAS = {
+    'dia': {'freq': 'D'},
+    'semana': {'freq': 'W-MON', 'label': 'left', 'closed': 'left'},
+    'mes': {'freq': 'MS'},
+}
+
+# Agrupaciones disponibles -> columna del resumen diario
+AGRUPACIONES = {'categoria': 'categoria', 'ubicacion': 'ubicacion'}
+
+COLUMNAS_REPORTE = ['periodo', 'grupo', 'unidades', 'ingresos', 'sugerido', 'descuento', 'descuento_pct']
+
+# Reportes completos que se conservan (los más recientes)
+MAX_REPORTES_EN_CACHE = 32
+
+
+def resumen_diario(ventas):
+    """Una fila por día, categoría y ubicación con unidades, ingresos y total sugerido
+
+    'ventas' es un DataFrame como HistorialVentas.a_dataframe().
+    """
+    if ventas.empty:
+        return pd.DataFrame({
+            'dia': pd.Series(dtype='datetime64[us]'), 'categoria': pd.Series(dtype=object),
+            'ubicacion': pd.Series(dtype=object), 'unidades': pd.Series(dtype='int64'),
+            'ingresos': pd.Series(dtype='float64'), 'sugerido': pd.Series(dtype='float64')
+        })
+    # Ubicación desde donde se vendió ('exhibido'/'bodega' -> 'Exhibido'/'Bodega')
+    ubicacion = ventas['ubicacion_venta'].astype(object).fillna(ventas['ubicacion'].astype(object))
+    base = pd.DataFrame({
+        'dia': ventas['fecha'].dt.floor('D'),
+        'categoria': ventas['categoria'].astype(object).fillna(''),
+        'ubicacion': ubicacion.fillna('').str.capitalize(),
+        'precio_venta': ventas['precio_venta'],
+        'precio_sugerido': ventas['precio_sugerido'],
+    })
+    return (
+        base.groupby(['dia', 'categoria', 'ubicacion'], sort=False)
+        .agg(unidades=('precio_venta', 'size'),
+             ingresos=('precio_venta', 'sum'),
+             sugerido=('precio_sugerido', 'sum'))
+        .reset_index()
+    )
+
+
+def agrupar(diario, frecuencia='dia', por='categoria', desde=None, hasta=None):
+    """Reporte por periodo y grupo a partir de resúmenes diarios
+
+    Devuelve columnas: periodo (inicio del día/semana/mes), grupo, unidades,
+    ingresos, sugerido, descuento (sugerido - ingresos) y descuento_pct.
+    """
+    if frecuencia not in FRECUENCIAS:
+        raise ValueError(f"Frecuencia desconocida: {frecuencia}")
+    if por not in AGRUPACIONES:
+        raise ValueError(f"Agrupación desconocida: {por}")
+
+    if desde is not None:
+        diario = diario[diario['dia'] >= pd.Timestamp(desde)]
+    if hasta is not None:
+        diario = diario[diario['dia'] <= pd.Timestamp(hasta)]
+    if diario.empty:
+        return pd.DataFrame(columns=COLUMNAS_REPORTE)
+
+    reporte = (
+        diario.groupby([pd.Grouper(key='dia', **FRECUENCIAS[frecuencia]), AGRUPACIONES[por]])
+        [['unidades', 'ingresos', 'sugerido']].sum()
+        .reset_index()
+        .rename(columns={'dia': 'periodo', AGRUPACIONES[por]: 'grupo'})
+    )
+    reporte = reporte[reporte['unidades'] > 0].copy()
+    reporte['descuento'] = reporte['sugerido'] - reporte['ingresos']
+    reporte['descuento_pct'] = (reporte['descuento'] / reporte['sugerido'].where(reporte['sugerido'] != 0)).fillna(0.0)
+    return reporte[COLUMNAS_REPORTE].reset_index(drop=True)
+
+
+class ReportesVentas:
+    """Reportes sobre un HistorialVentas con resúmenes y resultados en caché"""
+
+    def __init__(self, historial):
+        self.historial = historial
+        # mes -> (partición, ventas resumidas, resumen diario)
+        self._diarios = {}
+        # mes cerrado -> resumen diario leído del archivo
+        self._archivados = {}
+        # Compartida por las sesiones que usan el mismo Inventario: CacheLRU tiene su lock
+        self._reportes = CacheLRU(MAX_REPORTES_EN_CACHE)
+
+    def _diario_mes(self, particion):
+        guardado = self._diarios.get(particion.mes)
+        if guardado is not None and guardado[0] is particion and guardado[1] == len(particion):
+            return guardado[2]
+        diario = resumen_diario(particion.a_dataframe())
+        self._diarios[particion.mes] = (particion, len(particion), diario)
+        return diario
+
+    def _diario_archivado(self, mes):
+        diario = self._archivados.get(mes)
+        if diario is None:
+            diario = self._archivados[mes] = self.historial.archivo.resumen(mes)
+        return diario
+
+    def diario(self, desde=None, hasta=None):
+        """Resumen diario de los meses entre 'desde' y 'hasta' (solo lee esos meses)"""
+        partes = [self._diario_archivado(mes) for mes in self.historial.meses_archivados(desde, hasta)]
+        partes += [self._diario_mes(p) for p in self.historial.particiones(desde, hasta) if len(p)]
+        partes = [parte for parte in partes if not parte.empty]
+        if not partes:
+            return resumen_diario(pd.DataFrame())
+        return pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+
+    def version(self, desde=None, hasta=None):
+        """Versión de los datos en el rango: cambia con cada venta, cierre o reset"""
+        return (tuple(self.historial.meses_archivados(desde, hasta)),
+                tuple((p.mes, id(p), len(p)) for p in self.historial.particiones(desde, hasta)))
+
+    def reporte(self, frecuencia='dia', por='categoria', desde=None, hasta=None):
+        """Ventas por periodo y grupo entre 'desde' y 'hasta' (ver agrupar)"""
+        clave = (self.version(desde, hasta), frecuencia, por, str(desde), str(hasta))
+        return self._reportes.obtener(clave, lambda: agrupar(self.diario(desde, hasta), frecuencia, por,
+                                                             desde, hasta))
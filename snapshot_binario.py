@@ -0,0 +1,212 @@
+"""Snapshot binario: el catálogo por columnas, con tabla de textos y compresión opcional
+
+El snapshot JSON repite el nombre de cada campo en cada producto y guarda
+los números como texto. Aquí cada campo del catálogo es una columna:
+
+- enteros y decimales, como arreglos int64 / float64;
+- textos, como una tabla de valores distintos más un código int32 por
+  producto (categoría, talla, color y ubicación se repiten mucho);
+- cualquier otra cosa (valores mezclados, None), como una lista JSON.
+
+El resto del estado (caja, secuencia, agregados...) va en un bloque JSON
+chico. Los campos que no tienen todos los productos van aparte, por
+producto, así que leer lo escrito devuelve exactamente los mismos datos.
+
+Estructura (little-endian):
+
+    'INVB' | versión u16 | compresión u8 | reservado u8 | contenido
+
+y el contenido, comprimido o no, es una serie de bloques 'largo u64 +
+bytes': primero el JSON con el estado y la lista de columnas con su tipo,
+después un bloque por columna. Una columna de textos es su tabla (cuántos
+valores, largo de cada uno en caracteres y todos juntos en UTF-8) más un
+código int32 por producto.
+
+Compresiones: 'gzip' (zlib, de la biblioteca estándar) y 'zstd' (requiere
+el paquete 'zstandard').
+"""
+import json
+import struct
+import zlib
+from operator import itemgetter
+
+import numpy as np
+
+MAGICO = b'INVB'
+VERSION_FORMATO = 1
+
+_CABECERA = struct.Struct('<4sHBB')
+_LARGO = struct.Struct('<Q')
+
+# Nombre -> código guardado en la cabecera
+COMPRESIONES = {None: 0, 'gzip': 1, 'zstd': 2}
+
+# Niveles rápidos: el checkpoint se repite seguido y el snapshot ya es chico
+NIVEL_GZIP = 1
+NIVEL_ZSTD = 3
+
+
+class ErrorSnapshot(Exception):
+    """El snapshot binario no se puede leer o escribir"""
+
+
+def es_binario(inicio):
+    """True si los primeros bytes de un archivo son de un snapshot binario"""
+    return inicio[:len(MAGICO)] == MAGICO
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ErrorSnapshot("Para la compresión zstd hace falta el paquete 'zstandard' (pip install zstandard)")
+    return zstandard
+
+
+def _comprimir(contenido, compresion):
+    if compresion == 'gzip':
+        return zlib.compress(contenido, NIVEL_GZIP)
+    if compresion == 'zstd':
+        return _zstd().ZstdCompressor(level=NIVEL_ZSTD).compress(contenido)
+    return contenido
+
+
+def _descomprimir(contenido, compresion):
+    if compresion == 'gzip':
+        return zlib.decompress(contenido)
+    if compresion == 'zstd':
+        return _zstd().ZstdDecompressor().decompress(contenido)
+    return contenido
+
+
+# ============================================
+# COLUMNAS
+# ============================================
+def _tipo_columna(valores):
+    """'i' enteros, 'f' decimales, 's' textos o 'j' (JSON) para el resto"""
+    tipos = set(map(type, valores))
+    if tipos == {int}:
+        # Fuera de int64 no caben en el arreglo
+        if min(valores) >= -2 ** 63 and max(valores) < 2 ** 63:
+            return 'i'
+    elif tipos == {float}:
+        return 'f'
+    elif tipos == {str}:
+        return 's'
+    return 'j'
+
+
+def _codificar_textos(valores):
+    """n distintos u32 | bytes del texto u32 | largos u32 (en caracteres) | texto UTF-8 | códigos int32"""
+    distintos = list(dict.fromkeys(valores))
+    if len(distintos) == len(valores):
+        # Todos distintos (p. ej. los IDs): el código es la posición
+        codigos = np.arange(len(valores), dtype=np.int32)
+    else:
+        indice = {valor: i for i, valor in enumerate(distintos)}
+        codigos = np.fromiter(map(indice.__getitem__, valores), dtype=np.int32, count=len(valores))
+    largos = np.fromiter(map(len, distintos), dtype=np.uint32, count=len(distintos))
+    texto = ''.join(distintos).encode('utf-8')
+    return b''.join([struct.pack('<II', len(distintos), len(texto)), largos.tobytes(), texto, codigos.tobytes()])
+
+
+def _decodificar_textos(bloque, n):
+    distintos, largo_texto = struct.unpack_from('<II', bloque)
+    largos = np.frombuffer(bloque, dtype=np.uint32, count=distintos, offset=8)
+    inicio = 8 + 4 * distintos
+    # Se decodifica todo el texto de una vez y se corta por caracteres
+    texto = bytes(bloque[inicio:inicio + largo_texto]).decode('utf-8')
+    fines = np.cumsum(largos, dtype=np.int64).tolist()
+    valores = np.empty(distintos, dtype=object)
+    valores[:] = [texto[a:b] for a, b in zip([0] + fines[:-1], fines)]
+    codigos = np.frombuffer(bloque, dtype=np.int32, count=n, offset=inicio + largo_texto)
+    return valores[codigos].tolist()
+
+
+def codificar(data, compresion=None):
+    """Bytes del snapshot binario de 'data' (como datos_snapshot de almacenamiento.py)"""
+    if compresion not in COMPRESIONES:
+        raise ErrorSnapshot(f"Compresión desconocida: {compresion} (usa gzip o zstd)")
+    productos = data.get('inventario', [])
+    # Columnas: los campos que tienen todos los productos, en el orden del primero
+    primero = productos[0].keys() if productos else {}
+    comunes = set(primero)
+    distintos = [i for i, item in enumerate(productos) if item.keys() != primero]
+    for i in distintos:
+        comunes &= productos[i].keys()
+    nombres = [nombre for nombre in primero if nombre in comunes]
+    extras = {}
+    for i in (distintos if len(comunes) == len(primero) else range(len(productos))):
+        campos = {clave: valor for clave, valor in productos[i].items() if clave not in comunes}
+        if campos:
+            extras[i] = campos
+
+    columnas, bloques = [], []
+    for nombre in nombres:
+        valores = list(map(itemgetter(nombre), productos))
+        tipo = _tipo_columna(valores)
+        columnas.append([nombre, tipo])
+        if tipo == 'i':
+            bloques.append(np.array(valores, dtype=np.int64).tobytes())
+        elif tipo == 'f':
+            bloques.append(np.array(valores, dtype=np.float64).tobytes())
+        elif tipo == 's':
+            bloques.append(_codificar_textos(valores))
+        else:
+            bloques.append(json.dumps(valores, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    estado = {clave: valor for clave, valor in data.items() if clave != 'inventario'}
+    estado['_productos'] = {'n': len(productos), 'columnas': columnas,
+                            'extras': {str(i): campos for i, campos in extras.items()}}
+    bloques.insert(0, json.dumps(estado, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    contenido = b''.join(_LARGO.pack(len(bloque)) + bloque for bloque in bloques)
+    cabecera = _CABECERA.pack(MAGICO, VERSION_FORMATO, COMPRESIONES[compresion], 0)
+    return cabecera + _comprimir(contenido, compresion)
+
+
+def decodificar(contenido):
+    """Estado (como leer_snapshot de almacenamiento.py) a partir de los bytes del snapshot binario"""
+    if len(contenido) < _CABECERA.size:
+        raise ErrorSnapshot("Snapshot binario incompleto")
+    magico, version, codigo, _ = _CABECERA.unpack_from(contenido)
+    if magico != MAGICO:
+        raise ErrorSnapshot("No es un snapshot binario")
+    if version > VERSION_FORMATO:
+        raise ErrorSnapshot(f"Snapshot binario versión {version}: esta versión de la app solo lee hasta la "
+                            f"{VERSION_FORMATO}")
+    compresion = {c: nombre for nombre, c in COMPRESIONES.items()}.get(codigo, '?')
+    if compresion == '?':
+        raise ErrorSnapshot(f"Compresión desconocida en el snapshot: {codigo}")
+    cuerpo = memoryview(_descomprimir(contenido[_CABECERA.size:], compresion))
+
+    bloques, posicion = [], 0
+    while posicion < len(cuerpo):
+        largo = _LARGO.unpack_from(cuerpo, posicion)[0]
+        posicion += _LARGO.size
+        bloques.append(cuerpo[posicion:posicion + largo])
+        posicion += largo
+
+    data = json.loads(bytes(bloques[0]).decode('utf-8'))
+    productos = data.pop('_productos')
+    n = productos['n']
+    nombres, listas = [], []
+    for (nombre, tipo), bloque in zip(productos['columnas'], bloques[1:]):
+        nombres.append(nombre)
+        if tipo == 'i':
+            listas.append(np.frombuffer(bloque, dtype=np.int64, count=n).tolist())
+        elif tipo == 'f':
+            listas.append(np.frombuffer(bloque, dtype=np.float64, count=n).tolist())
+        elif tipo == 's':
+            listas.append(_decodificar_textos(bloque, n))
+        else:
+            listas.append(json.loads(bytes(bloque).decode('utf-8')))
+
+    if nombres:
+        inventario = [dict(zip(nombres, fila)) for fila in zip(*listas)]
+    else:
+        inventario = [{} for _ in range(n)]
+    for i, campos in productos['extras'].items():
+        inventario[int(i)].update(campos)
+    data['inventario'] = inventario
+    return data
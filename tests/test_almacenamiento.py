@@ -0,0 +1,60 @@
+"""Datos del formato original: abrirlos y guardarlos no cambia las ventas"""
+import json
+
+import pytest
+
+import almacenamiento
+
+# inventario_data.json como lo guardaba la primera versión de la app:
+# ventas dentro del snapshot, sin producto_id ni schema_version
+PRODUCTOS_ORIGINALES = [
+    {'ID': 'PROD_20240101_090000', 'Categoria': 'Camisas', 'Producto': 'Camisa Oxford', 'Talla': 'M',
+     'Color': 'Azul', 'Ubicacion': 'Exhibido', 'Entrada_Total': 10, 'Stock_Bodega': 4, 'Stock_Exhibido': 3,
+     'Stock_Total': 7, 'Ventas_Total': 3, 'Precio_Sugerido': 450.0, 'Precio_Venta': 399.0},
+]
+VENTAS_ORIGINALES = [
+    {'fecha': '2024-01-05 10:00:00', 'producto': 'Camisa Oxford', 'talla': 'M', 'precio_sugerido': 450.0,
+     'precio_venta': 399.0, 'categoria': 'Camisas', 'ubicacion': 'Exhibido', 'ubicacion_venta': 'exhibido'},
+    {'fecha': '2024-01-20T18:45:12.345678', 'producto': 'Camisa Oxford', 'talla': 'M', 'precio_sugerido': 450.0,
+     'precio_venta': 380.0, 'categoria': 'Camisas', 'ubicacion': 'Exhibido', 'ubicacion_venta': 'exhibido'},
+    {'fecha': '2024-02-01T09:30:00', 'producto': 'Camisa Oxford', 'talla': 'M', 'precio_sugerido': 450.0,
+     'precio_venta': 399.0, 'categoria': 'Camisas', 'ubicacion': 'Exhibido', 'ubicacion_venta': 'exhibido'},
+]
+
+
+@pytest.fixture
+def rutas(tmp_path):
+    ruta_snapshot = tmp_path / 'inventario_data.json'
+    ruta_snapshot.write_text(json.dumps({
+        'inventario': PRODUCTOS_ORIGINALES,
+        'ventas_diarias': VENTAS_ORIGINALES,
+        'caja': 1178.0,
+    }), encoding='utf-8')
+    return {'snapshot': str(ruta_snapshot), 'diario': str(tmp_path / 'inventario_diario.jsonl'),
+            'sqlite': str(tmp_path / 'inventario.db'), 'ventas': str(tmp_path / 'inventario_ventas'),
+            'archivo': str(tmp_path / 'inventario_archivo')}
+
+
+def ventas_sin_producto_id(historial):
+    return [{col: venta.get(col) for col in almacenamiento.COLUMNAS_VENTA} for venta in historial]
+
+
+def test_migrar_y_guardar_conserva_las_ventas(rutas):
+    almacen = almacenamiento.AlmacenJSON(rutas['snapshot'], rutas['diario'], rutas['ventas'], rutas['archivo'])
+    # La primera carga migra y guarda; se guarda otra vez como lo haría un checkpoint
+    data = almacen.cargar()
+    almacen.guardar(data['inventario'], data['ventas_diarias'], data['caja'], data['agregados'])
+
+    recargado = almacenamiento.AlmacenJSON(rutas['snapshot'], rutas['diario'], rutas['ventas'],
+                                           rutas['archivo']).cargar()
+    assert ventas_sin_producto_id(recargado['ventas_diarias']) == VENTAS_ORIGINALES
+    assert [venta['producto_id'] for venta in recargado['ventas_diarias']] == ['PROD_20240101_090000'] * 3
+    assert recargado['inventario'] == PRODUCTOS_ORIGINALES
+    assert recargado['caja'] == 1178.0
+
+
+def test_importar_a_sqlite_conserva_las_ventas(rutas):
+    almacenamiento.importar_json_a_sqlite(rutas['snapshot'], rutas['diario'], rutas['sqlite'], rutas['ventas'],
+                                          rutas['archivo'])
+    data = almacenamiento.AlmacenSQLite(rutas['sqlite'], rutas['archivo']).cargar()
+    assert ventas_sin_producto_id(data['ventas_diarias']) == VENTAS_ORIGINALES
@@ -0,0 +1,98 @@
+"""Ventas concurrentes: nunca se vende más de lo que hay en stock
+
+Versión corta de benchmarks/stress_concurrencia.py, con mucha más demanda
+que stock para que una venta de más se note.
+"""
+import argparse
+import os
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+import importacion
+from agregados import Agregados
+from inventario import Inventario
+from sinteticos import catalogo_uniforme
+from stress_concurrencia import con_hilos, con_procesos, crear_almacen, verificar
+
+PRODUCTOS = 5
+STOCK = 10
+ENTRADA = PRODUCTOS * STOCK
+
+# Importaciones durante las ventas: cada una trae estas unidades por producto
+IMPORTACIONES = 10
+UNIDADES_IMPORTADAS = 2
+
+
+def preparar(tipo, directorio):
+    productos = catalogo_uniforme(PRODUCTOS, STOCK)
+    crear_almacen(tipo, directorio).guardar(productos, [], 0.0, Agregados.desde_cero(productos, []))
+
+
+@pytest.mark.parametrize('tipo', ['json', 'sqlite'])
+@pytest.mark.parametrize('escenario', ['un Inventario', 'uno por hilo', 'procesos'])
+def test_ventas_concurrentes_sin_sobreventa(tmp_path, tipo, escenario):
+    # 8 x 40 ventas pedidas para 50 unidades
+    args = argparse.Namespace(hilos=8, procesos=3, ventas=40, productos=PRODUCTOS, diferida=False)
+    directorio = str(tmp_path)
+    preparar(tipo, directorio)
+
+    if escenario == 'procesos':
+        resultados = con_procesos(tipo, directorio, args)
+    else:
+        resultados = con_hilos(tipo, directorio, args, compartido=escenario == 'un Inventario')
+
+    aceptadas, errores = verificar(tipo, directorio, ENTRADA, resultados)
+    assert errores == []
+    # Se agota todo el stock y ni una unidad más
+    assert aceptadas == ENTRADA
+
+
+def importar_en_rondas(tipo, directorio, fallas):
+    """Importar varias veces el mismo archivo con su propio Inventario, mientras otros venden"""
+    try:
+        _importar_en_rondas(tipo, directorio)
+    except Exception as e:
+        fallas.append(e)
+
+
+def _importar_en_rondas(tipo, directorio):
+    inv = Inventario(crear_almacen(tipo, directorio))
+    archivo = pd.DataFrame([
+        {'Producto': item['Producto'], 'Talla': item['Talla'], 'Color': item['Color'],
+         'Categoria': item['Categoria'], 'Stock_Bodega': '1', 'Stock_Exhibido': str(UNIDADES_IMPORTADAS - 1),
+         'Precio_Sugerido': '100'}
+        for item in catalogo_uniforme(PRODUCTOS)
+    ])
+    validas, errores = importacion.validar(archivo, ['Camisas'])
+    assert errores.empty
+    for _ in range(IMPORTACIONES):
+        # El plan se arma fuera del bloqueo: puede quedar viejo antes de importarlo
+        entradas, nuevos = importacion.planificar(validas, inv)
+        assert nuevos == []
+        ok, mensaje = inv.importar_productos(entradas, nuevos)
+        assert ok, mensaje
+    inv.cerrar()
+
+
+@pytest.mark.parametrize('tipo', ['json', 'sqlite'])
+def test_importacion_durante_ventas_no_deshace_ventas(tmp_path, tipo):
+    args = argparse.Namespace(hilos=8, procesos=3, ventas=40, productos=PRODUCTOS, diferida=False)
+    directorio = str(tmp_path)
+    preparar(tipo, directorio)
+
+    fallas = []
+    importador = threading.Thread(target=importar_en_rondas, args=(tipo, directorio, fallas))
+    importador.start()
+    resultados = con_hilos(tipo, directorio, args, compartido=False)
+    importador.join()
+    assert fallas == []
+
+    # stock + vendidas = entrada inicial + todo lo importado
+    entrada = ENTRADA + IMPORTACIONES * UNIDADES_IMPORTADAS * PRODUCTOS
+    _, errores = verificar(tipo, directorio, entrada, resultados)
+    assert errores == []
@@ -0,0 +1,85 @@
+"""Validación por columnas y plan de una importación masiva"""
+import pandas as pd
+
+import importacion
+from inventario import Inventario
+
+CATEGORIAS = ['Camisas', 'Jeans']
+
+
+def archivo(*filas):
+    """DataFrame como el que devuelve leer_archivo: todo como texto"""
+    columnas = importacion.COLUMNAS_REQUERIDAS + importacion.COLUMNAS_OPCIONALES
+    return pd.DataFrame([dict(zip(columnas, fila)) for fila in filas], columns=columnas, dtype=str)
+
+
+def inventario(*productos):
+    return Inventario(None, {'inventario': list(productos), 'ventas_diarias': [], 'caja': 0.0})
+
+
+def producto(pid, nombre, talla, color, bodega, exhibido, vendidas=0):
+    return {'ID': pid, 'Categoria': 'Camisas', 'Producto': nombre, 'Talla': talla, 'Color': color,
+            'Ubicacion': 'Bodega' if bodega > exhibido else 'Exhibido', 'Entrada_Total': bodega + exhibido + vendidas,
+            'Stock_Bodega': bodega, 'Stock_Exhibido': exhibido, 'Stock_Total': bodega + exhibido,
+            'Ventas_Total': vendidas, 'Precio_Sugerido': 400.0, 'Precio_Venta': 350.0}
+
+
+def test_validar_separa_filas_con_errores():
+    df = archivo(
+        ('Camisa Oxford', 'M', 'Azul', 'Camisas', '2', '1', '450', '399'),      # fila 2: válida
+        ('Camisa Oxford', 'L', 'Azul', 'Camisas', '-1', '3', '450', ''),        # fila 3: stock negativo
+        ('Jeans Slim', '32', 'Negro', 'Jeans', 'dos', '1', '650', ''),          # fila 4: no es número
+        ('Sombrero', 'U', 'Café', 'Sombreros', '1', '0', '200', ''),            # fila 5: categoría
+        ('Camisa Lino', 'S', 'Blanco', 'Camisas', '1.5', '0', '300', ''),       # fila 6: no entero
+        ('Camisa Lino', 'M', 'Blanco', 'Camisas', '0', '0', '300', ''),         # fila 7: sin stock
+        ('', 'M', 'Blanco', 'Camisas', '1', '0', 'caro', ''),                   # fila 8: dos errores
+        ('Jeans Slim', '34', 'Negro', 'Jeans', '$1,000', '', '650', ''),        # fila 9: válida
+    )
+    validas, errores = importacion.validar(df, CATEGORIAS)
+
+    assert validas['fila'].tolist() == [2, 9]
+    assert validas['Stock_Bodega'].tolist() == [2, 1000]
+    assert validas['Stock_Exhibido'].tolist() == [1, 0]
+    # Sin precio de venta se usa el sugerido
+    assert validas['Precio_Venta'].tolist() == [399.0, 650.0]
+
+    por_fila = dict(zip(errores['fila'], errores['errores']))
+    assert sorted(por_fila) == [3, 4, 5, 6, 7, 8]
+    assert por_fila[3] == "Stock_Bodega debe ser un entero >= 0"
+    assert por_fila[4] == "Stock_Bodega no es un número"
+    assert por_fila[5] == "categoría desconocida"
+    assert por_fila[6] == "Stock_Bodega debe ser un entero >= 0"
+    assert por_fila[7] == "el stock total debe ser mayor a 0"
+    assert por_fila[8] == "falta Producto; Precio_Sugerido falta o no es un número"
+
+
+def test_planificar_junta_repetidas_y_separa_existentes():
+    inv = inventario(producto('PROD_1', 'Camisa Oxford', 'M', 'Azul', 4, 2, vendidas=3))
+    df = archivo(
+        ('Camisa Oxford', 'M', 'Azul', 'Camisas', '2', '1', '450', '399'),
+        # Misma variante con otras mayúsculas y espacios: se junta con la anterior
+        ('  camisa  OXFORD', 'm', 'AZUL ', 'Camisas', '3', '0', '460', '410'),
+        ('Jeans Slim', '32', 'Negro', 'Jeans', '5', '0', '650', ''),
+        ('Jeans Slim', '32', 'Negro', 'Jeans', '1', '2', '640', ''),
+    )
+    validas, errores = importacion.validar(df, CATEGORIAS)
+    assert errores.empty
+
+    entradas, nuevos = importacion.planificar(validas, inv)
+
+    # Existente: solo las unidades que entran y el último precio, no el stock resultante
+    assert entradas == [{'ID': 'PROD_1', 'Stock_Bodega': 5, 'Stock_Exhibido': 1,
+                         'Precio_Sugerido': 460.0, 'Precio_Venta': 410.0}]
+    assert len(nuevos) == 1
+    nuevo = nuevos[0]
+    assert (nuevo['Producto'], nuevo['Talla'], nuevo['Color'], nuevo['Categoria']) == ('Jeans Slim', '32', 'Negro', 'Jeans')
+    assert (nuevo['Stock_Bodega'], nuevo['Stock_Exhibido'], nuevo['Stock_Total'], nuevo['Entrada_Total']) == (6, 2, 8, 8)
+    assert nuevo['Precio_Sugerido'] == nuevo['Precio_Venta'] == 640.0
+
+    # El plan no toca el inventario hasta importarlo
+    assert inv.obtener('PROD_1')['Stock_Total'] == 6
+
+
+def test_planificar_sin_filas_validas():
+    validas, _ = importacion.validar(archivo(('', '', '', '', '', '', '', '')), CATEGORIAS)
+    assert importacion.planificar(validas, inventario()) == ([], [])